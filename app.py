@@ -6,21 +6,28 @@ Aplicação Web para Extração de Dados de PDFs
 Flask application with file upload, processing, and data visualization
 """
 
-from flask import Flask, request, render_template, redirect, url_for, flash, jsonify, send_file
+from flask import Flask, Response, request, render_template, redirect, url_for, flash, jsonify, send_file
 from werkzeug.utils import secure_filename
 import os
-import pandas as pd
 import json
-import re
 import time
 from datetime import datetime
 import uuid
-from extrator_pdf import PDFExtractor
-import tempfile
-import zipfile
-from io import BytesIO
+from extrator_pdf import PDFExtractor, preflight
+from exporters import PARQUET_AVAILABLE, export_bundle, export_parquet, export_records
+from result_cache import ResultCache
+from job_runner import JobRunner
+from job_store import create_job_store
+from record_query import DEFAULT_LIMIT, DEFAULT_SORT, build_sort_index, query_records
+from metrics import MetricsCollector, render_prometheus
+from money import format_centavos
+from structured_log import get_logger, log_event, setup_logging
+import logging
+import queue
 
 app = Flask(__name__)
+setup_logging()
+logger = get_logger('app')
 app.config['SECRET_KEY'] = 'extrator-pdf-2025'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
@@ -29,191 +36,366 @@ UPLOAD_FOLDER = 'uploads'
 RESULTS_FOLDER = 'results'
 ALLOWED_EXTENSIONS = {'pdf', 'PDF'}
 
+CACHE_FOLDER = os.environ.get('RESULT_CACHE_DIR', os.path.join('data', 'cache'))
+CACHE_MAX_MB = int(os.environ.get('RESULT_CACHE_MAX_MB', '500'))
+
 # Criar pastas se não existirem
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
-# Base de dados em memória para jobs de processamento
-processing_jobs = {}
+# Cache de resultados por conteúdo do PDF (reenvios do mesmo extrato)
+result_cache = ResultCache(CACHE_FOLDER, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+# Armazenamento de jobs: SQLite compartilhado entre workers ('memory' para desenvolvimento)
+JOB_STORE_BACKEND = os.environ.get('JOB_STORE', 'sqlite')
+JOB_DATA_DIR = os.environ.get('JOB_DATA_DIR', 'data')
+job_store = create_job_store(JOB_STORE_BACKEND, JOB_DATA_DIR)
+
+# Pool de processamento em segundo plano
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', '20'))
+JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', '600'))
+
+# Andamento dos jobs: intervalo mínimo entre gravações e entre consultas do stream SSE
+PROGRESS_INTERVAL = float(os.environ.get('PROGRESS_INTERVAL', '0.5'))
+EVENTS_KEEPALIVE = 15
+
+# Cada stream SSE ocupa uma thread do gunicorn enquanto está aberto: ele é
+# encerrado após EVENTS_MAX_AGE segundos e o EventSource reconecta sozinho
+# depois de EVENTS_RETRY_MS, liberando a thread para outras requisições
+EVENTS_MAX_AGE = int(os.environ.get('EVENTS_MAX_AGE', '45'))
+EVENTS_RETRY_MS = 2000
+
+# Prévia: páginas extraídas na primeira fase do job e registros de amostra enviados à página
+PREVIEW_PAGES = int(os.environ.get('PREVIEW_PAGES', '3'))
+PREVIEW_ROWS = int(os.environ.get('PREVIEW_ROWS', '50'))
+
+# Quantidade de jobs recentes exibidos no dashboard
+DASHBOARD_RECENT_JOBS = int(os.environ.get('DASHBOARD_RECENT_JOBS', '100'))
 
 def allowed_file(filename):
     """Verifica se o arquivo tem extensão permitida"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'pdf'}
 
-def process_pdf_file(file_path, job_id):
-    """Processa um arquivo PDF e retorna os dados extraídos"""
+def process_pdf_file(file_path, job_id, report=None):
+    """
+    Processa um arquivo PDF e retorna os dados extraídos
+    
+    Args:
+        file_path (str): Caminho do PDF enviado
+        job_id (str): ID do job
+        report (Callable): Recebe cada atualização do job. Quando executado
+            pelo JobRunner, envia as atualizações ao processo do Flask.
+    """
+    if report is None:
+        report = lambda fields: update_job(job_id, fields)
+    
     try:
         # Atualiza status
-        processing_jobs[job_id]['status'] = 'processing'
-        processing_jobs[job_id]['message'] = 'Extraindo dados do PDF...'
+        report({'status': 'processing', 'message': 'Extraindo dados do PDF...'})
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        excel_filename = f"dados_extraidos_{job_id}_{timestamp}.xlsx"
+        csv_filename = f"dados_extraidos_{job_id}_{timestamp}.csv"
+        parquet_filename = f"dados_extraidos_{job_id}_{timestamp}.parquet"
+        zip_filename = f"dados_extraidos_{job_id}.zip"
+        
+        excel_path = os.path.join(RESULTS_FOLDER, excel_filename)
+        csv_path = os.path.join(RESULTS_FOLDER, csv_filename)
+        parquet_path = os.path.join(RESULTS_FOLDER, parquet_filename)
+        zip_path = os.path.join(RESULTS_FOLDER, f"dados_extraidos_{job_id}_{timestamp}.zip")
+        
+        # Mesmo PDF já processado: reaproveita registros do cache
+        cache_key = result_cache.key_for(file_path)
+        cached = result_cache.get(cache_key)
+        if cached:
+            report({
+                'status': 'completed',
+                'message': 'Processamento concluído com sucesso! (resultado em cache)',
+                'data': cached['data'],
+                'sort_index': build_sort_index(cached['data']),
+                'stats': cached['stats'],
+                'cache_hit': True,
+                'excel_file': excel_filename,
+                'csv_file': csv_filename,
+                'parquet_file': parquet_filename,
+                'zip_file': zip_filename,
+                'excel_path': excel_path,
+                'csv_path': csv_path,
+                'parquet_path': parquet_path,
+                'zip_path': zip_path
+            })
+            return
         
-        # Cria o extrator
-        extractor = PDFExtractor(file_path)
+        # Pré-checagem: recusa PDFs digitalizados ou sem relação com o extrato
+        # antes da extração e já escolhe a estratégia
+        metrics = MetricsCollector()
+        check = preflight(file_path, metrics=metrics)
+        if check['motivo']:
+            report({'status': 'error', 'message': check['motivo'], 'preview': None})
+            return
         
-        # Extrai os dados
-        data = extractor.extract_data()
+        # Prévia das primeiras páginas e, em seguida, o restante do documento
+        data, metrics = extract_in_two_phases(file_path, report, check['estrategia'], metrics)
         
         if data:
-            # Salva os dados
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            excel_filename = f"dados_extraidos_{job_id}_{timestamp}.xlsx"
-            csv_filename = f"dados_extraidos_{job_id}_{timestamp}.csv"
+            # Os arquivos de download só são gerados na primeira solicitação (ensure_exports)
+            stats = compute_stats(data)
             
-            excel_path = os.path.join(RESULTS_FOLDER, excel_filename)
-            csv_path = os.path.join(RESULTS_FOLDER, csv_filename)
-            
-            # Salva arquivos
-            extractor.save_to_excel(excel_path)
-            extractor.save_to_csv(csv_path)
-            
-            # Calcula estatísticas
-            df = pd.DataFrame(data)
-            stats = {
-                'total_registros': len(df),
-                'placas_unicas': df['placa'].nunique(),
-                'registros_com_data': len(df[df['data'] != '']),
-                'registros_com_valor': len(df[df['total'] != '']),
-                'valor_total': calculate_total_value(df)
-            }
+            result_cache.put(cache_key, data, stats)
             
             # Atualiza status final
-            processing_jobs[job_id].update({
+            report({
                 'status': 'completed',
                 'message': 'Processamento concluído com sucesso!',
                 'data': data,
-                'stats': stats,
+                'sort_index': build_sort_index(data),
+                # Tempos por etapa e contadores ficam só no job (não no cache)
+                'stats': dict(stats, metricas=metrics.snapshot()),
+                'cache_hit': False,
+                'preview': None,
                 'excel_file': excel_filename,
                 'csv_file': csv_filename,
+                'parquet_file': parquet_filename,
+                'zip_file': zip_filename,
                 'excel_path': excel_path,
-                'csv_path': csv_path
+                'csv_path': csv_path,
+                'parquet_path': parquet_path,
+                'zip_path': zip_path
             })
             
         else:
-            processing_jobs[job_id].update({
+            report({
                 'status': 'error',
-                'message': 'Nenhum dado foi encontrado no PDF. Verifique se o arquivo contém texto extraível.'
+                'message': 'Nenhum dado foi encontrado no PDF. Verifique se o arquivo contém texto extraível.',
+                'preview': None
             })
             
     except Exception as e:
-        processing_jobs[job_id].update({
+        report({
             'status': 'error',
-            'message': f'Erro ao processar o arquivo: {str(e)}'
+            'message': f'Erro ao processar o arquivo: {str(e)}',
+            'preview': None
         })
 
-@app.route('/')
-def index():
-    """Página principal"""
-    return render_template('index.html')
+def extract_in_two_phases(file_path, report, strategy='auto', metrics=None):
+    """
+    Extrai o PDF em duas fases: uma prévia rápida das primeiras páginas,
+    publicada no job, e depois o restante do documento
+    
+    As duas fases alimentam o mesmo agregador, então nenhuma página é lida
+    duas vezes e o resultado final é o mesmo de uma extração única. A
+    estratégia escolhida na prévia é reaproveitada no restante.
+    
+    Args:
+        file_path (str): Caminho do PDF enviado
+        report (Callable): Recebe as atualizações do job
+        strategy (str): Estratégia de extração (a da pré-checagem ou 'auto')
+        metrics (MetricsCollector): Coletor das métricas (um novo é criado se None)
+    
+    Returns:
+        Tuple[List[Dict], MetricsCollector]: Registros agregados e métricas das duas fases
+    """
+    metrics = metrics if metrics is not None else MetricsCollector()
+    preview = PDFExtractor(file_path, strategy=strategy, max_pages=PREVIEW_PAGES, metrics=metrics)
+    aggregator = preview.create_aggregator()
+    sample = preview.extract_data(aggregator, finish=False)
+    
+    total_pages = preview.document_pages or 0
+    preview_pages = min(PREVIEW_PAGES, total_pages)
+    progress = {
+        'paginas_processadas': preview_pages,
+        'total_paginas': total_pages,
+        'registros': aggregator.registros_lidos
+    }
+    if sample:
+        report({
+            'message': f"Prévia das primeiras {preview_pages} páginas pronta. Processando o restante...",
+            'progress': progress,
+            'preview': build_preview(sample, preview_pages, total_pages)
+        })
+    
+    if total_pages <= preview_pages:
+        return preview.finish_aggregation(aggregator), metrics
+    
+    extractor = PDFExtractor(
+        file_path,
+        strategy=preview.resolved_strategy or strategy,
+        page_range=(preview_pages + 1, total_pages),
+        metrics=metrics,
+        on_progress=throttled_progress(report, offset=progress)
+    )
+    return extractor.extract_data(aggregator), metrics
 
-def format_currency_br(valor):
+def compute_stats(data):
+    """Estatísticas do job calculadas direto dos registros agregados (valores já em centavos)"""
+    valor_total_centavos = sum(item['valor_centavos'] for item in data)
+    return {
+        'total_registros': len(data),
+        'placas_unicas': len({item['placa'] for item in data}),
+        'registros_com_data': sum(1 for item in data if item['data'] != ''),
+        'registros_com_valor': sum(1 for item in data if item['total'] != ''),
+        'valor_total': valor_total_centavos / 100,
+        'valor_total_centavos': valor_total_centavos
+    }
+
+def build_preview(sample, preview_pages, total_pages):
     """
-    Formata valor para moeda brasileira (R$ 1.234,56)
+    Monta a prévia exibida enquanto a extração completa continua
+    
+    Os totais estimados extrapolam os da prévia pela proporção de páginas
+    lidas; são substituídos pelos reais quando o job termina.
     
     Args:
-        valor (float): Valor numérico
-        
+        sample (List[Dict]): Registros agregados das primeiras páginas
+        preview_pages (int): Páginas lidas na prévia
+        total_pages (int): Páginas do documento
+    
     Returns:
-        str: Valor formatado em moeda brasileira
+        Dict: Amostra de registros, estatísticas da prévia e totais estimados
     """
-    if valor == 0:
-        return "0,00"
-    
-    # Converte para string com 2 casas decimais
-    valor_str = f"{valor:.2f}"
-    
-    # Separa parte inteira e decimal
-    partes = valor_str.split('.')
-    parte_inteira = partes[0]
-    parte_decimal = partes[1]
-    
-    # Formata parte inteira com separadores de milhares
-    if len(parte_inteira) > 3:
-        # Adiciona pontos a cada 3 dígitos da direita para esquerda
-        parte_inteira_formatada = ""
-        for i, digit in enumerate(reversed(parte_inteira)):
-            if i > 0 and i % 3 == 0:
-                parte_inteira_formatada = "." + parte_inteira_formatada
-            parte_inteira_formatada = digit + parte_inteira_formatada
-    else:
-        parte_inteira_formatada = parte_inteira
-    
-    return f"{parte_inteira_formatada},{parte_decimal}"
-
-def safe_convert_to_float(valor_str):
+    stats = compute_stats(sample)
+    scale = total_pages / preview_pages if preview_pages else 1
+    return {
+        'paginas_lidas': preview_pages,
+        'total_paginas': total_pages,
+        'stats': stats,
+        'estimativa': {
+            'total_registros': round(stats['total_registros'] * scale),
+            'valor_total': round(stats['valor_total'] * scale, 2)
+        },
+        'data': [
+            {key: item[key] for key in ('placa', 'data', 'total', 'pagina')}
+            for item in sample[:PREVIEW_ROWS]
+        ]
+    }
+
+def throttled_progress(report, interval=PROGRESS_INTERVAL, offset=None):
     """
-    Converte string de valor para float de forma segura
+    Cria o callback de andamento da extração, limitando a frequência de gravações no store
     
     Args:
-        valor_str (str): Valor em string
-        
+        report (Callable): Recebe as atualizações do job
+        interval (float): Intervalo mínimo entre atualizações, em segundos
+        offset (Dict): Andamento já feito antes deste extrator (ex.: a prévia),
+            somado ao reportado por ele
+    
     Returns:
-        float: Valor convertido para float ou 0.0 se erro
+        Callable: Callback para o on_progress do PDFExtractor
     """
-    if pd.isna(valor_str) or valor_str == '' or valor_str is None:
-        return 0.0
+    last_report = [0.0]
+    
+    def on_progress(progress):
+        if offset:
+            progress = {
+                'paginas_processadas': offset['paginas_processadas'] + progress['paginas_processadas'],
+                'total_paginas': offset['paginas_processadas'] + progress['total_paginas'],
+                'registros': offset['registros'] + progress['registros']
+            }
+        now = time.monotonic()
+        # A última página sempre é enviada para a barra chegar a 100%
+        if now - last_report[0] >= interval or progress['paginas_processadas'] >= progress['total_paginas']:
+            last_report[0] = now
+            report({
+                'message': f"Processando página {progress['paginas_processadas']} de {progress['total_paginas']}...",
+                'progress': progress
+            })
     
-    try:
-        # Remove caracteres desnecessários
-        valor_clean = re.sub(r'[R$\s]', '', str(valor_str).strip())
-        
-        if not valor_clean:
-            return 0.0
-        
-        # Se tem muitos pontos ou vírgulas, pode ser concatenação incorreta
-        if valor_clean.count('.') > 1 or valor_clean.count(',') > 1:
-            # Tenta extrair primeiro valor válido
-            # Procura por padrão brasileiro: 123,45 ou 1.234,56
-            br_match = re.search(r'\d{1,3}(?:\.\d{3})*,\d{2}', valor_clean)
-            if br_match:
-                found = br_match.group()
-                return float(found.replace('.', '').replace(',', '.'))
-            
-            # Procura por padrão americano: 123.45
-            us_match = re.search(r'\d+\.\d{2}', valor_clean)
-            if us_match:
-                return float(us_match.group())
-            
-            return 0.0
-        
-        # Trata formatação normal
-        if ',' in valor_clean and '.' in valor_clean:
-            # Formato brasileiro: 1.234,56
-            valor_clean = valor_clean.replace('.', '').replace(',', '.')
-        elif ',' in valor_clean:
-            # Verifica se é decimal (123,45) ou milhares (1,234)
-            parts = valor_clean.split(',')
-            if len(parts) == 2 and len(parts[1]) == 2:
-                valor_clean = valor_clean.replace(',', '.')
-            else:
-                valor_clean = valor_clean.replace(',', '')
-        
-        return float(valor_clean)
-        
-    except (ValueError, AttributeError) as e:
-        print(f"Erro ao converter valor '{valor_str}': {e}")
-        return 0.0
+    return on_progress
+
+def update_job(job_id, fields):
+    """Aplica ao job uma atualização recebida do processamento"""
+    job_store.update(job_id, fields)
+
+def is_cancel_requested(job_id):
+    """Verifica se o cancelamento do job foi pedido (em qualquer worker)"""
+    job = job_store.get(job_id)
+    return bool(job and job.get('cancel_requested'))
+
+job_runner = JobRunner(
+    process_pdf_file,
+    update_job,
+    workers=JOB_WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    timeout=JOB_TIMEOUT,
+    is_cancelled=is_cancel_requested
+)
+
+def ensure_exports(job):
+    """
+    Gera os arquivos Excel e CSV do job se ainda não existirem (primeiro download)
+    
+    Os dois arquivos saem da mesma passada pelos registros e são gravados de
+    forma atômica, então downloads simultâneos no máximo repetem o trabalho.
+    
+    Args:
+        job (dict): Job concluído, com os caminhos planejados dos arquivos
+    """
+    excel_path = job['excel_path'] if not os.path.exists(job['excel_path']) else None
+    csv_path = job['csv_path'] if not os.path.exists(job['csv_path']) else None
+    if not excel_path and not csv_path:
+        return
+    
+    start = time.perf_counter()
+    count = export_records(job_store.load_records(job['id']), excel_path=excel_path, csv_path=csv_path)
+    log_event(logger, logging.INFO, 'exportacao', "Arquivos gerados no primeiro download",
+              job_id=job['id'], registros=count, duracao_s=round(time.perf_counter() - start, 3))
+
+def ensure_parquet(job):
+    """
+    Gera o arquivo Parquet do job se ainda não existir (primeiro download)
+    
+    Args:
+        job (dict): Job concluído, com o caminho planejado do Parquet
+    """
+    if os.path.exists(job['parquet_path']):
+        return
+    
+    start = time.perf_counter()
+    count = export_parquet(job_store.load_records(job['id']), job['parquet_path'])
+    log_event(logger, logging.INFO, 'exportacao', "Parquet gerado no primeiro download",
+              job_id=job['id'], registros=count, duracao_s=round(time.perf_counter() - start, 3))
+
+def ensure_bundle(job):
+    """
+    Gera o pacote ZIP com Excel e CSV do job se ainda não existir (primeiro download)
+    
+    Args:
+        job (dict): Job concluído, com os caminhos planejados dos arquivos
+    """
+    if os.path.exists(job['zip_path']):
+        return
+    
+    ensure_exports(job)
+    export_bundle([(job['excel_path'], job['excel_file']), (job['csv_path'], job['csv_file'])], job['zip_path'])
 
-def calculate_total_value(df):
+def send_export(path, download_name, mimetype=None):
     """
-    Calcula valor total de forma segura
+    Envia um arquivo exportado direto do disco, em streaming
+    
+    Os arquivos de um job não mudam depois de gravados, então ETag e
+    Last-Modified permitem responder 304 a downloads repetidos e o suporte
+    a Range permite retomar downloads interrompidos (206).
+    """
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name,
+                     conditional=True, etag=True)
+
+@app.route('/')
+def index():
+    """Página principal"""
+    return render_template('index.html')
+
+def format_currency_br(valor):
+    """
+    Formata valor para moeda brasileira (R$ 1.234,56)
     
     Args:
-        df (DataFrame): DataFrame com coluna 'total'
+        valor (float): Valor numérico
         
     Returns:
-        float: Valor total calculado
+        str: Valor formatado em moeda brasileira
     """
-    try:
-        if 'total' not in df.columns or df.empty:
-            return 0.0
-        
-        # Aplica conversão segura para cada valor
-        valores_convertidos = df['total'].apply(safe_convert_to_float)
-        return valores_convertidos.sum()
-        
-    except Exception as e:
-        print(f"Erro ao calcular valor total: {e}")
-        return 0.0
+    return format_centavos(round((valor or 0) * 100))
 
 # Função global para usar nos templates
 app.jinja_env.globals.update(format_currency_br=format_currency_br)
@@ -247,16 +429,15 @@ def upload_file():
         file.save(file_path)
         
         # Inicializa job de processamento
-        processing_jobs[job_id] = {
+        job_store.create({
             'id': job_id,
             'filename': filename,
             'file_path': file_path,
             'status': 'processing',
             'message': 'Arquivo enviado. Aguardando início do processamento...',
             'created_at': datetime.now(),
-            'data': [],
             'stats': {}
-        }
+        })
         
         # Redireciona para página de resultados primeiro (o processamento será feito via AJAX)
         return redirect(url_for('results', job_id=job_id))
@@ -268,51 +449,72 @@ def upload_file():
 @app.route('/results/<job_id>')
 def results(job_id):
     """Página de resultados"""
-    if job_id not in processing_jobs:
+    job = job_store.get(job_id)
+    if job is None:
         flash('Job não encontrado', 'error')
         return redirect(url_for('index'))
     
-    job = processing_jobs[job_id]
-    return render_template('results.html', job=job, format_currency_br=format_currency_br)
+    # A tabela carrega as páginas de registros sob demanda via /api/data
+    return render_template('results.html', job=job, format_currency_br=format_currency_br,
+                           parquet_available=PARQUET_AVAILABLE and 'parquet_path' in job)
 
 @app.route('/api/process/<job_id>', methods=['POST'])
 def api_process_job(job_id):
-    """API para iniciar processamento de um job"""
-    print(f"[DEBUG] Iniciando processamento do job {job_id}")
+    """API para iniciar processamento de um job (enfileira e retorna imediatamente)"""
+    log_event(logger, logging.DEBUG, 'job_processar', "Iniciando processamento do job", job=job_id)
     
-    if job_id not in processing_jobs:
-        print(f"[ERROR] Job {job_id} não encontrado")
+    job = job_store.get(job_id)
+    if job is None:
+        log_event(logger, logging.WARNING, 'job_nao_encontrado', "Job não encontrado", job=job_id)
         return jsonify({'error': 'Job não encontrado'}), 404
     
-    job = processing_jobs[job_id]
-    
     if job['status'] != 'processing':
-        print(f"[ERROR] Job {job_id} já foi processado. Status atual: {job['status']}")
+        log_event(logger, logging.WARNING, 'job_ja_processado', "Job já foi processado",
+                  job=job_id, status=job['status'])
         return jsonify({'error': 'Job já foi processado'}), 400
     
+    if job.get('enqueued'):
+        return jsonify({'success': True, 'message': 'Processamento já iniciado'})
+    
+    # Tempo limite opcional por job, nunca acima do configurado no servidor
+    timeout = min(request.args.get('timeout', JOB_TIMEOUT, type=int), JOB_TIMEOUT)
+    
     try:
-        print(f"[DEBUG] Processando arquivo: {job['file_path']}")
-        # Processa o arquivo
-        process_pdf_file(job['file_path'], job_id)
-        print(f"[DEBUG] Processamento do job {job_id} concluído")
-        return jsonify({'success': True, 'message': 'Processamento iniciado'})
-    except Exception as e:
-        print(f"[ERROR] Erro no processamento do job {job_id}: {str(e)}")
-        processing_jobs[job_id].update({
-            'status': 'error',
-            'message': f'Erro ao iniciar processamento: {str(e)}'
-        })
-        return jsonify({'error': str(e)}), 500
+        log_event(logger, logging.DEBUG, 'job_enfileirar', "Enfileirando arquivo", job=job_id, arquivo=job['file_path'])
+        position = job_runner.submit(job_id, job['file_path'], job_id, timeout=timeout)
+    except queue.Full:
+        log_event(logger, logging.WARNING, 'fila_cheia', "Fila cheia, job recusado", job=job_id)
+        return jsonify({'error': 'Fila de processamento cheia. Tente novamente em instantes.'}), 503
+    
+    job_store.update(job_id, {
+        'enqueued': True,
+        'message': f'Na fila de processamento (posição {position})...'
+    })
+    return jsonify({'success': True, 'message': 'Processamento iniciado', 'queue_position': position})
 
-@app.route('/api/job/<job_id>')
-def api_job_status(job_id):
-    """API para verificar status do job"""
-    if job_id not in processing_jobs:
+@app.route('/api/job/<job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    """API para cancelar um job na fila ou em execução"""
+    job = job_store.get(job_id)
+    if job is None:
         return jsonify({'error': 'Job não encontrado'}), 404
     
-    job = processing_jobs[job_id]
+    if job['status'] != 'processing' or not job.get('enqueued'):
+        return jsonify({'error': 'Job não está na fila nem em execução'}), 400
     
-    # Não retorna dados completos na API por performance
+    # O job pode estar na fila de outro worker: o pedido fica registrado no store
+    job_store.update(job_id, {'cancel_requested': True})
+    job_runner.cancel(job_id)
+    
+    return jsonify({'success': True, 'message': 'Cancelamento solicitado'})
+
+@app.route('/api/queue')
+def api_queue_status():
+    """API com o estado da fila de processamento"""
+    return jsonify(job_runner.stats())
+
+def job_status_payload(job):
+    """Resumo do job usado por /api/job e pelo stream de eventos (sem os registros)"""
     response = {
         'id': job['id'],
         'filename': job['filename'],
@@ -321,59 +523,143 @@ def api_job_status(job_id):
         'stats': job.get('stats', {})
     }
     
-    return jsonify(response)
+    # Andamento enquanto a extração está em andamento
+    if job['status'] == 'processing' and 'progress' in job:
+        response['progress'] = job['progress']
+    
+    # Prévia das primeiras páginas, até a extração completa terminar
+    if job['status'] == 'processing' and job.get('preview'):
+        response['preview'] = job['preview']
+    
+    return response
+
+@app.route('/api/job/<job_id>')
+def api_job_status(job_id):
+    """API para verificar status do job"""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    
+    # Não retorna dados completos na API por performance
+    return jsonify(job_status_payload(job))
+
+@app.route('/api/job/<job_id>/events')
+def api_job_events(job_id):
+    """
+    Stream SSE com o andamento do job
+    
+    Envia um evento 'progress' sempre que o job muda e um evento 'done'
+    quando ele termina (concluído ou com erro), encerrando o stream.
+    O estado é lido do store, então funciona com vários workers do gunicorn.
+    
+    O stream dura no máximo EVENTS_MAX_AGE segundos; o navegador reconecta
+    (retry) e recebe o estado atual logo no primeiro evento.
+    """
+    if job_store.get(job_id) is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    
+    def events():
+        last_payload = None
+        last_sent = time.monotonic()
+        deadline = last_sent + EVENTS_MAX_AGE
+        
+        # Intervalo de reconexão do EventSource quando o stream é encerrado
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        
+        while time.monotonic() < deadline:
+            job = job_store.get(job_id)
+            if job is None:
+                return
+            
+            payload = job_status_payload(job)
+            finished = payload['status'] != 'processing'
+            
+            if payload != last_payload:
+                last_payload = payload
+                last_sent = time.monotonic()
+                event = 'done' if finished else 'progress'
+                yield f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+            elif time.monotonic() - last_sent >= EVENTS_KEEPALIVE:
+                # Comentário SSE para manter a conexão aberta em proxies
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            
+            if finished:
+                return
+            
+            time.sleep(PROGRESS_INTERVAL)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 @app.route('/api/data/<job_id>')
 def api_job_data(job_id):
-    """API para obter dados do job"""
-    if job_id not in processing_jobs:
-        return jsonify({'error': 'Job não encontrado'}), 404
+    """
+    API para obter dados do job, paginados
     
-    job = processing_jobs[job_id]
+    Parâmetros (query string): offset, limit, sort (placa, data, valor_numerico),
+    order (asc, desc), fields (lista separada por vírgula), placa, data_inicio, data_fim
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
     
     if job['status'] != 'completed':
         return jsonify({'error': 'Job ainda não foi concluído'}), 400
     
-    return jsonify({
-        'data': job['data'],
-        'stats': job['stats']
-    })
+    fields = request.args.get('fields')
+    
+    try:
+        page = query_records(
+            job_store.load_records(job_id),
+            job_store.load_sort_index(job_id),
+            offset=request.args.get('offset', 0, type=int),
+            limit=request.args.get('limit', DEFAULT_LIMIT, type=int),
+            sort=request.args.get('sort', DEFAULT_SORT),
+            order=request.args.get('order', 'asc'),
+            fields=[field.strip() for field in fields.split(',') if field.strip()] if fields else None,
+            placa=request.args.get('placa'),
+            data_inicio=request.args.get('data_inicio'),
+            data_fim=request.args.get('data_fim')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    page['stats'] = job['stats']
+    return jsonify(page)
 
 @app.route('/download/<job_id>/<file_type>')
 def download_file(job_id, file_type):
     """Download de arquivos processados"""
-    if job_id not in processing_jobs:
+    job = job_store.get(job_id)
+    if job is None:
         flash('Job não encontrado', 'error')
         return redirect(url_for('index'))
     
-    job = processing_jobs[job_id]
-    
     if job['status'] != 'completed':
         flash('Processamento ainda não foi concluído', 'error')
         return redirect(url_for('results', job_id=job_id))
     
     try:
+        if file_type in ('excel', 'csv'):
+            ensure_exports(job)
+        
         if file_type == 'excel':
-            return send_file(job['excel_path'], as_attachment=True, download_name=job['excel_file'])
+            return send_export(job['excel_path'], job['excel_file'])
         elif file_type == 'csv':
-            return send_file(job['csv_path'], as_attachment=True, download_name=job['csv_file'])
+            return send_export(job['csv_path'], job['csv_file'])
+        elif file_type == 'parquet':
+            if not PARQUET_AVAILABLE:
+                flash('Formato Parquet indisponível neste servidor (pyarrow não instalado)', 'error')
+                return redirect(url_for('results', job_id=job_id))
+            ensure_parquet(job)
+            return send_export(job['parquet_path'], job['parquet_file'], mimetype='application/vnd.apache.parquet')
         elif file_type == 'both':
-            # Cria um ZIP com ambos os arquivos
-            memory_file = BytesIO()
-            
-            with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-                zf.write(job['excel_path'], job['excel_file'])
-                zf.write(job['csv_path'], job['csv_file'])
-            
-            memory_file.seek(0)
-            
-            zip_filename = f"dados_extraidos_{job_id}.zip"
-            return send_file(
-                memory_file,
-                mimetype='application/zip',
-                as_attachment=True,
-                download_name=zip_filename
-            )
+            # Pacote com ambos os arquivos, gravado uma vez e reaproveitado
+            ensure_bundle(job)
+            return send_export(job['zip_path'], job['zip_file'], mimetype='application/zip')
         else:
             flash('Tipo de arquivo inválido', 'error')
             return redirect(url_for('results', job_id=job_id))
@@ -385,52 +671,42 @@ def download_file(job_id, file_type):
 @app.route('/dashboard')
 def dashboard():
     """Dashboard com histórico de processamentos"""
-    # Ordena jobs por data de criação (mais recentes primeiro)
-    jobs_list = sorted(
-        processing_jobs.values(),
-        key=lambda x: x['created_at'],
-        reverse=True
-    )
+    # Apenas os jobs mais recentes (consulta limitada pelo índice de created_at)
+    jobs_list = job_store.list(limit=DASHBOARD_RECENT_JOBS)
     
-    # Estatísticas gerais
-    total_jobs = len(jobs_list)
-    completed_jobs = len([j for j in jobs_list if j['status'] == 'completed'])
-    total_records = sum([j.get('stats', {}).get('total_registros', 0) for j in jobs_list])
-    
-    dashboard_stats = {
-        'total_jobs': total_jobs,
-        'completed_jobs': completed_jobs,
-        'success_rate': (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
-        'total_records': total_records
-    }
+    # Estatísticas gerais, mantidas pelo store a cada mudança de estado dos jobs
+    dashboard_stats = job_store.stats()
     
     return render_template('dashboard.html', jobs=jobs_list, stats=dashboard_stats)
 
 @app.route('/api/dashboard/stats')
 def api_dashboard_stats():
     """API para estatísticas do dashboard"""
-    jobs_list = list(processing_jobs.values())
-    
-    total_jobs = len(jobs_list)
-    completed_jobs = len([j for j in jobs_list if j['status'] == 'completed'])
-    error_jobs = len([j for j in jobs_list if j['status'] == 'error'])
-    processing_jobs_count = len([j for j in jobs_list if j['status'] == 'processing'])
-    
-    total_records = sum([j.get('stats', {}).get('total_registros', 0) for j in jobs_list])
-    total_placas = sum([j.get('stats', {}).get('placas_unicas', 0) for j in jobs_list])
-    
-    stats = {
-        'total_jobs': total_jobs,
-        'completed_jobs': completed_jobs,
-        'error_jobs': error_jobs,
-        'processing_jobs': processing_jobs_count,
-        'success_rate': (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
-        'total_records': total_records,
-        'total_placas': total_placas
-    }
+    stats = job_store.stats()
+    stats.update({
+        'cache': result_cache.stats(),
+        'queue': job_runner.stats()
+    })
     
     return jsonify(stats)
 
+@app.route('/metrics')
+def metrics():
+    """Métricas no formato texto do Prometheus (somadas entre todos os jobs)"""
+    queue_stats = job_runner.stats()
+    cache_stats = result_cache.stats()
+    
+    extra = {
+        'fila_jobs': ('gauge', 'Jobs aguardando na fila deste worker', queue_stats['queue_depth']),
+        'jobs_em_execucao': ('gauge', 'Jobs em execução neste worker', queue_stats['running']),
+        'cache_hits_total': ('counter', 'Acertos do cache de resultados', cache_stats['hits']),
+        'cache_misses_total': ('counter', 'Falhas do cache de resultados', cache_stats['misses']),
+        'cache_bytes': ('gauge', 'Tamanho do cache de resultados em disco', cache_stats['bytes'])
+    }
+    
+    return Response(render_prometheus(job_store.counters(), extra),
+                    mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(413)
 def too_large(e):
     flash('Arquivo muito grande. Tamanho máximo: 50MB', 'error')
@@ -444,6 +720,14 @@ def not_found(e):
 def internal_error(e):
     return render_template('500.html'), 500
 
+def check_job_store():
+    """Verifica se o armazenamento de jobs responde"""
+    try:
+        job_store.list(limit=1)
+        return 'ok'
+    except Exception as e:
+        return f'error: {str(e)}'
+
 @app.route('/health')
 def health_check():
     """Health check endpoint para Docker/CasaOS"""
@@ -459,7 +743,7 @@ def health_check():
             'version': '1.0.0',
             'uptime': time.time() - health_check.start_time,
             'checks': {
-                'database': 'ok',
+                'database': check_job_store(),
                 'filesystem': 'ok' if os.path.exists('uploads') and os.path.exists('results') else 'error',
                 'imports': 'ok'
             }
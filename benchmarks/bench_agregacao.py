@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark da agregação por placa e data e por placa: agregador incremental
+em Python (antes) versus a agregação vetorizada com pandas (depois), sobre
+os registros brutos de um extrato sintético já reunidos em um RecordBatch,
+como em um processamento em lote consolidado.
+
+Uso:
+    python benchmarks/bench_agregacao.py [--linhas 500000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from extrator_pdf import PDFExtractor
+from gerador_extrato import gerar_linhas
+from record_batch import RecordBatch
+from structured_log import setup_logging
+
+LINHAS_POR_PAGINA = 50
+
+
+def gerar_registros(total_linhas):
+    """Registros brutos das linhas sintéticas, em páginas de LINHAS_POR_PAGINA linhas"""
+    extractor = PDFExtractor('sintetico.pdf')
+    linhas = list(gerar_linhas(total_linhas))
+    batch = RecordBatch()
+    for pagina, inicio in enumerate(range(0, len(linhas), LINHAS_POR_PAGINA), 1):
+        extractor._process_text('\n'.join(linhas[inicio:inicio + LINHAS_POR_PAGINA]), pagina, batch)
+    return batch
+
+
+def medir(funcao, registros):
+    """Executa a agregação e retorna (segundos, resultado)"""
+    inicio = time.perf_counter()
+    resultado = funcao(registros)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da agregação incremental x vetorizada")
+    parser.add_argument("--linhas", type=int, default=500_000, help="Linhas sintéticas do extrato")
+    args = parser.parse_args()
+    
+    setup_logging(level='WARNING')
+    
+    print(f"Gerando registros a partir de {args.linhas:,} linhas sintéticas...")
+    registros = gerar_registros(args.linhas)
+    print(f"Registros brutos: {len(registros):,}")
+    
+    python = PDFExtractor('sintetico.pdf', aggregation='python')
+    pandas = PDFExtractor('sintetico.pdf', aggregation='pandas')
+    
+    for nome, metodo in (('placa + data', '_process_by_placa_and_date'), ('placa', '_aggregate_by_placa')):
+        tempo_antes, antes = medir(getattr(python, metodo), registros)
+        tempo_depois, depois = medir(getattr(pandas, metodo), registros)
+        print(f"\nAgregação por {nome} ({len(antes):,} grupos):")
+        print(f"  Antes  (Python): {tempo_antes:.2f}s")
+        print(f"  Depois (pandas): {tempo_depois:.2f}s")
+        print(f"  Ganho: {tempo_antes / tempo_depois:.2f}x")
+        print(f"  Saída idêntica: {'sim' if antes == depois else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark da conversão de valores: heurísticas antigas em todo valor
+(antes) versus o caminho rápido com memorização do MoneyParser (depois).
+Os valores vêm de um extrato sintético, já limpos por _clean_valor, como
+chegam ao agregador.
+
+Uso:
+    python benchmarks/bench_money.py [--valores 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from extrator_pdf import PDFExtractor, tokenize_line
+from gerador_extrato import gerar_linhas
+from money import MoneyParser, parse_slow
+
+
+def coletar_valores(total_valores):
+    """Extrai valores das linhas sintéticas até completar total_valores"""
+    extractor = PDFExtractor('sintetico.pdf')
+    valores = []
+    for linha in gerar_linhas(total_valores):
+        for valor in tokenize_line(linha)[2]:
+            valores.append(extractor._clean_valor(valor))
+            if len(valores) >= total_valores:
+                return valores
+    return valores
+
+
+def medir(converter, valores):
+    """Converte todos os valores e retorna (segundos, soma em centavos)"""
+    inicio = time.perf_counter()
+    soma = 0
+    for valor in valores:
+        soma += converter(valor)
+    return time.perf_counter() - inicio, soma
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da conversão de valores monetários")
+    parser.add_argument("--valores", type=int, default=1_000_000, help="Quantidade de valores convertidos")
+    args = parser.parse_args()
+    
+    print(f"Gerando {args.valores:,} valores a partir de um extrato sintético...")
+    valores = coletar_valores(args.valores)
+    distintos = len(set(valores))
+    
+    tempo_antes, soma_antes = medir(lambda valor: round(parse_slow(valor)[0] * 100), valores)
+    tempo_sem_memo, soma_sem_memo = medir(MoneyParser(memo_size=0).centavos, valores)
+    tempo_depois, soma_depois = medir(MoneyParser().centavos, valores)
+    
+    total = len(valores)
+    print(f"Valores distintos: {distintos:,} de {total:,}")
+    print(f"Antes  (heurísticas):            {total / tempo_antes:>12,.0f} valores/s ({tempo_antes:.2f}s)")
+    print(f"Caminho rápido sem memorização:  {total / tempo_sem_memo:>12,.0f} valores/s ({tempo_sem_memo:.2f}s)")
+    print(f"Depois (rápido + memorização):   {total / tempo_depois:>12,.0f} valores/s ({tempo_depois:.2f}s)")
+    print(f"Ganho: {tempo_antes / tempo_depois:.2f}x")
+    print(f"Somas idênticas: {'sim' if soma_antes == soma_sem_memo == soma_depois else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
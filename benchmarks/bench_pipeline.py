@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do pipeline completo em extratos sintéticos de 1 a 2000 páginas.
+Mede cada etapa separadamente (abertura do PDF, extração de texto e de
+tabelas por página, parsing das linhas, agregação por placa e data e
+exportação) e grava os resultados em JSON para comparar execuções.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--paginas 1 10 100] [--saida resultados.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pdfplumber
+
+# Adiciona o diretório pai ao path para importar o módulo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from extrator_pdf import EXTRACTOR_VERSION, PDFExtractor
+from gerador_extrato import escrever_pdf
+from record_batch import RecordBatch
+
+MAX_PAGINAS = 2000
+
+
+def _resumo_tempos(tempos):
+    """Total, média, mediana e máximo de uma lista de tempos por página"""
+    if not tempos:
+        return {'total_s': 0.0, 'media_s': 0.0, 'mediana_s': 0.0, 'max_s': 0.0}
+    return {
+        'total_s': sum(tempos),
+        'media_s': statistics.mean(tempos),
+        'mediana_s': statistics.median(tempos),
+        'max_s': max(tempos)
+    }
+
+
+def _versao_git():
+    """Commit atual do repositório (None fora de um checkout git)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir_pipeline(pdf_path, pasta_saida, tabelas=True):
+    """
+    Executa as etapas do pipeline uma a uma medindo o tempo de cada uma
+    
+    Args:
+        pdf_path (str): PDF a processar
+        pasta_saida (str): Pasta dos arquivos exportados
+        tabelas (bool): Mede também a extração de tabelas por página
+    
+    Returns:
+        dict: Tempos por etapa e contagens de registros
+    """
+    extractor = PDFExtractor(pdf_path, strategy='text')
+    etapas = {}
+    
+    inicio = time.perf_counter()
+    pdf = pdfplumber.open(pdf_path)
+    paginas = pdf.pages
+    etapas['abrir_pdf'] = {'total_s': time.perf_counter() - inicio}
+    
+    try:
+        textos = []
+        tempos_texto = []
+        tempos_tabelas = []
+        
+        for page in paginas:
+            inicio = time.perf_counter()
+            textos.append(page.extract_text() or '')
+            tempos_texto.append(time.perf_counter() - inicio)
+            
+            if tabelas:
+                inicio = time.perf_counter()
+                page.extract_tables()
+                tempos_tabelas.append(time.perf_counter() - inicio)
+        
+        etapas['extrair_texto'] = _resumo_tempos(tempos_texto)
+        if tabelas:
+            etapas['extrair_tabelas'] = _resumo_tempos(tempos_tabelas)
+    finally:
+        pdf.close()
+    
+    inicio = time.perf_counter()
+    brutos = RecordBatch()
+    for page_num, texto in enumerate(textos, 1):
+        extractor._process_text(texto, page_num, brutos)
+    etapas['parsing'] = {'total_s': time.perf_counter() - inicio}
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        extractor.data = extractor._process_by_placa_and_date(brutos)
+        etapas['agregacao'] = {'total_s': time.perf_counter() - inicio}
+        
+        inicio = time.perf_counter()
+        extractor.save_to_excel(os.path.join(pasta_saida, 'saida.xlsx'))
+        etapas['exportar_excel'] = {'total_s': time.perf_counter() - inicio}
+        
+        inicio = time.perf_counter()
+        extractor.save_to_csv(os.path.join(pasta_saida, 'saida.csv'))
+        etapas['exportar_csv'] = {'total_s': time.perf_counter() - inicio}
+    
+    return {
+        'registros_brutos': len(brutos),
+        'registros': len(extractor.data),
+        'etapas': etapas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por etapa do pipeline de extração")
+    parser.add_argument("--paginas", type=int, nargs='+', default=[1, 10, 100],
+                        help=f"Tamanhos de extrato a medir (1 a {MAX_PAGINAS} páginas)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Execuções por tamanho (fica a mais rápida)")
+    parser.add_argument("--sem-tabelas", action='store_true', help="Não mede extract_tables por página")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador de extratos")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de resultados")
+    args = parser.parse_args()
+    
+    if any(not 1 <= paginas <= MAX_PAGINAS for paginas in args.paginas):
+        parser.error(f"--paginas deve estar entre 1 e {MAX_PAGINAS}")
+    
+    saida = args.saida or f"bench_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    resultados = []
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        for num_paginas in args.paginas:
+            pdf_path = os.path.join(pasta, f"extrato_{num_paginas}.pdf")
+            tamanho = escrever_pdf(pdf_path, num_paginas, seed=args.seed)
+            
+            execucoes = []
+            for _ in range(max(1, args.repeticoes)):
+                inicio = time.perf_counter()
+                medicao = medir_pipeline(pdf_path, pasta, tabelas=not args.sem_tabelas)
+                medicao['total_s'] = time.perf_counter() - inicio
+                execucoes.append(medicao)
+            
+            melhor = min(execucoes, key=lambda medicao: medicao['total_s'])
+            melhor.update({
+                'paginas': num_paginas,
+                'tamanho_pdf_bytes': tamanho,
+                'paginas_por_s': num_paginas / melhor['total_s']
+            })
+            resultados.append(melhor)
+            
+            print(f"{num_paginas:>5} páginas: {melhor['total_s']:.2f}s "
+                  f"({melhor['paginas_por_s']:.1f} páginas/s, {melhor['registros']:,} registros)")
+            for etapa, tempos in melhor['etapas'].items():
+                print(f"      {etapa:<16} {tempos['total_s']:.3f}s")
+    
+    relatorio = {
+        'data': datetime.now().isoformat(),
+        'versao_extrator': EXTRACTOR_VERSION,
+        'commit': _versao_git(),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'pdfplumber': pdfplumber.__version__
+        },
+        'parametros': {
+            'paginas': args.paginas,
+            'repeticoes': args.repeticoes,
+            'tabelas': not args.sem_tabelas,
+            'seed': args.seed
+        },
+        'resultados': resultados
+    }
+    
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"Resultados salvos em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gerador determinístico de extratos de combustível sintéticos.
+Produz páginas no mesmo layout esperado por PDFExtractor._process_text:
+cabeçalhos PLACA DATA PRODUTO, linhas de placa, continuações e TOTAL R$.
+As páginas podem ser gravadas em um PDF de texto (1 a 2000 páginas).
+
+Uso:
+    python benchmarks/gerador_extrato.py extrato.pdf [--paginas 100] [--seed 42]
+"""
+
+import argparse
+import random
+from typing import Iterable, Iterator, List
+
+PRODUTOS = ['GASOLINA COMUM', 'ETANOL', 'DIESEL S10', 'ARLA 32', 'GASOLINA ADITIVADA']
+LETRAS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _gerar_placa(rng: random.Random) -> str:
+    """Gera uma placa no formato antigo (ABC1234) ou Mercosul (ABC1D23)"""
+    prefixo = ''.join(rng.choice(LETRAS) for _ in range(3))
+    if rng.random() < 0.5:
+        return f"{prefixo}{rng.randint(0, 9999):04d}"
+    return f"{prefixo}{rng.randint(0, 9)}{rng.choice(LETRAS)}{rng.randint(0, 99):02d}"
+
+
+def _formatar_centavos(centavos: int) -> str:
+    """Formata centavos no padrão brasileiro (1.234,56)"""
+    inteiro = f"{centavos // 100:,}".replace(',', '.')
+    return f"{inteiro},{centavos % 100:02d}"
+
+
+def gerar_paginas(num_paginas: int, grupos_por_pagina: int = 6, seed: int = 42) -> Iterator[List[str]]:
+    """
+    Gera as linhas de texto de cada página do extrato
+    
+    Args:
+        num_paginas (int): Quantidade de páginas
+        grupos_por_pagina (int): Grupos de placa (abastecimentos + TOTAL R$) por página
+        seed (int): Semente para gerar sempre o mesmo extrato
+        
+    Yields:
+        List[str]: Linhas de uma página
+    """
+    rng = random.Random(seed)
+    
+    for _ in range(num_paginas):
+        linhas = ['MOTORISTA FROTA', 'PLACA DATA PRODUTO QTD VALOR TOTAL']
+        
+        for _ in range(grupos_por_pagina):
+            placa = _gerar_placa(rng)
+            total = 0
+            
+            for indice in range(rng.randint(1, 4)):
+                data = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025"
+                valor = rng.randint(1000, 250000)
+                quantidade = f"{rng.randint(1, 300)},{rng.randint(0, 999):03d}"
+                produto = rng.choice(PRODUTOS)
+                total += valor
+                
+                prefixo = f"{placa} " if indice == 0 else ''
+                linhas.append(f"{prefixo}{data} {produto} {_formatar_centavos(valor)} {quantidade}")
+            
+            linhas.append(f"TOTAL R$ {_formatar_centavos(total)}")
+        
+        yield linhas
+
+
+def gerar_linhas(total_linhas: int, seed: int = 42) -> Iterator[str]:
+    """
+    Gera exatamente total_linhas linhas de extrato, página após página
+    
+    Args:
+        total_linhas (int): Quantidade de linhas
+        seed (int): Semente para gerar sempre o mesmo extrato
+        
+    Yields:
+        str: Linha do extrato
+    """
+    gerado = 0
+    paginas = gerar_paginas(total_linhas, seed=seed)
+    
+    while gerado < total_linhas:
+        for linha in next(paginas):
+            if gerado >= total_linhas:
+                return
+            yield linha
+            gerado += 1
+
+
+def _escapar_pdf(texto: str) -> bytes:
+    """Escapa uma linha para uma string literal de PDF"""
+    texto = texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return texto.encode('latin-1')
+
+
+def escrever_pdf(caminho: str, num_paginas: int, grupos_por_pagina: int = 6, seed: int = 42) -> int:
+    """
+    Grava o extrato sintético em um PDF de texto (fonte Helvetica, uma linha por instrução)
+    
+    Args:
+        caminho (str): Caminho do PDF de saída
+        num_paginas (int): Quantidade de páginas
+        grupos_por_pagina (int): Grupos de placa por página
+        seed (int): Semente para gerar sempre o mesmo extrato
+        
+    Returns:
+        int: Tamanho do arquivo em bytes
+    """
+    if num_paginas < 1:
+        raise ValueError("O extrato precisa de pelo menos uma página")
+    
+    return escrever_paginas_pdf(caminho, gerar_paginas(num_paginas, grupos_por_pagina, seed), num_paginas)
+
+
+def escrever_paginas_pdf(caminho: str, paginas: Iterable[List[str]], num_paginas: int) -> int:
+    """
+    Grava páginas de texto quaisquer em um PDF (também usado nos testes com outros layouts)
+    
+    O arquivo é escrito página a página, sem manter o documento inteiro em
+    memória. Objetos: 1 catálogo, 2 árvore de páginas, 3 fonte e, para cada
+    página, o conteúdo seguido do objeto da página.
+    
+    Args:
+        caminho (str): Caminho do PDF de saída
+        paginas (Iterable[List[str]]): Linhas de cada página
+        num_paginas (int): Quantidade de páginas geradas por paginas
+        
+    Returns:
+        int: Tamanho do arquivo em bytes
+    """
+    offsets = []
+    
+    with open(caminho, 'wb') as f:
+        def objeto(corpo: bytes):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % len(offsets) + corpo + b"\nendobj\n")
+        
+        f.write(b"%PDF-1.4\n")
+        objeto(b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = b" ".join(b"%d 0 R" % (5 + 2 * indice) for indice in range(num_paginas))
+        objeto(b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % num_paginas)
+        objeto(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        
+        for linhas in paginas:
+            conteudo = b"BT /F1 9 Tf 11 TL 40 800 Td " + b"".join(
+                b"(" + _escapar_pdf(linha) + b") Tj T* " for linha in linhas
+            ) + b"ET"
+            objeto(b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+            objeto(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                b"/Resources << /Font << /F1 3 0 R >> >> >>" % len(offsets)
+            )
+        
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1))
+        f.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref))
+        
+        return f.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um extrato de combustível sintético em PDF")
+    parser.add_argument("saida", help="Caminho do PDF gerado")
+    parser.add_argument("--paginas", type=int, default=100, help="Quantidade de páginas (1 a 2000)")
+    parser.add_argument("--grupos", type=int, default=6, help="Grupos de placa por página")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador")
+    args = parser.parse_args()
+    
+    if not 1 <= args.paginas <= 2000:
+        parser.error("--paginas deve estar entre 1 e 2000")
+    
+    tamanho = escrever_pdf(args.saida, args.paginas, args.grupos, args.seed)
+    print(f"{args.saida}: {args.paginas} páginas, {tamanho / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
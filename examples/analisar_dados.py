@@ -11,12 +11,24 @@ import os
 import sys
 from datetime import datetime
 
+def total_numerico(totais):
+    """
+    Converte a coluna 'total' em float
+    
+    O CSV traz o valor em texto no formato brasileiro ('1.234,56'); o Excel
+    e o Parquet já trazem o valor numérico.
+    """
+    if pd.api.types.is_numeric_dtype(totais):
+        return totais.astype(float)
+    texto = totais.astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
 def analisar_dados(arquivo_dados):
     """
     Analisa os dados extraídos e gera relatórios
     
     Args:
-        arquivo_dados (str): Caminho para o arquivo CSV ou Excel com os dados
+        arquivo_dados (str): Caminho para o arquivo CSV, Excel ou Parquet com os dados
     """
     
     try:
@@ -25,8 +37,16 @@ def analisar_dados(arquivo_dados):
             df = pd.read_excel(arquivo_dados)
         elif arquivo_dados.endswith('.csv'):
             df = pd.read_csv(arquivo_dados, encoding='utf-8-sig')
+            if 'valor_centavos' in df.columns:
+                # Valor exato exportado junto com o texto, como no Parquet
+                df['total'] = df['valor_centavos'] / 100
+        elif arquivo_dados.endswith('.parquet'):
+            # Já tipado: data como data, total como decimal, placa categórica
+            df = pd.read_parquet(arquivo_dados)
+            df['data'] = pd.to_datetime(df['data'])
+            df['total'] = df['valor_centavos'] / 100
         else:
-            print("❌ Formato de arquivo não suportado. Use .xlsx ou .csv")
+            print("❌ Formato de arquivo não suportado. Use .xlsx, .csv ou .parquet")
             return
         
         print(f"📊 ANÁLISE DOS DADOS: {os.path.basename(arquivo_dados)}")
@@ -85,7 +105,7 @@ def analisar_dados(arquivo_dados):
                 
                 try:
                     # Converte valores para float
-                    valores_numericos = valores_validos.str.replace(',', '.').astype(float)
+                    valores_numericos = total_numerico(valores_validos)
                     valores_limpos = valores_numericos.dropna()
                     
                     if len(valores_limpos) > 0:
@@ -166,13 +186,11 @@ def gerar_relatorio_detalhado(df, arquivo_original):
             if 'placa' in df.columns and 'total' in df.columns:
                 try:
                     df_valores = df.copy()
-                    df_valores['total_numerico'] = pd.to_numeric(
-                        df_valores['total'].str.replace(',', '.'), errors='coerce'
-                    )
+                    df_valores['total_numerico'] = total_numerico(df_valores['total'])
                     
                     resumo_placas = df_valores.groupby('placa').agg({
                         'total_numerico': ['count', 'sum', 'mean'],
-                        'data': lambda x: ', '.join(x.dropna().unique())
+                        'data': lambda x: ', '.join(x.dropna().astype(str).unique())
                     }).round(2)
                     
                     resumo_placas.columns = ['Qtd_Registros', 'Total_Valor', 'Valor_Medio', 'Datas']
@@ -215,7 +233,7 @@ def main():
     if len(sys.argv) < 2:
         # Lista arquivos disponíveis
         arquivos_dados = []
-        for ext in ['*.csv', '*.xlsx']:
+        for ext in ['*.csv', '*.xlsx', '*.parquet']:
             arquivos_dados.extend([f for f in os.listdir('.') if f.endswith(ext.replace('*', ''))])
         
         if arquivos_dados:
@@ -4,138 +4,416 @@
 """
 Script para processar múltiplos PDFs em lote.
 Processa todos os PDFs em uma pasta e consolida os resultados.
+
+Os arquivos são extraídos em paralelo por um pool de processos, com um
+número limitado de arquivos em andamento, e cada registro é gravado no
+Excel/CSV consolidado assim que o seu arquivo termina (nada de manter o
+lote inteiro em memória). Um PDF com erro não interrompe os demais.
+
+Ao lado do consolidado fica um manifesto (<saida>.manifest.json) com
+caminho, tamanho, data de modificação, SHA-256, versão do extrator e
+quantidade de registros de cada PDF. Rodando de novo com a mesma saída,
+só os PDFs novos ou alterados são extraídos; os registros dos demais são
+copiados do CSV consolidado anterior.
+
+Uso:
+    python processar_lote.py [pasta] [-j 4] [--pendentes 8] [-o dados_consolidados] [--completo]
 """
 
 import os
+import csv
 import glob
-import pandas as pd
+import hashlib
+import json
 import sys
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
 # Adiciona o diretório pai ao path para importar o módulo
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from extrator_pdf import PDFExtractor
+from extrator_pdf import EXTRACTOR_VERSION, PDFExtractor, preflight
+from exporters import EXPORT_COLUMNS, export_records
+from money import format_centavos
+from structured_log import setup_logging
 from datetime import datetime
 
-def processar_multiplos_pdfs(pasta_pdfs="."):
+# Colunas do arquivo consolidado
+COLUMNS_CONSOLIDADO = ('arquivo_fonte',) + EXPORT_COLUMNS
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+def listar_pdfs(pasta_pdfs):
+    """Lista os PDFs da pasta (extensão em minúsculo ou maiúsculo), em ordem de nome"""
+    arquivos_pdf = glob.glob(os.path.join(pasta_pdfs, "*.pdf"))
+    arquivos_pdf.extend(glob.glob(os.path.join(pasta_pdfs, "*.PDF")))
+    return sorted(set(arquivos_pdf))
+
+def hash_arquivo(arquivo_pdf):
+    """SHA-256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(arquivo_pdf, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def assinatura_arquivo(arquivo_pdf, sha256=None):
+    """
+    Entrada do manifesto para um PDF (sem a quantidade de registros)
+    
+    Args:
+        arquivo_pdf (str): Caminho do PDF
+        sha256 (str): Hash já calculado (None para calcular)
+    
+    Returns:
+        dict: caminho, tamanho, mtime, sha256 e versao_extrator
+    """
+    stat = os.stat(arquivo_pdf)
+    return {
+        'caminho': os.path.abspath(arquivo_pdf),
+        'tamanho': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sha256': sha256 or hash_arquivo(arquivo_pdf),
+        'versao_extrator': EXTRACTOR_VERSION
+    }
+
+def carregar_manifesto(caminho):
+    """Lê o manifesto (por nome de arquivo); vazio se não existir ou estiver corrompido"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)['arquivos']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def salvar_manifesto(caminho, arquivos):
+    """Grava o manifesto de forma atômica"""
+    tmp_path = f"{caminho}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'versao_extrator': EXTRACTOR_VERSION, 'arquivos': arquivos}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, caminho)
+
+def classificar_arquivos(arquivos_pdf, manifesto):
+    """
+    Separa os PDFs que precisam ser extraídos dos que não mudaram desde o manifesto
+    
+    Tamanho e data de modificação iguais bastam; se só a data mudou, o
+    hash decide (arquivo copiado ou tocado sem alteração de conteúdo).
+    
+    Args:
+        arquivos_pdf (list): PDFs da pasta
+        manifesto (dict): Entradas do manifesto anterior, por nome de arquivo
+    
+    Returns:
+        tuple: (PDFs a extrair, entradas reaproveitadas por nome de arquivo)
+    """
+    a_extrair, reaproveitados = [], {}
+    for arquivo_pdf in arquivos_pdf:
+        nome_arquivo = os.path.basename(arquivo_pdf)
+        entrada = manifesto.get(nome_arquivo)
+        if entrada is not None and entrada.get('versao_extrator') == EXTRACTOR_VERSION:
+            stat = os.stat(arquivo_pdf)
+            if stat.st_size == entrada['tamanho'] and stat.st_mtime == entrada['mtime']:
+                reaproveitados[nome_arquivo] = entrada
+                continue
+            if stat.st_size == entrada['tamanho'] and hash_arquivo(arquivo_pdf) == entrada['sha256']:
+                reaproveitados[nome_arquivo] = dict(entrada, **assinatura_arquivo(arquivo_pdf, entrada['sha256']))
+                continue
+        a_extrair.append(arquivo_pdf)
+    return a_extrair, reaproveitados
+
+def registros_anteriores(arquivo_csv, nomes_arquivos):
+    """
+    Registros dos PDFs informados, lidos em streaming do CSV consolidado anterior
+    
+    Args:
+        arquivo_csv (str): CSV consolidado da execução anterior
+        nomes_arquivos (set): Valores de arquivo_fonte a manter
+    
+    Yields:
+        dict: Registro com pagina e valor_centavos de volta como inteiros
+    """
+    with open(arquivo_csv, 'r', encoding='utf-8-sig', newline='') as f:
+        for registro in csv.DictReader(f):
+            if registro['arquivo_fonte'] in nomes_arquivos:
+                for coluna in ('pagina', 'valor_centavos'):
+                    registro[coluna] = int(registro[coluna]) if registro.get(coluna) else None
+                yield registro
+
+def extrair_arquivo(arquivo_pdf):
+    """
+    Extrai um PDF (executado nos processos do pool)
+    
+    Args:
+        arquivo_pdf (str): Caminho do PDF
+    
+    Returns:
+        tuple: (registros, erro, assinatura) - erro é None em caso de sucesso;
+            a assinatura (entrada do manifesto) é calculada aqui para o hash
+            também rodar em paralelo
+    """
+    try:
+        # PDFs digitalizados ou de outro layout são recusados sem extração
+        check = preflight(arquivo_pdf)
+        if check['motivo']:
+            return [], check['motivo'], None
+        assinatura = assinatura_arquivo(arquivo_pdf)
+        return PDFExtractor(arquivo_pdf, strategy=check['estrategia']).extract_data(), None, assinatura
+    except Exception as e:
+        return [], str(e), None
+
+def extrair_isolado(arquivo_pdf):
+    """
+    Extrai um PDF sozinho, em um processo próprio
+    
+    Usado para os arquivos que estavam em andamento quando um processo do
+    pool morreu: só o arquivo que derrubar o próprio processo falha.
+    
+    Args:
+        arquivo_pdf (str): Caminho do PDF
+    
+    Returns:
+        tuple: (registros, erro, assinatura), como extrair_arquivo
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(extrair_arquivo, arquivo_pdf).result()
+        except BrokenProcessPool:
+            return [], "processo de extração encerrado de forma anormal", None
+
+def extrair_em_paralelo(arquivos_pdf, workers, max_pendentes):
+    """
+    Extrai os PDFs em paralelo, entregando cada resultado assim que fica pronto
+    
+    No máximo max_pendentes arquivos ficam em andamento (ou aguardando
+    consumo) ao mesmo tempo, o que limita a memória ocupada por resultados.
+    
+    Se um processo do pool morre (os._exit, OOM), o pool inteiro fica
+    inutilizável e não há como saber qual arquivo o derrubou: os arquivos
+    em andamento são extraídos de novo, um de cada vez e isolados, e o
+    restante segue em um pool novo.
+    
+    Args:
+        arquivos_pdf (list): PDFs a extrair
+        workers (int): Processos do pool
+        max_pendentes (int): Arquivos em andamento ao mesmo tempo
+    
+    Yields:
+        tuple: (arquivo_pdf, registros, erro, assinatura), na ordem de conclusão
+    """
+    fila = iter(arquivos_pdf)
+    pendentes = {}
+    # Arquivos em andamento quando o pool quebrou
+    suspeitos = []
+    
+    def completar_fila(executor):
+        while len(pendentes) < max_pendentes:
+            arquivo_pdf = next(fila, None)
+            if arquivo_pdf is None:
+                return
+            try:
+                pendentes[executor.submit(extrair_arquivo, arquivo_pdf)] = arquivo_pdf
+            except BrokenProcessPool:
+                suspeitos.append(arquivo_pdf)
+                return
+    
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        completar_fila(executor)
+        while pendentes or suspeitos:
+            if pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for future in prontos:
+                    arquivo_pdf = pendentes.pop(future)
+                    try:
+                        registros, erro, assinatura = future.result()
+                    except BrokenProcessPool:
+                        suspeitos.append(arquivo_pdf)
+                        continue
+                    except Exception as e:
+                        registros, erro, assinatura = [], str(e) or type(e).__name__, None
+                    yield arquivo_pdf, registros, erro, assinatura
+            
+            if suspeitos:
+                # Os demais em andamento também vão falhar com o pool quebrado
+                suspeitos.extend(pendentes.values())
+                pendentes.clear()
+                executor.shutdown(wait=True)
+                for arquivo_pdf in suspeitos:
+                    yield (arquivo_pdf,) + tuple(extrair_isolado(arquivo_pdf))
+                suspeitos.clear()
+                executor = ProcessPoolExecutor(max_workers=workers)
+            
+            completar_fila(executor)
+    finally:
+        executor.shutdown(wait=True)
+
+def processar_multiplos_pdfs(pasta_pdfs=".", workers=None, max_pendentes=None, saida=None, completo=False):
     """
     Processa todos os PDFs em uma pasta
     
     Args:
         pasta_pdfs (str): Caminho da pasta com os PDFs
+        workers (int): Processos de extração (None = todos os núcleos)
+        max_pendentes (int): Arquivos em andamento ao mesmo tempo (None = 2 por processo)
+        saida (str): Caminho base dos arquivos consolidados, sem extensão
+            (None = dados_consolidados_<timestamp> na pasta atual)
+        completo (bool): Ignora o manifesto e extrai todos os PDFs de novo
     """
-    # Encontra todos os PDFs na pasta
-    padrao_pdf = os.path.join(pasta_pdfs, "*.pdf")
-    arquivos_pdf = glob.glob(padrao_pdf, recursive=False)
-    
-    # Também procura por PDFs em maiúsculo
-    padrao_pdf_maiusculo = os.path.join(pasta_pdfs, "*.PDF")
-    arquivos_pdf.extend(glob.glob(padrao_pdf_maiusculo, recursive=False))
+    arquivos_pdf = listar_pdfs(pasta_pdfs)
     
     if not arquivos_pdf:
         print(f"❌ Nenhum arquivo PDF encontrado em: {pasta_pdfs}")
         return
     
-    print(f"📁 Encontrados {len(arquivos_pdf)} arquivo(s) PDF:")
+    workers = workers or os.cpu_count() or 1
+    max_pendentes = max(max_pendentes or 2 * workers, workers)
+    
+    if not saida:
+        saida = f"dados_consolidados_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    arquivo_excel = f"{saida}.xlsx"
+    arquivo_csv = f"{saida}.csv"
+    arquivo_manifesto = f"{saida}{MANIFEST_SUFFIX}"
+    
+    # Execução incremental: só vale se o CSV consolidado anterior ainda existir
+    manifesto = {} if completo or not os.path.exists(arquivo_csv) else carregar_manifesto(arquivo_manifesto)
+    a_extrair, reaproveitados = classificar_arquivos(arquivos_pdf, manifesto)
+    removidos = sorted(set(manifesto) - {os.path.basename(arquivo) for arquivo in arquivos_pdf})
+    
+    print(f"📁 Encontrados {len(arquivos_pdf)} arquivo(s) PDF ({workers} processo(s) em paralelo):")
     for i, arquivo in enumerate(arquivos_pdf, 1):
-        print(f"  {i}. {os.path.basename(arquivo)}")
+        situacao = "" if arquivo in a_extrair else " (sem alteração)"
+        print(f"  {i}. {os.path.basename(arquivo)}{situacao}")
+    for nome_arquivo in removidos:
+        print(f"  -  {nome_arquivo} (removido da pasta)")
+    
+    if manifesto and not a_extrair and not removidos:
+        # Nada mudou: o consolidado atual continua válido
+        salvar_manifesto(arquivo_manifesto, reaproveitados)
+        print(f"\n✅ Nenhum PDF novo ou alterado; consolidado mantido: {arquivo_csv}")
+        return
     
     print("\n" + "=" * 60)
     
-    # Lista para armazenar todos os dados
-    todos_dados = []
     estatisticas = {
         'processados': 0,
         'com_dados': 0,
         'sem_dados': 0,
         'com_erro': 0
     }
+    # Resumo calculado à medida que os registros são gravados
+    resumo = {'placas': set(), 'com_data': 0, 'com_valor': 0, 'centavos': 0}
+    por_arquivo = {nome: entrada['registros'] for nome, entrada in reaproveitados.items() if entrada['registros']}
+    novo_manifesto = dict(reaproveitados)
+    # Arquivos cujos registros são copiados do consolidado anterior
+    anteriores = set(reaproveitados)
     
-    # Processa cada PDF
-    for i, arquivo_pdf in enumerate(arquivos_pdf, 1):
-        nome_arquivo = os.path.basename(arquivo_pdf)
-        print(f"\n🔍 [{i}/{len(arquivos_pdf)}] Processando: {nome_arquivo}")
-        
-        try:
-            # Cria o extrator
-            extractor = PDFExtractor(arquivo_pdf)
+    def acumular(registro):
+        resumo['placas'].add(registro['placa'])
+        resumo['com_data'] += registro['data'] != ''
+        resumo['com_valor'] += registro['total'] != ''
+        resumo['centavos'] += registro.get('valor_centavos') or 0
+        return registro
+    
+    def registros_consolidados():
+        """Registros dos PDFs extraídos agora e, depois, os reaproveitados do consolidado anterior"""
+        resultados = extrair_em_paralelo(a_extrair, workers, max_pendentes)
+        for i, (arquivo_pdf, dados, erro, assinatura) in enumerate(resultados, 1):
+            nome_arquivo = os.path.basename(arquivo_pdf)
+            print(f"\n🔍 [{i}/{len(a_extrair)}] Concluído: {nome_arquivo}")
             
-            # Extrai os dados
-            dados = extractor.extract_data()
+            if erro is not None:
+                estatisticas['com_erro'] += 1
+                print(f"  ❌ Erro: {erro}")
+                # Mantém os registros da versão anterior; o arquivo é tentado de novo na próxima execução
+                if nome_arquivo in manifesto:
+                    novo_manifesto[nome_arquivo] = manifesto[nome_arquivo]
+                    anteriores.add(nome_arquivo)
+                    if manifesto[nome_arquivo]['registros']:
+                        por_arquivo[nome_arquivo] = manifesto[nome_arquivo]['registros']
+                continue
             
-            if dados:
-                # Adiciona informação do arquivo fonte
-                for registro in dados:
-                    registro['arquivo_fonte'] = nome_arquivo
-                
-                todos_dados.extend(dados)
-                estatisticas['com_dados'] += 1
-                print(f"  ✅ {len(dados)} registro(s) extraído(s)")
-            else:
+            estatisticas['processados'] += 1
+            novo_manifesto[nome_arquivo] = dict(assinatura, registros=len(dados))
+            if not dados:
                 estatisticas['sem_dados'] += 1
                 print(f"  ⚠️  Nenhum dado encontrado")
+                continue
             
-            estatisticas['processados'] += 1
+            estatisticas['com_dados'] += 1
+            por_arquivo[nome_arquivo] = len(dados)
+            print(f"  ✅ {len(dados)} registro(s) extraído(s)")
             
-        except Exception as e:
-            estatisticas['com_erro'] += 1
-            print(f"  ❌ Erro: {e}")
+            for registro in dados:
+                registro['arquivo_fonte'] = nome_arquivo
+                yield acumular(registro)
+        
+        # Arquivos sem alteração (e os que falharam agora, na versão anterior)
+        if anteriores:
+            for registro in registros_anteriores(arquivo_csv, anteriores):
+                yield acumular(registro)
+    
+    total_registros = export_records(registros_consolidados(), excel_path=arquivo_excel, csv_path=arquivo_csv,
+                                     columns=COLUMNS_CONSOLIDADO)
+    salvar_manifesto(arquivo_manifesto, novo_manifesto)
     
     # Exibe estatísticas finais
     print("\n" + "=" * 60)
     print("📊 ESTATÍSTICAS FINAIS:")
     print(f"  Arquivos processados: {estatisticas['processados']}")
+    print(f"  Sem alteração (reaproveitados): {len(reaproveitados)}")
+    print(f"  Removidos da pasta: {len(removidos)}")
     print(f"  Com dados extraídos: {estatisticas['com_dados']}")
     print(f"  Sem dados: {estatisticas['sem_dados']}")
     print(f"  Com erro: {estatisticas['com_erro']}")
     
-    if todos_dados:
+    if total_registros:
         print(f"\n📋 RESUMO CONSOLIDADO:")
-        print(f"  Total de registros: {len(todos_dados)}")
-        
-        # Cria DataFrame consolidado
-        df_consolidado = pd.DataFrame(todos_dados)
-        
-        # Estatísticas detalhadas
-        print(f"  Placas únicas: {df_consolidado['placa'].nunique()}")
-        print(f"  Registros com data: {len(df_consolidado[df_consolidado['data'] != ''])}")
-        print(f"  Registros com valor: {len(df_consolidado[df_consolidado['total'] != ''])}")
+        print(f"  Total de registros: {total_registros}")
+        print(f"  Placas únicas: {len(resumo['placas'])}")
+        print(f"  Registros com data: {resumo['com_data']}")
+        print(f"  Registros com valor: {resumo['com_valor']}")
         
         # Estatísticas por arquivo
         print(f"\n📁 REGISTROS POR ARQUIVO:")
-        por_arquivo = df_consolidado.groupby('arquivo_fonte').size().sort_values(ascending=False)
-        for arquivo, count in por_arquivo.items():
+        for arquivo, count in sorted(por_arquivo.items(), key=lambda item: item[1], reverse=True):
             print(f"  {arquivo}: {count} registros")
         
-        # Salva arquivo consolidado
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        arquivo_excel = f"dados_consolidados_{timestamp}.xlsx"
-        arquivo_csv = f"dados_consolidados_{timestamp}.csv"
-        
-        # Reordena colunas
-        columns_order = ['arquivo_fonte', 'placa', 'data', 'total', 'texto_original', 'pagina', 'linha_referencia']
-        df_consolidado = df_consolidado.reindex(columns=columns_order)
-        
-        df_consolidado.to_excel(arquivo_excel, index=False)
-        df_consolidado.to_csv(arquivo_csv, index=False, encoding='utf-8-sig')
-        
         print(f"\n💾 ARQUIVOS SALVOS:")
         print(f"  📊 Excel: {arquivo_excel}")
         print(f"  📄 CSV: {arquivo_csv}")
+        print(f"  🧾 Manifesto: {arquivo_manifesto}")
         
-        # Análise adicional
-        if df_consolidado['total'].notna().any() and df_consolidado['total'].str.replace(',', '.').str.replace('', '0').astype(float).sum() > 0:
-            valor_total = df_consolidado['total'].str.replace(',', '.').str.replace('', '0').astype(float).sum()
-            print(f"\n💰 VALOR TOTAL: R$ {valor_total:,.2f}")
+        print(f"\n💰 VALOR TOTAL: R$ {format_centavos(resumo['centavos'])}")
     
     else:
+        # Sem registros, os arquivos consolidados (só com cabeçalho) não são mantidos
+        for arquivo in (arquivo_excel, arquivo_csv, arquivo_manifesto):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
         print("\n❌ Nenhum dado foi extraído de nenhum arquivo.")
 
 def main():
+    parser = argparse.ArgumentParser(description="Processa todos os PDFs de uma pasta e consolida os resultados")
+    parser.add_argument("pasta", nargs="?", help="Pasta com os PDFs (pergunta se omitida)")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="Processos de extração em paralelo (0 = todos os núcleos)")
+    parser.add_argument("--pendentes", type=int, default=0,
+                        help="Arquivos em andamento ao mesmo tempo (0 = 2 por processo)")
+    parser.add_argument("-o", "--saida",
+                        help="Caminho base dos arquivos consolidados, sem extensão (reutilize para rodar incremental)")
+    parser.add_argument("--completo", action="store_true",
+                        help="Ignora o manifesto e extrai todos os PDFs de novo")
+    args = parser.parse_args()
+    
+    setup_logging(level='WARNING')
+    
     print("🚀 PROCESSADOR DE MÚLTIPLOS PDFs")
     print("=" * 60)
     
-    # Pasta atual por padrão
-    pasta = input("Digite o caminho da pasta (Enter para pasta atual): ").strip()
+    pasta = args.pasta
+    if pasta is None:
+        # Pasta atual por padrão
+        pasta = input("Digite o caminho da pasta (Enter para pasta atual): ").strip()
     if not pasta:
         pasta = "."
     
@@ -143,7 +421,8 @@ def main():
         print(f"❌ Pasta não encontrada: {pasta}")
         return
     
-    processar_multiplos_pdfs(pasta)
+    processar_multiplos_pdfs(pasta, workers=args.workers or None, max_pendentes=args.pendentes or None,
+                             saida=args.saida, completo=args.completo)
 
 if __name__ == "__main__":
     main()
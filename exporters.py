@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Exportação dos registros extraídos para Excel e CSV.
+O Excel é gravado em streaming: a planilha (SpreadsheetML) é escrita linha
+a linha direto no zip do .xlsx, com textos inline e sem tabela de strings
+compartilhadas, então a memória não cresce com o número de registros. As
+células são tipadas: datas como data, valores como número com duas casas
+e página/centavos como inteiros. O CSV pode ser gerado na mesma passada,
+com o mesmo conteúdo textual de antes. Os arquivos são gravados com nome
+temporário e renomeados ao final, para que uma exportação concorrente
+nunca leia um arquivo pela metade.
+
+Para análises, os registros também podem ser gravados em Parquet (requer
+o pyarrow, opcional): placas codificadas em dicionário, data como date,
+total como decimal exato e centavos como inteiro, comprimidos com zstd.
+Os arquivos exportados podem ser reunidos em um pacote ZIP gravado uma
+única vez em disco.
+"""
+
+import csv
+import os
+import re
+import threading
+import zipfile
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet fica indisponível; Excel e CSV não dependem do pyarrow
+    pa = pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+# Colunas exportadas, na ordem dos arquivos
+EXPORT_COLUMNS = ('placa', 'data', 'total', 'texto_original', 'pagina', 'linha_referencia', 'valor_centavos')
+
+SHEET_TITLE = 'Sheet1'
+
+# Linhas acumuladas antes de cada escrita no zip
+ROWS_PER_WRITE = 1000
+
+# Linhas por row group do Parquet (limita a memória da conversão)
+PARQUET_ROW_GROUP = 65536
+PARQUET_COMPRESSION = 'zstd'
+
+# Formatos já comprimidos: entram no pacote ZIP sem nova compressão
+STORED_EXTENSIONS = ('.xlsx', '.parquet', '.zip')
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+_COLUMN_LETTERS = [chr(ord('A') + index) for index in range(26)]
+
+# Caracteres de controle não permitidos em XML (o openpyxl recusa esses textos)
+_ILLEGAL_XML = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# Estilos da planilha (índices de cellXfs em _STYLES)
+_STYLE_HEADER = 1
+_STYLE_DATE = 2
+_STYLE_VALUE = 3
+
+_NS_MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_PKG_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_CONTENT_TYPES = (
+    _XML_HEADER +
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    _XML_HEADER +
+    f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    _XML_HEADER +
+    f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+    f'<sheets><sheet name="{SHEET_TITLE}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    _XML_HEADER +
+    f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Estilos: 0 padrão, 1 cabeçalho em negrito, 2 data DD/MM/AAAA, 3 número #,##0.00
+_STYLES = (
+    _XML_HEADER +
+    f'<styleSheet xmlns="{_NS_MAIN}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/></numFmts>'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def parse_data_br(texto: str) -> Optional[date]:
+    """
+    Converte uma data DD/MM/AAAA (como sai de _clean_data) em date
+    
+    Args:
+        texto (str): Data em texto
+    
+    Returns:
+        Optional[date]: Data ou None se o texto não for uma data válida
+    """
+    partes = texto.split('/') if texto else ()
+    if len(partes) != 3 or not all(parte.isdigit() for parte in partes):
+        return None
+    dia, mes, ano = (int(parte) for parte in partes)
+    try:
+        return date(ano, mes, dia)
+    except ValueError:
+        return None
+
+
+def _text_cell(ref: str, value, style: int = 0) -> str:
+    text = str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    text = _ILLEGAL_XML.sub('', text)
+    style_attr = f' s="{style}"' if style else ''
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _number_cell(ref: str, value: str, style: int = 0) -> str:
+    style_attr = f' s="{style}"' if style else ''
+    return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+
+
+def _cell(ref: str, value) -> str:
+    """Célula sem formatação: número para int/float, texto para o resto, vazia para None/''"""
+    if value is None or value == '':
+        return ''
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _number_cell(ref, value)
+    return _text_cell(ref, value)
+
+
+def _excel_row(row_num: int, columns, values) -> str:
+    """Linha da planilha com data, valor e inteiros tipados"""
+    cells = []
+    for letter, column, value in zip(_COLUMN_LETTERS, columns, values):
+        ref = f"{letter}{row_num}"
+        
+        if column == 'data':
+            data_valor = parse_data_br(value)
+            if data_valor is not None:
+                cells.append(_number_cell(ref, (data_valor - _EXCEL_EPOCH).days, _STYLE_DATE))
+                continue
+        elif column == 'total':
+            # Registros antigos, sem centavos, ficam com o valor em texto
+            centavos = values[columns.index('valor_centavos')] if 'valor_centavos' in columns else None
+            if isinstance(centavos, int):
+                sinal = '-' if centavos < 0 else ''
+                inteiro, resto = divmod(abs(centavos), 100)
+                cells.append(_number_cell(ref, f"{sinal}{inteiro}.{resto:02d}", _STYLE_VALUE))
+                continue
+        
+        cells.append(_cell(ref, value))
+    
+    return f'<row r="{row_num}">{"".join(cells)}</row>'
+
+
+def _csv_value(value):
+    return '' if value is None else value
+
+
+def export_records(records: Iterable[Dict], excel_path: str = None, csv_path: str = None,
+                   columns: Sequence[str] = EXPORT_COLUMNS) -> int:
+    """
+    Grava os registros em Excel e/ou CSV em uma única passada
+    
+    Args:
+        records (Iterable[Dict]): Registros agregados (saída de extract_data);
+            pode ser um gerador, consumido uma única vez
+        excel_path (str): Arquivo .xlsx a gravar (None para não gerar)
+        csv_path (str): Arquivo .csv a gravar (None para não gerar)
+        columns (Sequence[str]): Colunas exportadas, na ordem (até 26)
+    
+    Returns:
+        int: Quantidade de registros exportados
+    """
+    if len(columns) > len(_COLUMN_LETTERS):
+        raise ValueError(f"Exportação limitada a {len(_COLUMN_LETTERS)} colunas")
+    columns = list(columns)
+    # Sufixo por processo e thread: downloads simultâneos não disputam o mesmo temporário
+    tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    archive = sheet = csv_file = writer = None
+    count = 0
+    
+    try:
+        if excel_path:
+            archive = zipfile.ZipFile(excel_path + tmp_suffix, 'w', zipfile.ZIP_DEFLATED)
+            archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+            archive.writestr('_rels/.rels', _ROOT_RELS)
+            archive.writestr('xl/workbook.xml', _WORKBOOK)
+            archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+            archive.writestr('xl/styles.xml', _STYLES)
+            
+            sheet = archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+            header = ''.join(
+                _text_cell(f"{letter}1", column, _STYLE_HEADER)
+                for letter, column in zip(_COLUMN_LETTERS, columns)
+            )
+            sheet.write(f'{_XML_HEADER}<worksheet xmlns="{_NS_MAIN}"><sheetData>'
+                        f'<row r="1">{header}</row>'.encode('utf-8'))
+        
+        if csv_path:
+            csv_file = open(csv_path + tmp_suffix, 'w', encoding='utf-8-sig', newline='')
+            writer = csv.writer(csv_file, lineterminator='\n')
+            writer.writerow(columns)
+        
+        pending = []
+        for record in records:
+            values = [record.get(column) for column in columns]
+            count += 1
+            
+            if writer is not None:
+                writer.writerow([_csv_value(value) for value in values])
+            
+            if sheet is not None:
+                pending.append(_excel_row(count + 1, columns, values))
+                if len(pending) >= ROWS_PER_WRITE:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending.clear()
+        
+        if sheet is not None:
+            pending.append('</sheetData></worksheet>')
+            sheet.write(''.join(pending).encode('utf-8'))
+            sheet.close()
+            archive.close()
+            os.replace(excel_path + tmp_suffix, excel_path)
+        if csv_file is not None:
+            csv_file.close()
+            os.replace(csv_path + tmp_suffix, csv_path)
+    
+    finally:
+        if sheet is not None and not sheet.closed:
+            sheet.close()
+        if archive is not None:
+            archive.close()
+        if csv_file is not None and not csv_file.closed:
+            csv_file.close()
+        for path in (excel_path, csv_path):
+            if path and os.path.exists(path + tmp_suffix):
+                os.remove(path + tmp_suffix)
+    
+    return count
+
+
+def parquet_schema():
+    """
+    Esquema tipado do arquivo Parquet
+    
+    Returns:
+        pa.Schema: Colunas de EXPORT_COLUMNS com placa em dicionário, data
+            como date32 e total como decimal(18, 2)
+    """
+    return pa.schema([
+        ('placa', pa.dictionary(pa.int32(), pa.string())),
+        ('data', pa.date32()),
+        ('total', pa.decimal128(18, 2)),
+        ('texto_original', pa.string()),
+        ('pagina', pa.int32()),
+        ('linha_referencia', pa.string()),
+        ('valor_centavos', pa.int64()),
+    ])
+
+
+def _parquet_batch(rows: Dict[str, list], schema) -> 'pa.RecordBatch':
+    placas = pa.array(rows['placa'], pa.string()).dictionary_encode()
+    return pa.RecordBatch.from_arrays(
+        [placas.cast(schema.field('placa').type)] +
+        [pa.array(rows[name], schema.field(name).type) for name in EXPORT_COLUMNS[1:]],
+        schema=schema
+    )
+
+
+def export_parquet(records: Iterable[Dict], path: str) -> int:
+    """
+    Grava os registros em Parquet tipado, um row group a cada PARQUET_ROW_GROUP linhas
+    
+    Datas vazias ou inválidas e registros sem centavos ficam nulos.
+    
+    Args:
+        records (Iterable[Dict]): Registros agregados (saída de extract_data)
+        path (str): Arquivo .parquet a gravar
+    
+    Returns:
+        int: Quantidade de registros exportados
+    
+    Raises:
+        ImportError: Se o pyarrow não estiver instalado
+    """
+    if not PARQUET_AVAILABLE:
+        raise ImportError("Exportação em Parquet requer o pacote pyarrow")
+    
+    schema = parquet_schema()
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    rows = {column: [] for column in EXPORT_COLUMNS}
+    count = 0
+    
+    try:
+        with pq.ParquetWriter(tmp_path, schema, compression=PARQUET_COMPRESSION) as writer:
+            for record in records:
+                centavos = record.get('valor_centavos')
+                rows['placa'].append(record.get('placa') or '')
+                rows['data'].append(parse_data_br(record.get('data')))
+                rows['total'].append(Decimal(centavos).scaleb(-2) if isinstance(centavos, int) else None)
+                rows['texto_original'].append(record.get('texto_original'))
+                rows['pagina'].append(record.get('pagina'))
+                rows['linha_referencia'].append(record.get('linha_referencia'))
+                rows['valor_centavos'].append(centavos)
+                count += 1
+                
+                if len(rows['placa']) >= PARQUET_ROW_GROUP:
+                    writer.write_batch(_parquet_batch(rows, schema))
+                    rows = {column: [] for column in EXPORT_COLUMNS}
+            
+            if rows['placa'] or count == 0:
+                writer.write_batch(_parquet_batch(rows, schema))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return count
+
+
+def export_bundle(members: List[Tuple[str, str]], zip_path: str):
+    """
+    Grava um pacote ZIP com arquivos já exportados
+    
+    Arquivos já comprimidos (STORED_EXTENSIONS) são armazenados como estão;
+    os demais (CSV) são comprimidos com deflate.
+    
+    Args:
+        members (List[Tuple[str, str]]): Pares (caminho do arquivo, nome dentro do ZIP)
+        zip_path (str): Arquivo .zip a gravar
+    """
+    tmp_path = f"{zip_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, 'w') as archive:
+            for path, arcname in members:
+                stored = path.lower().endswith(STORED_EXTENSIONS)
+                archive.write(path, arcname, compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED)
+        os.replace(tmp_path, zip_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,102 +1,962 @@
 import pdfplumber
+from pdfplumber.page import Page
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
 import pandas as pd
 import re
-from typing import List, Dict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import os
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from exporters import export_parquet, export_records
+from metrics import MetricsCollector
+from money import MEMO_SIZE, MoneyParser, extract_first_valid_value, format_centavos, is_valid_currency_format
+from record_batch import RecordBatch
+from vector_aggregation import aggregate_by_placa, aggregate_by_placa_data, records_frame
+from structured_log import get_logger, log_event, setup_logging
+
+logger = get_logger('pdf')
+
+
+# Versão das regras de extração. Deve mudar sempre que o resultado extraído
+# de um mesmo PDF puder mudar (invalida o cache de resultados).
+EXTRACTOR_VERSION = '2.7.0'
+
+# Registro de padrões pré-compilados usados nos caminhos críticos da extração.
+# Os padrões de busca usam IGNORECASE, como _find_pattern sempre fez.
+_PLACA = r'\b[A-Z]{3}[-\s]?\d{4}\b|\b[A-Z]{3}[-\s]?\d[A-Z]\d{2}\b'
+_DATA = r'\b\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b'
+_VALOR = r'\d+[.,]\d{2}'
+# Versões dos mesmos padrões para o tokenizador, que roda em toda linha:
+# - minúsculas pela classe de caracteres em vez de IGNORECASE (que compara
+#   sem diferenciar caixa em cada posição);
+# - as duas formas de placa fatoradas em uma só;
+# - o \b inicial escrito como lookbehind depois do primeiro caractere, para
+#   que todas as alternativas comecem por uma classe de caracteres e o motor
+#   salte direto para as posições que podem iniciar um token.
+# Em texto ASCII reconhecem exatamente o mesmo que _PLACA (com IGNORECASE) e _DATA.
+_PLACA_LINHA = r'[A-Za-z](?<!\w.)[A-Za-z]{2}[-\s]?\d(?:\d{3}|[A-Za-z]\d{2})\b'
+_DATA_LINHA = r'\d(?<!\w.)\d?[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b'
+
+PATTERNS = {
+    'placa': re.compile(_PLACA, re.IGNORECASE),
+    'data': re.compile(_DATA, re.IGNORECASE),
+    'valor': re.compile(_VALOR),
+    'valor_com_moeda': re.compile(r'R?\$?\s*\d+[.,]\d{2}|\d+[.,]\d{2}', re.IGNORECASE),
+    'valor_milhares': re.compile(r'R?\$?\s*\d{1,3}(?:[.,]\d{3})*[.,]\d{2}', re.IGNORECASE),
+    'total_linha': re.compile(r'TOTAL\s+R\$\s*([\d.,]+)'),
+    # Tokenizador de linha: placa, data e valores em uma única passada
+    'linha': re.compile(f'(?P<placa>{_PLACA_LINHA})|(?P<data>{_DATA_LINHA})|(?P<valor>{_VALOR})'),
+    # Limpeza de valores (conversão e validação ficam em money.py)
+    'moeda_prefixo': re.compile(r'R?\$?\s*'),
+    # Limpeza de placa e data
+    'placa_lixo': re.compile(r'[^A-Z0-9]'),
+    'data_lixo': re.compile(r'[^\d\/\-\.]'),
+    'data_separador': re.compile(r'[-\.]'),
+}
+
+
+def tokenize_line(line: str) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """
+    Extrai placa, data e valores monetários de uma linha em uma única passada
+    
+    A placa e a data são as primeiras ocorrências na linha; os valores vêm
+    na ordem em que aparecem. Trechos reconhecidos como data não são
+    reaproveitados como valor (ex.: '10.01' em '10.01.2025').
+    
+    Args:
+        line (str): Linha de texto
+        
+    Returns:
+        Tuple[Optional[str], Optional[str], List[str]]: Placa, data e valores encontrados
+    """
+    placa = None
+    data = None
+    valores = []
+    
+    for match in PATTERNS['linha'].finditer(line):
+        kind = match.lastgroup
+        if kind == 'valor':
+            valores.append(match.group())
+        elif kind == 'placa':
+            if placa is None:
+                placa = match.group()
+        elif data is None:
+            data = match.group()
+    
+    return placa, data, valores
+
+
+# Estratégias de extração por página: somente texto, somente tabelas ou
+# escolha automática a partir das primeiras páginas
+EXTRACTION_STRATEGIES = ('text', 'tables', 'auto')
+
+# Agregação dos registros brutos: incremental em Python (memória constante)
+# ou vetorizada com pandas no final (mais rápida em volumes grandes)
+AGGREGATION_ENGINES = ('python', 'pandas')
+
+# Páginas sondadas pela estratégia automática (e limite caso nenhuma traga registros)
+AUTO_PROBE_PAGES = 2
+AUTO_MAX_PROBE_PAGES = 5
+
+# Pré-checagem: páginas iniciais amostradas e cabeçalhos que identificam o
+# layout de extrato conhecido (processado pelo layout de texto)
+PREFLIGHT_SAMPLE_PAGES = 3
+STATEMENT_HEADERS = ('PLACA DATA PRODUTO', 'MOTORISTA FROTA')
+
+
+def _split_page_ranges(first_page: int, last_page: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Divide o documento em intervalos de páginas para processamento paralelo
+    
+    Gera mais intervalos do que workers para equilibrar a carga quando
+    algumas páginas são mais pesadas que outras.
+    
+    Args:
+        first_page (int): Primeira página a distribuir (1-indexada)
+        last_page (int): Última página a distribuir (inclusive)
+        workers (int): Número de processos disponíveis
+        
+    Returns:
+        List[Tuple[int, int]]: Intervalos (primeira, última) com páginas 1-indexadas
+    """
+    total_pages = last_page - first_page + 1
+    if total_pages <= 0:
+        return []
+    
+    chunk_size = max(1, -(-total_pages // (workers * 4)))
+    return [
+        (first, min(first + chunk_size - 1, last_page))
+        for first in range(first_page, last_page + 1, chunk_size)
+    ]
+
+
+def count_pages(pdf) -> int:
+    """
+    Quantidade de páginas do documento, lida da árvore de páginas
+    
+    Não monta os objetos de página (pdf.pages); só conta pdf.pages se o
+    documento não informar a contagem.
+    
+    Args:
+        pdf: Documento aberto pelo pdfplumber
+        
+    Returns:
+        int: Total de páginas
+    """
+    try:
+        count = resolve1(resolve1(pdf.doc.catalog['Pages'])['Count'])
+        if isinstance(count, int) and count >= 0:
+            return count
+    except Exception:
+        pass
+    return len(pdf.pages)
+
+
+def iter_pages(pdf, first_page: int = 1, last_page: int = None) -> Iterator[Page]:
+    """
+    Gera as páginas do documento sob demanda, uma de cada vez
+    
+    Ao contrário de pdf.pages, nenhuma lista com todas as páginas é mantida:
+    cada página é criada quando pedida e o layout que ela guardou em cache
+    (caracteres, objetos, mapa de texto) é liberado assim que a próxima é
+    solicitada ou o gerador é fechado.
+    
+    Args:
+        pdf: Documento aberto pelo pdfplumber
+        first_page (int): Primeira página gerada (1-indexada)
+        last_page (int): Última página gerada, inclusive (None = até o fim)
+        
+    Yields:
+        Page: Página do pdfplumber
+    """
+    doctop = 0
+    for page_number, page_obj in enumerate(PDFPage.create_pages(pdf.doc), 1):
+        if last_page is not None and page_number > last_page:
+            break
+        page = Page(pdf, page_obj, page_number=page_number, initial_doctop=doctop)
+        doctop += page.height
+        if page_number < first_page:
+            continue
+        try:
+            yield page
+        finally:
+            release_page(page)
+
+
+@contextmanager
+def closing_pdf(pdf):
+    """
+    Fecha o documento ao sair do bloco sem montar a lista de páginas
+    
+    O PDF.close do pdfplumber percorre pdf.pages para fechar cada página, o
+    que cria os objetos de todas as páginas do documento (centenas de ms em
+    PDFs grandes) mesmo quando só algumas foram lidas por iter_pages, que já
+    as libera.
+    
+    Args:
+        pdf: Documento aberto pelo pdfplumber
+        
+    Yields:
+        O próprio documento
+    """
+    try:
+        yield pdf
+    finally:
+        if hasattr(pdf, '_pages'):
+            pdf.close()
+        else:
+            pdf.flush_cache()
+            if not getattr(pdf, 'stream_is_external', False):
+                pdf.stream.close()
+
+
+def release_page(page):
+    """Libera o layout em cache de uma página já processada"""
+    close = getattr(page, 'close', None)
+    if close is not None:
+        close()
+    else:
+        page.flush_cache()
+
+
+def _char_lines(page) -> List[str]:
+    """
+    Linhas de texto montadas direto da camada de caracteres da página
+    
+    Dispensa a análise de layout do extract_text: os caracteres são apenas
+    concatenados, quebrando a linha quando a posição vertical muda.
+    
+    Args:
+        page: Página do pdfplumber
+        
+    Returns:
+        List[str]: Linhas na ordem em que aparecem no conteúdo da página
+    """
+    lines = []
+    current = []
+    last_top = None
+    for char in page.chars:
+        if last_top is not None and abs(char['top'] - last_top) > 1:
+            lines.append(''.join(current))
+            current = []
+        current.append(char['text'])
+        last_top = char['top']
+    if current:
+        lines.append(''.join(current))
+    return lines
+
+
+def _page_content(page) -> bytes:
+    """
+    Conteúdo bruto (operadores de desenho) da página, já descomprimido
+    
+    Args:
+        page: Página do pdfplumber
+        
+    Returns:
+        bytes: Streams de conteúdo concatenados (vazio se não puderem ser lidos)
+    """
+    try:
+        return b'\n'.join(resolve1(stream).get_data() for stream in page.page_obj.contents)
+    except Exception:
+        return b''
+
+
+def preflight(pdf_path: str, first_page: int = 1, sample_pages: int = PREFLIGHT_SAMPLE_PAGES,
+              metrics: MetricsCollector = None) -> Dict:
+    """
+    Pré-checagem barata do PDF, antes da extração completa
+    
+    Lê a contagem de páginas e amostra as primeiras páginas sem extract_text
+    nem extract_tables. Primeiro procura os cabeçalhos do extrato conhecido
+    direto no conteúdo bruto das páginas (alguns milissegundos); se não
+    estiverem lá, monta o texto da camada de caracteres para procurar os
+    cabeçalhos e placas. PDFs sem texto (digitalizados) ou sem relação com os
+    extratos são recusados antes da extração.
+    
+    Também escolhe a estratégia: o layout de extrato conhecido e páginas sem
+    linhas de tabela vão direto para 'text'; o resto fica com a sondagem ('auto').
+    
+    Args:
+        pdf_path (str): Caminho do PDF
+        first_page (int): Primeira página amostrada (1-indexada)
+        sample_pages (int): Quantidade de páginas amostradas
+        metrics (MetricsCollector): Coletor onde o tempo da etapa é somado
+        
+    Returns:
+        Dict: {'paginas', 'paginas_amostradas', 'layout_extrato', 'texto_extraivel',
+            'estrategia', 'motivo'} - 'motivo' é None quando o PDF pode ser
+            extraído e, caso contrário, explica a recusa; 'texto_extraivel' é
+            False quando nenhuma estratégia teria o que extrair (sem páginas
+            ou sem texto)
+    """
+    metrics = metrics if metrics is not None else MetricsCollector()
+    result = {
+        'paginas': 0,
+        'paginas_amostradas': 0,
+        'layout_extrato': False,
+        'texto_extraivel': True,
+        'estrategia': 'auto',
+        'motivo': None
+    }
+    
+    with metrics.time('pre_checagem'), closing_pdf(pdfplumber.open(pdf_path)) as pdf:
+        result['paginas'] = count_pages(pdf)
+        last_page = min(result['paginas'], first_page + sample_pages - 1)
+        
+        # Cabeçalhos como strings literais no conteúdo (fontes com codificação simples)
+        for page in iter_pages(pdf, first_page, last_page):
+            result['paginas_amostradas'] += 1
+            content = _page_content(page)
+            if any(header.encode('latin-1') in content for header in STATEMENT_HEADERS):
+                result['layout_extrato'] = True
+        
+        if not result['layout_extrato'] and result['paginas_amostradas']:
+            result.update(_preflight_chars(pdf, first_page, last_page))
+    
+    if not result['paginas_amostradas']:
+        result['motivo'] = 'O PDF não tem páginas para extrair.'
+        result['texto_extraivel'] = False
+    elif result['layout_extrato']:
+        result['estrategia'] = 'text'
+    
+    log_event(logger, logging.INFO, 'pre_checagem', "Pré-checagem do PDF",
+              arquivo=pdf_path, paginas=result['paginas'], layout_extrato=result['layout_extrato'],
+              estrategia=result['estrategia'], recusado=result['motivo'] is not None)
+    return result
+
+
+def _preflight_chars(pdf, first_page: int, last_page: int) -> Dict:
+    """
+    Etapa mais lenta da pré-checagem, pela camada de caracteres das páginas amostradas
+    
+    Args:
+        pdf: Documento aberto pelo pdfplumber
+        first_page (int): Primeira página amostrada
+        last_page (int): Última página amostrada, inclusive
+        
+    Returns:
+        Dict: Campos da pré-checagem atualizados ('layout_extrato',
+            'texto_extraivel', 'estrategia' e 'motivo')
+    """
+    fingerprints = tuple(header.replace(' ', '') for header in STATEMENT_HEADERS)
+    characters = 0
+    placas = 0
+    ruled = False
+    
+    for page in iter_pages(pdf, first_page, last_page):
+        lines = _char_lines(page)
+        characters += sum(len(line) for line in lines)
+        
+        compact = ''.join(lines).replace(' ', '').upper()
+        if any(fingerprint in compact for fingerprint in fingerprints):
+            return {'layout_extrato': True}
+        placas += sum(1 for line in lines if PATTERNS['placa'].search(line))
+        
+        # Sem linhas nem retângulos, extract_tables não encontra tabelas
+        objects = page.objects
+        ruled = ruled or bool(objects.get('line') or objects.get('rect') or objects.get('curve'))
+    
+    if not characters:
+        return {'texto_extraivel': False,
+                'motivo': 'O PDF não tem texto extraível (provavelmente é digitalizado). '
+                          'Envie o extrato original gerado pelo sistema.'}
+    if not placas:
+        return {'motivo': 'O PDF não parece um extrato de frota: não há cabeçalhos '
+                          f"{' / '.join(STATEMENT_HEADERS)} nem placas nas primeiras páginas."}
+    return {'estrategia': 'auto' if ruled else 'text'}
+
+
+def _extract_page_range(pdf_path: str, first_page: int, last_page: int,
+                        strategy: str) -> Tuple[RecordBatch, Dict]:
+    """
+    Extrai os registros brutos de um intervalo de páginas (executado em um worker)
+    
+    Args:
+        pdf_path (str): Caminho para o arquivo PDF
+        first_page (int): Primeira página do intervalo (1-indexada)
+        last_page (int): Última página do intervalo (inclusive)
+        strategy (str): Estratégia já resolvida ('text' ou 'tables')
+        
+    Returns:
+        Tuple[RecordBatch, Dict]: Registros brutos do intervalo, em ordem de
+            página, e o snapshot das métricas do worker
+    """
+    extractor = PDFExtractor(pdf_path, strategy=strategy)
+    raw_data = RecordBatch()
+    
+    with extractor.metrics.time('abrir_pdf'):
+        pdf = pdfplumber.open(pdf_path)
+    
+    with closing_pdf(pdf):
+        for page in iter_pages(pdf, first_page, last_page):
+            extractor._extract_page(page, page.page_number, strategy, raw_data)
+            extractor.metrics.incr('paginas')
+    
+    return raw_data, extractor.metrics.snapshot()
+
+
+class PlacaDataAggregator:
+    """
+    Agregador incremental de registros por placa + data
+    
+    Mantém apenas os totais de cada combinação placa|data, de modo que o
+    consumo de memória não cresce com o número de linhas do extrato.
+    """
+    
+    def __init__(self, convert_valor: Callable[[str], int], format_valor: Callable[[int], str],
+                 on_page: Callable[[Dict], None] = None):
+        """
+        Inicializa o agregador
+        
+        Args:
+            convert_valor (Callable): Converte o texto do valor em centavos (usado
+                só quando o registro não traz 'valor_centavos')
+            format_valor (Callable): Formata um total em centavos como moeda brasileira
+            on_page (Callable): Recebe summary() sempre que chega um registro de outra página
+        """
+        self._convert_valor = convert_valor
+        self._format_valor = format_valor
+        self._on_page = on_page
+        self._groups = {}
+        self._placas = set()
+        self.registros_lidos = 0
+        self.pagina_atual = 0
+    
+    def add(self, item: Dict):
+        """
+        Incorpora um registro bruto aos totais
+        
+        Args:
+            item (Dict): Registro bruto extraído de uma linha
+        """
+        self.registros_lidos += 1
+        
+        pagina_anterior = self.pagina_atual
+        self.pagina_atual = item.get('pagina', self.pagina_atual)
+        if self._on_page and self.pagina_atual != pagina_anterior:
+            self._on_page(self.summary())
+        
+        placa = item.get('placa', '').strip()
+        data = item.get('data', '').strip()
+        
+        if not placa:
+            return
+        
+        # Valor em centavos inteiros, para a soma ser exata
+        centavos = item.get('valor_centavos')
+        if centavos is None:
+            centavos = self._convert_valor(item.get('total', '').strip())
+        
+        self._add_values(placa, data, centavos, item.get('pagina', 0))
+    
+    def add_batch(self, batch: RecordBatch):
+        """
+        Incorpora um lote colunar de registros brutos aos totais
+        
+        Equivale a chamar add() para cada registro do lote, sem montar os
+        dicionários: placas e datas são limpas uma vez por valor distinto.
+        
+        Args:
+            batch (RecordBatch): Registros brutos, em ordem de página
+        """
+        placas = [placa.strip() for placa in batch.placa.values]
+        datas = [data.strip() for data in batch.data.values]
+        
+        for placa_code, data_code, centavos, pagina in zip(
+                batch.placa.codes, batch.data.codes, batch.valor_centavos, batch.pagina):
+            self.registros_lidos += 1
+            
+            if pagina != self.pagina_atual:
+                self.pagina_atual = pagina
+                if self._on_page:
+                    self._on_page(self.summary())
+            
+            placa = placas[placa_code]
+            if placa:
+                self._add_values(placa, datas[data_code], centavos, pagina)
+    
+    def _add_values(self, placa: str, data: str, centavos: int, pagina: int):
+        """Soma um registro já limpo ao grupo placa + data"""
+        # Chave única: placa + data
+        key = (placa, data)
+        
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = {
+                'placa': placa,
+                'data': data,
+                'total_centavos': centavos,
+                'pagina': pagina,
+                'total_registros': 1
+            }
+            self._placas.add(placa)
+            return
+        
+        # Soma valores da mesma placa na mesma data
+        group['total_centavos'] += centavos
+        group['pagina'] = min(group['pagina'], pagina)
+        group['total_registros'] += 1
+    
+    def __len__(self) -> int:
+        return len(self._groups)
+    
+    def summary(self) -> Dict:
+        """
+        Resume o andamento da agregação
+        
+        Returns:
+            Dict: Contagens parciais de registros, grupos e placas
+        """
+        return {
+            'registros_lidos': self.registros_lidos,
+            'registros_agrupados': len(self._groups),
+            'placas_unicas': len(self._placas),
+            'pagina_atual': self.pagina_atual
+        }
+    
+    def result(self) -> List[Dict]:
+        """
+        Gera os registros finais por placa e data, ordenados
+        
+        Returns:
+            List[Dict]: Dados organizados por placa e data
+        """
+        result = []
+        for dados in self._groups.values():
+            placa = dados['placa']
+            data = dados['data']
+            
+            # Formata o valor total
+            centavos = dados['total_centavos']
+            valor_total_formatado = self._format_valor(centavos)
+            
+            # Cria texto original
+            if dados['total_registros'] > 1:
+                texto_original = f"PLACA: {placa} | DATA: {data} | TOTAL: R$ {valor_total_formatado} | REGISTROS: {dados['total_registros']}"
+            else:
+                texto_original = f"PLACA: {placa} | DATA: {data} | TOTAL: R$ {valor_total_formatado}"
+            
+            result.append({
+                'placa': placa,
+                'data': data,
+                'total': valor_total_formatado,
+                'texto_original': texto_original,
+                'pagina': dados['pagina'],
+                'linha_referencia': f"placa_{placa}_data_{data}",
+                'registros_individuais': dados['total_registros'],
+                'valor_numerico': centavos / 100,
+                'valor_centavos': centavos
+            })
+        
+        # Ordena por placa e depois por data
+        result.sort(key=lambda x: (x['placa'], x['data']))
+        
+        return result
+
 
 class PDFExtractor:
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, workers: int = 1, strategy: str = 'auto',
+                 on_progress: Callable[[Dict], None] = None, metrics: MetricsCollector = None,
+                 aggregation: str = 'python', page_range: Tuple[int, int] = None, max_pages: int = None):
         """
         Inicializa o extrator de PDF
         
         Args:
             pdf_path (str): Caminho para o arquivo PDF
+            workers (int): Número de processos para extração paralela
+                (1 = sequencial, 0 ou negativo = todos os núcleos)
+            strategy (str): Layout usado em cada página: 'text', 'tables' ou
+                'auto' (sonda as primeiras páginas e fica com o que produz
+                mais registros; o tempo só desempata)
+            on_progress (Callable): Recebe {'paginas_processadas', 'total_paginas',
+                'registros'} a cada página (ou intervalo de páginas, no modo paralelo)
+            metrics (MetricsCollector): Coletor de tempos por etapa e contadores
+                (um novo é criado se None; disponível em self.metrics)
+            aggregation (str): 'python' (agregador incremental) ou 'pandas'
+                (reúne os registros e agrupa com groupby; mesma saída)
+            page_range (Tuple[int, int]): Primeira e última página a extrair
+                (1-indexadas, inclusive; None = documento inteiro)
+            max_pages (int): Limite de páginas extraídas a partir da primeira
+                (ex.: prévia das primeiras N páginas; None = sem limite)
         """
+        if strategy not in EXTRACTION_STRATEGIES:
+            raise ValueError(f"Estratégia inválida: '{strategy}'. Use uma de {EXTRACTION_STRATEGIES}")
+        if aggregation not in AGGREGATION_ENGINES:
+            raise ValueError(f"Agregação inválida: '{aggregation}'. Use uma de {AGGREGATION_ENGINES}")
+        if page_range is not None and not (1 <= page_range[0] <= page_range[1]):
+            raise ValueError(f"Intervalo de páginas inválido: {page_range}")
+        if max_pages is not None and max_pages < 1:
+            raise ValueError(f"Limite de páginas inválido: {max_pages}")
+        
         self.pdf_path = pdf_path
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.strategy = strategy
+        self.resolved_strategy = None if strategy == 'auto' else strategy
+        self.on_progress = on_progress
+        self.aggregation = aggregation
+        self.page_range = page_range
+        self.max_pages = max_pages
+        # Total de páginas do documento (preenchido ao abrir o PDF)
+        self.document_pages = None
+        self.metrics = metrics if metrics is not None else MetricsCollector()
+        self.money = MoneyParser(on_fallback=lambda: self.metrics.incr('valores_fallback'))
+        # Placas e datas já limpas, por texto bruto
+        self._clean_memo = {'placa': {}, 'data': {}}
         self.data = []
         
-    def extract_data(self) -> List[Dict]:
+    def extract_data(self, aggregator: 'PlacaDataAggregator' = None, finish: bool = True) -> List[Dict]:
         """
         Extrai dados do PDF procurando por padrões de placa, data e valores
         
+        Args:
+            aggregator (PlacaDataAggregator): Agregador a alimentar durante a extração.
+                Permite consultar totais parciais enquanto o PDF é processado
+                (com ele a agregação é sempre a incremental).
+            finish (bool): Com False, o agregador não é finalizado: o resultado é
+                parcial e ele pode continuar recebendo outras páginas (prévia)
+            
         Returns:
             List[Dict]: Lista de dicionários com os dados extraídos e agregados por placa
         """
-        raw_data = []
+        if aggregator is None and self.aggregation == 'pandas':
+            # Agregação vetorizada: os lotes são reunidos e agrupados de uma vez no final
+            raw_data = RecordBatch()
+            consume = raw_data.extend
+        else:
+            raw_data = None
+            if aggregator is None:
+                aggregator = self.create_aggregator()
+            consume = aggregator.add_batch
+        
+        # Tempo de agregação somado lote a lote, já que ela é intercalada
+        # com a extração das páginas
+        perf_counter = time.perf_counter
+        aggregation_time = 0.0
         
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    print(f"Processando página {page_num}...")
-                    
-                    # Tenta extrair tabelas primeiro
-                    tables = page.extract_tables()
-                    if tables:
-                        page_data = self._process_tables(tables, page_num)
-                        raw_data.extend(page_data)
-                    
-                    # Se não encontrar tabelas, processa o texto
-                    text = page.extract_text()
-                    if text:
-                        page_data = self._process_text(text, page_num)
-                        raw_data.extend(page_data)
+            for batch in self.iter_batches():
+                start = perf_counter()
+                consume(batch)
+                aggregation_time += perf_counter() - start
                         
         except Exception as e:
-            print(f"Erro ao processar PDF: {e}")
+            log_event(logger, logging.ERROR, 'erro_pdf', "Erro ao processar PDF",
+                      arquivo=self.pdf_path, erro=str(e))
+        
+        self.metrics.add_time('agregacao', aggregation_time)
+        
+        # Um único aviso com o total, em vez de um por valor
+        fallbacks = self.metrics.counters['valores_fallback']
+        if fallbacks:
+            log_event(logger, logging.WARNING, 'valores_fallback',
+                      f"{fallbacks} valores precisaram de conversão alternativa",
+                      arquivo=self.pdf_path, valores=fallbacks)
         
         # Mantém os dados separados por placa e data
-        self.data = self._process_by_placa_and_date(raw_data)
+        if raw_data is None:
+            self.data = self.finish_aggregation(aggregator) if finish else aggregator.result()
+        else:
+            self.data = self._process_by_placa_and_date(raw_data)
         return self.data
     
-    def _process_tables(self, tables: List, page_num: int) -> List[Dict]:
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Gera os registros brutos (um por linha) à medida que cada página é processada
+        
+        Yields:
+            Dict: Registro bruto extraído de uma linha
+        """
+        for batch in self.iter_batches():
+            yield from batch
+    
+    def iter_batches(self) -> Iterator[RecordBatch]:
+        """
+        Gera os registros brutos em lotes colunares à medida que as páginas são processadas
+        
+        Nenhum lote com todos os registros é mantido em memória. No modo
+        sequencial há um lote por página; no paralelo, um por intervalo de
+        páginas, em ordem.
+        
+        Yields:
+            RecordBatch: Registros brutos de uma página ou intervalo de páginas
+        """
+        if self.workers > 1:
+            yield from self._iter_parallel_chunks()
+            return
+        
+        with self.metrics.time('abrir_pdf'):
+            pdf = pdfplumber.open(self.pdf_path)
+        
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        with closing_pdf(pdf):
+            first_page, last_page = self._page_bounds(pdf)
+            total_pages = last_page - first_page + 1
+            pages = iter_pages(pdf, first_page, last_page)
+            
+            strategy, probed_records, probed_pages = self._resolve_strategy(pages)
+            records = len(probed_records)
+            self.metrics.incr('paginas', probed_pages)
+            if probed_records:
+                yield probed_records
+            self._report_progress(probed_pages, total_pages, records)
+            
+            for page in pages:
+                page_num = page.page_number
+                if debug:
+                    log_event(logger, logging.DEBUG, 'pagina', "Processando página", pagina=page_num)
+                page_records = self._extract_page(page, page_num, strategy)
+                self.metrics.incr('paginas')
+                records += len(page_records)
+                yield page_records
+                self._report_progress(page_num - first_page + 1, total_pages, records)
+    
+    def create_aggregator(self, on_page: Callable[[Dict], None] = None) -> 'PlacaDataAggregator':
+        """
+        Cria um agregador incremental por placa + data usando as regras deste extrator
+        
+        Args:
+            on_page (Callable): Recebe as contagens parciais a cada nova página
+            
+        Returns:
+            PlacaDataAggregator: Agregador vazio
+        """
+        return PlacaDataAggregator(self.money.centavos, format_centavos, on_page)
+    
+    def _iter_parallel_chunks(self) -> Iterator[RecordBatch]:
+        """
+        Extrai os registros brutos distribuindo intervalos de páginas em um pool de processos
+        
+        O contexto de placa (current_placa) é reiniciado a cada página em
+        _process_text, então dividir o documento por páginas não altera o
+        resultado. Os intervalos são entregues na ordem original das páginas.
+        
+        Yields:
+            RecordBatch: Registros brutos de cada intervalo de páginas
+        """
+        with self.metrics.time('abrir_pdf'):
+            pdf = pdfplumber.open(self.pdf_path)
+        
+        with closing_pdf(pdf):
+            first_page, last_page = self._page_bounds(pdf)
+            pages = iter_pages(pdf, first_page, last_page)
+            strategy, probed_records, probed_pages = self._resolve_strategy(pages)
+            pages.close()
+        total_pages = last_page - first_page + 1
+        
+        self.metrics.incr('paginas', probed_pages)
+        records = len(probed_records)
+        if probed_records:
+            yield probed_records
+        self._report_progress(probed_pages, total_pages, records)
+        
+        ranges = _split_page_ranges(first_page + probed_pages, last_page, self.workers)
+        if not ranges:
+            return
+        
+        log_event(logger, logging.INFO, 'extracao_paralela', "Extração paralela iniciada",
+                  paginas=total_pages, intervalos=len(ranges), processos=self.workers)
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(ranges))) as executor:
+            chunks = executor.map(
+                _extract_page_range,
+                [self.pdf_path] * len(ranges),
+                [first for first, _ in ranges],
+                [last for _, last in ranges],
+                [strategy] * len(ranges)
+            )
+            for (_, last), (chunk, worker_metrics) in zip(ranges, chunks):
+                self.metrics.merge(worker_metrics)
+                records += len(chunk)
+                yield chunk
+                self._report_progress(last - first_page + 1, total_pages, records)
+    
+    def _report_progress(self, pages_done: int, total_pages: int, records: int):
+        """Envia o andamento da extração ao callback on_progress, se houver"""
+        if self.on_progress:
+            self.on_progress({
+                'paginas_processadas': pages_done,
+                'total_paginas': total_pages,
+                'registros': records
+            })
+    
+    def _page_bounds(self, pdf) -> Tuple[int, int]:
+        """
+        Primeira e última página a extrair, conforme page_range e max_pages
+        
+        Também registra o total de páginas do documento em self.document_pages.
+        
+        Args:
+            pdf: Documento aberto pelo pdfplumber
+            
+        Returns:
+            Tuple[int, int]: Páginas 1-indexadas, inclusive (última < primeira se
+                não houver páginas a extrair)
+        """
+        self.document_pages = count_pages(pdf)
+        first_page, last_page = self.page_range or (1, self.document_pages)
+        last_page = min(last_page, self.document_pages)
+        if self.max_pages is not None:
+            last_page = min(last_page, first_page + self.max_pages - 1)
+        return first_page, max(last_page, first_page - 1)
+    
+    def _resolve_strategy(self, pages: Iterator[Page]) -> Tuple[str, RecordBatch, int]:
+        """
+        Resolve a estratégia de extração, sondando as primeiras páginas no modo 'auto'
+        
+        Cada página sondada é processada pelos dois layouts. Fica o que
+        produziu mais registros (o tempo medido só desempata), para que o
+        mesmo PDF sempre resolva para o mesmo layout; os registros já
+        extraídos por ele nas páginas sondadas são reaproveitados para não
+        processá-las de novo.
+        
+        Args:
+            pages (Iterator[Page]): Páginas a extrair (iter_pages); as sondadas
+                são consumidas e o restante continua no mesmo iterador
+            
+        Returns:
+            Tuple[str, RecordBatch, int]: Estratégia resolvida, registros das
+                páginas sondadas e quantidade de páginas sondadas
+        """
+        if self.strategy != 'auto':
+            return self.strategy, RecordBatch(), 0
+        
+        cost = {'text': 0.0, 'tables': 0.0}
+        probed = {'text': RecordBatch(), 'tables': RecordBatch()}
+        probed_pages = 0
+        
+        for page in pages:
+            page_num = page.page_number
+            log_event(logger, logging.DEBUG, 'pagina', "Sondando página", pagina=page_num)
+            
+            for strategy in cost:
+                start = time.perf_counter()
+                self._extract_page(page, page_num, strategy, probed[strategy])
+                cost[strategy] += time.perf_counter() - start
+            
+            probed_pages += 1
+            if probed_pages >= AUTO_MAX_PROBE_PAGES or (
+                    probed_pages >= AUTO_PROBE_PAGES and (probed['text'] or probed['tables'])):
+                break
+        
+        # Regra determinística: o layout com mais registros nas páginas sondadas;
+        # o tempo só desempata (ele varia com a carga da máquina e o layout de
+        # texto roda primeiro, aquecendo o cache de caracteres do pdfplumber)
+        counts = {strategy: len(probed[strategy]) for strategy in cost}
+        if counts['text'] == counts['tables']:
+            resolved = min(cost, key=cost.get) if counts['text'] else 'text'
+        else:
+            resolved = max(counts, key=counts.get)
+        
+        log_event(logger, logging.INFO, 'estrategia', f"Estratégia automática: '{resolved}'",
+                  texto_registros=counts['text'], tabelas_registros=counts['tables'],
+                  texto_s=round(cost['text'], 3), tabelas_s=round(cost['tables'], 3), paginas=probed_pages)
+        
+        self.resolved_strategy = resolved
+        return resolved, probed[resolved], probed_pages
+    
+    def _extract_page(self, page, page_num: int, strategy: str, batch: RecordBatch = None) -> RecordBatch:
+        """
+        Extrai os registros brutos de uma única página com um único layout
+        
+        Usar apenas um layout evita o custo dobrado do pdfplumber e impede
+        que a mesma linha seja somada duas vezes (tabela + texto).
+        
+        Args:
+            page: Página do pdfplumber
+            page_num (int): Número da página
+            strategy (str): 'text' ou 'tables'
+            batch (RecordBatch): Lote a completar (um novo é criado se None)
+            
+        Returns:
+            RecordBatch: Lote com os registros brutos da página
+        """
+        if batch is None:
+            batch = RecordBatch()
+        
+        if strategy == 'tables':
+            with self.metrics.time('layout_tabelas'):
+                tables = page.extract_tables()
+            if not tables:
+                return batch
+            with self.metrics.time('parsing'):
+                return self._process_tables(tables, page_num, batch)
+        
+        with self.metrics.time('layout_texto'):
+            text = page.extract_text()
+        if not text:
+            return batch
+        with self.metrics.time('parsing'):
+            return self._process_text(text, page_num, batch)
+    
+    def _process_tables(self, tables: List, page_num: int, batch: RecordBatch = None) -> RecordBatch:
         """
         Processa tabelas encontradas no PDF
         
         Args:
             tables (List): Lista de tabelas extraídas
             page_num (int): Número da página
+            batch (RecordBatch): Lote a completar (um novo é criado se None)
             
         Returns:
-            List[Dict]: Lista de dados extraídos das tabelas
+            RecordBatch: Lote com os dados extraídos das tabelas
         """
-        extracted_data = []
+        extracted_data = batch if batch is not None else RecordBatch()
         
         for table_num, table in enumerate(tables, 1):
             if not table:
                 continue
                 
-            print(f"Processando tabela {table_num} da página {page_num}...")
+            log_event(logger, logging.DEBUG, 'tabela', "Processando tabela", tabela=table_num, pagina=page_num)
             
             for row_num, row in enumerate(table):
                 if not row or not any(row):
                     continue
                 
                 # Processa cada linha da tabela
-                row_data = self._process_table_row(row, page_num, table_num, row_num)
+                row_data = self._extract_from_row(row, page_num, table_num)
                 if row_data:
-                    extracted_data.append(row_data)
+                    extracted_data.append_record(row_data)
         
         return extracted_data
     
-    def _process_text(self, text: str, page_num: int) -> List[Dict]:
+    def _process_text(self, text: str, page_num: int, batch: RecordBatch = None) -> RecordBatch:
         """
         Processa texto bruto da página extraindo cada registro individualmente
         Mantém contexto da placa atual para linhas subsequentes
         
+        O texto da página é guardado uma vez no lote e cada registro aponta
+        para a sua linha por deslocamento.
+        
         Args:
             text (str): Texto da página
             page_num (int): Número da página
+            batch (RecordBatch): Lote a completar (um novo é criado se None)
             
         Returns:
-            List[Dict]: Lista de dados extraídos do texto
+            RecordBatch: Lote com os dados extraídos do texto
         """
-        extracted_data = []
+        extracted_data = batch if batch is not None else RecordBatch()
+        offset = extracted_data.add_text(text)
         lines = text.split('\n')
         current_placa = None
+        # Registros da página acumulados em tuplas e gravados no lote de uma
+        # vez no final (um append por coluna e por linha custava mais que o parsing)
+        rows = []
+        clean_placa, clean_data, clean_valor = self._clean_placa, self._clean_data, self._clean_valor
         
         for line_num, line in enumerate(lines, 1):
-            if not line.strip():
+            start = offset
+            offset += len(line) + 1
+            
+            stripped = line.strip()
+            if not stripped:
                 continue
             
             # Verifica se é uma linha de cabeçalho (ignora)
@@ -104,23 +964,37 @@ class PDFExtractor:
                 continue
                 
             # Verifica se é linha de total (ignora)
-            if line.strip().startswith('TOTAL R$'):
+            if stripped.startswith('TOTAL R$'):
                 current_placa = None  # Reset do contexto após total
                 continue
             
+            # Placa, data e valores da linha em uma única passada
+            placa_na_linha, data, valores = tokenize_line(line)
+            
             # Verifica se há uma placa na linha atual
-            placa_na_linha = self._find_pattern(line, r'\b[A-Z]{3}[-\s]?\d{4}\b|\b[A-Z]{3}[-\s]?\d[A-Z]\d{2}\b')
             if placa_na_linha:
-                current_placa = self._clean_placa(placa_na_linha)
+                current_placa = clean_placa(placa_na_linha)
             
-            # Tenta extrair dados da linha atual (com contexto da placa)
-            line_data = self._extract_line_data_with_context(line, page_num, line_num, current_placa)
-            if line_data:
-                extracted_data.append(line_data)
+            # Mesma regra de _parse_line_with_context, sem limpar a placa de novo:
+            # placa (da linha ou do contexto), data e valor; o penúltimo valor é
+            # o principal (o último costuma ser a quantidade)
+            if current_placa and data and valores:
+                valor = valores[-2] if len(valores) >= 2 else valores[-1]
+                rows.append((current_placa, clean_data(data), clean_valor(valor),
+                             f"linha_{line_num}", start, start + len(line)))
+        
+        if rows:
+            placas, datas, valores, linhas_referencia, inicios, fins = zip(*rows)
+            extracted_data.append_columns(page_num, placas, datas, valores,
+                                          map(self.money.centavos, valores), linhas_referencia, inicios, fins)
+        
+        self.metrics.incr('linhas_lidas', len(lines))
+        self.metrics.incr('linhas_com_registro', len(rows))
         
         return extracted_data
     
-    def _extract_line_data_with_context(self, line: str, page_num: int, line_num: int, current_placa: str) -> Dict:
+    def _extract_line_data_with_context(self, line: str, page_num: int, line_num: int, current_placa: str,
+                                        tokens: Tuple[Optional[str], Optional[str], List[str]] = None) -> Dict:
         """
         Extrai dados de uma única linha usando o contexto da placa atual
         
@@ -129,12 +1003,43 @@ class PDFExtractor:
             page_num (int): Número da página
             line_num (int): Número da linha
             current_placa (str): Placa atual no contexto
+            tokens (Tuple): Resultado de tokenize_line para a linha, se já calculado
             
         Returns:
             Dict: Dados extraídos da linha ou None se não encontrar dados válidos
         """
-        # Procura por placa na linha atual
-        placa_na_linha = self._find_pattern(line, r'\b[A-Z]{3}[-\s]?\d{4}\b|\b[A-Z]{3}[-\s]?\d[A-Z]\d{2}\b')
+        line_data = self._parse_line_with_context(line, current_placa, tokens)
+        if line_data is None:
+            return None
+        
+        placa, data, valor_limpo = line_data
+        return {
+            'placa': placa,
+            'data': data,
+            'total': valor_limpo,
+            'valor_centavos': self.money.centavos(valor_limpo),
+            'texto_original': line,
+            'pagina': page_num,
+            'linha_referencia': f"linha_{line_num}"
+        }
+    
+    def _parse_line_with_context(self, line: str, current_placa: str,
+                                 tokens: Tuple[Optional[str], Optional[str], List[str]] = None
+                                 ) -> Optional[Tuple[str, str, str]]:
+        """
+        Lê placa, data e valor de uma linha usando o contexto da placa atual
+        
+        Args:
+            line (str): Linha de texto
+            current_placa (str): Placa atual no contexto
+            tokens (Tuple): Resultado de tokenize_line para a linha, se já calculado
+            
+        Returns:
+            Optional[Tuple[str, str, str]]: Placa, data e valor já limpos, ou None
+                se a linha não tiver um registro válido
+        """
+        # Procura por placa, data e valores na linha atual
+        placa_na_linha, data, valores = tokens if tokens is not None else tokenize_line(line)
         
         # Usa a placa da linha ou a placa do contexto
         placa = placa_na_linha if placa_na_linha else current_placa
@@ -143,13 +1048,10 @@ class PDFExtractor:
         if not placa:
             return None
         
-        # Procura por data
-        data = self._find_pattern(line, r'\b\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b')
+        # Exige data na linha
         if not data:
             return None
         
-        # Procura por valores monetários na linha
-        valores = re.findall(r'\d+[.,]\d{2}', line)
         valor = None
         
         if valores:
@@ -161,15 +1063,7 @@ class PDFExtractor:
                 valor = valores[-1]  # Se só tem um valor, usa ele
         
         if valor:
-            line_ref = f"linha_{line_num}"
-            return {
-                'placa': self._clean_placa(placa),
-                'data': self._clean_data(data),
-                'total': self._clean_valor(valor),
-                'texto_original': line,
-                'pagina': page_num,
-                'linha_referencia': line_ref
-            }
+            return self._clean_placa(placa), self._clean_data(data), self._clean_valor(valor)
         
         return None
 
@@ -186,15 +1080,15 @@ class PDFExtractor:
             Dict: Dados extraídos da linha ou None se não encontrar dados válidos
         """
         # Procura por placa
-        placa = self._find_pattern(line, r'\b[A-Z]{3}[-\s]?\d{4}\b|\b[A-Z]{3}[-\s]?\d[A-Z]\d{2}\b')
+        placa = self._find_pattern(line, PATTERNS['placa'])
         if not placa:
             return None
         
         # Procura por data
-        data = self._find_pattern(line, r'\b\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b')
+        data = self._find_pattern(line, PATTERNS['data'])
         
         # Procura por valor monetário
-        valor = self._find_pattern(line, r'R?\$?\s*\d+[.,]\d{2}|\d+[.,]\d{2}')
+        valor = self._find_pattern(line, PATTERNS['valor_com_moeda'])
         
         # Se encontrou placa, cria o registro (mesmo que data/valor estejam vazios)
         if placa:
@@ -206,6 +1100,7 @@ class PDFExtractor:
                 'placa': placa_limpa,
                 'data': data_limpa,
                 'total': valor_limpo,
+                'valor_centavos': self.money.centavos(valor_limpo),
                 'texto_original': line.strip(),
                 'pagina': page_num,
                 'linha_referencia': f"linha_{line_num}"
@@ -224,7 +1119,7 @@ class PDFExtractor:
             str: Valor extraído
         """
         # Padrão para TOTAL R$ 250,00
-        match = re.search(r'TOTAL\s+R\$\s*([\d.,]+)', total_line)
+        match = PATTERNS['total_linha'].search(total_line)
         if match:
             return match.group(1)
         return None
@@ -240,7 +1135,7 @@ class PDFExtractor:
             str: Primeira data encontrada
         """
         for line in group_lines:
-            data = self._find_pattern(line, r'\b\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b')
+            data = self._find_pattern(line, PATTERNS['data'])
             if data:
                 return self._clean_data(data)
         return ''
@@ -255,18 +1150,17 @@ class PDFExtractor:
         Returns:
             str: Valor total estimado
         """
-        total = 0.0
+        total = 0
         
         for line in group_lines:
             # Procura valores na linha (assumindo que o último valor é o total da linha)
-            valores = re.findall(r'\d+[.,]\d{2}', line)
+            valores = PATTERNS['valor'].findall(line)
             if valores:
-                # Pega o maior valor da linha (provavelmente o total)
-                maior_valor = max(valores, key=lambda x: self._convert_valor_to_float(x))
-                total += self._convert_valor_to_float(maior_valor)
+                # Soma o maior valor da linha (provavelmente o total), em centavos
+                total += max(self.money.centavos(valor) for valor in valores)
         
         if total > 0:
-            return f"{total:.2f}".replace('.', ',')
+            return f"{total // 100},{total % 100:02d}"
         
         return None
     
@@ -300,21 +1194,18 @@ class PDFExtractor:
         Returns:
             Dict: Dicionário com dados extraídos ou None
         """
-        # Padrões de regex para identificar os dados
-        placa_pattern = r'\b[A-Z]{3}[-\s]?\d{4}\b|\b[A-Z]{3}[-\s]?\d[A-Z]\d{2}\b'
-        data_pattern = r'\b\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{2,4}\b'
-        valor_pattern = r'R?\$?\s*\d{1,3}(?:[.,]\d{3})*[.,]\d{2}'
-        
-        placa = self._find_pattern(line, placa_pattern)
-        data = self._find_pattern(line, data_pattern)
-        valor = self._find_pattern(line, valor_pattern)
+        placa = self._find_pattern(line, PATTERNS['placa'])
+        data = self._find_pattern(line, PATTERNS['data'])
+        valor = self._find_pattern(line, PATTERNS['valor_milhares'])
         
         # Se encontrou pelo menos placa e um dos outros campos
         if placa and (data or valor):
+            valor_limpo = self._clean_valor(valor) if valor else ''
             return {
                 'placa': self._clean_placa(placa),
                 'data': self._clean_data(data) if data else '',
-                'total': self._clean_valor(valor) if valor else '',
+                'total': valor_limpo,
+                'valor_centavos': self.money.centavos(valor_limpo),
                 'texto_original': line,
                 'pagina': page_num,
                 'linha_referencia': line_ref
@@ -322,108 +1213,93 @@ class PDFExtractor:
         
         return None
     
-    def _find_pattern(self, text: str, pattern: str) -> str:
+    def _find_pattern(self, text: str, pattern) -> str:
         """
         Encontra padrão no texto
         
         Args:
             text (str): Texto para buscar
-            pattern (str): Padrão regex
+            pattern: Padrão pré-compilado (de PATTERNS) ou regex em texto
             
         Returns:
             str: Primeiro match encontrado ou None
         """
-        match = re.search(pattern, text, re.IGNORECASE)
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern, re.IGNORECASE)
+        
+        match = pattern.search(text)
         return match.group() if match else None
     
-    def _process_by_placa_and_date(self, raw_data: List[Dict]) -> List[Dict]:
+    def _process_by_placa_and_date(self, raw_data) -> List[Dict]:
         """
         Processa os dados mantendo registros separados por placa e data
         Diferentes datas para a mesma placa resultam em linhas separadas
         
         Args:
-            raw_data (List[Dict]): Dados brutos extraídos
+            raw_data (RecordBatch | List[Dict]): Dados brutos extraídos
             
         Returns:
             List[Dict]: Dados organizados por placa e data
         """
-        if not raw_data:
-            return []
-        
-        print(f"\nProcessando {len(raw_data)} registros por placa e data...")
+        if self.aggregation == 'pandas':
+            return self._run_aggregation(
+                len(raw_data), lambda: aggregate_by_placa_data(records_frame(raw_data, self.money.centavos))
+            )
+        
+        aggregator = self.create_aggregator()
+        with self.metrics.time('agregacao'):
+            if isinstance(raw_data, RecordBatch):
+                aggregator.add_batch(raw_data)
+            else:
+                for item in raw_data:
+                    aggregator.add(item)
         
-        # Dicionário para agrupar por placa + data
-        combined_data = {}
+        return self.finish_aggregation(aggregator)
+    
+    def finish_aggregation(self, aggregator: PlacaDataAggregator) -> List[Dict]:
+        """
+        Finaliza um agregador por placa e data (inclusive um alimentado por outro extrator)
         
-        for item in raw_data:
-            placa = item.get('placa', '').strip()
-            data = item.get('data', '').strip()
-            
-            if not placa:
-                continue
-            
-            # Chave única: placa + data
-            key = f"{placa}|{data}"
-            
-            # Converte valor para float para soma (se houver múltiplos registros na mesma data)
-            valor_str = item.get('total', '').strip()
-            valor_float = self._convert_valor_to_float(valor_str)
-            
-            if key not in combined_data:
-                combined_data[key] = {
-                    'placa': placa,
-                    'data': data,
-                    'total_valor': 0.0,
-                    'registros_originais': [],
-                    'paginas': set(),
-                    'total_registros': 0
-                }
+        Args:
+            aggregator (PlacaDataAggregator): Agregador já alimentado
             
-            # Soma valores da mesma placa na mesma data
-            combined_data[key]['total_valor'] += valor_float
-            combined_data[key]['registros_originais'].append(item.get('texto_original', ''))
-            combined_data[key]['paginas'].add(item.get('pagina', 0))
-            combined_data[key]['total_registros'] += 1
+        Returns:
+            List[Dict]: Dados organizados por placa e data
+        """
+        return self._run_aggregation(aggregator.registros_lidos, aggregator.result)
+    
+    def _run_aggregation(self, registros: int, build: Callable[[], List[Dict]]) -> List[Dict]:
+        """
+        Gera o resultado por placa e data medindo o tempo e registrando o andamento
         
-        # Converte para lista de dicionários
-        result = []
-        for key, dados in combined_data.items():
-            placa = dados['placa']
-            data = dados['data']
-            
-            # Formata o valor total
-            valor_total_formatado = self._format_currency_br(dados['total_valor'])
-            
-            # Cria texto original
-            if dados['total_registros'] > 1:
-                texto_original = f"PLACA: {placa} | DATA: {data} | TOTAL: R$ {valor_total_formatado} | REGISTROS: {dados['total_registros']}"
-            else:
-                texto_original = f"PLACA: {placa} | DATA: {data} | TOTAL: R$ {valor_total_formatado}"
+        Args:
+            registros (int): Registros brutos agregados
+            build (Callable): Monta o resultado (agregador incremental ou vetorizado)
             
-            result.append({
-                'placa': placa,
-                'data': data,
-                'total': valor_total_formatado,
-                'texto_original': texto_original,
-                'pagina': min(dados['paginas']) if dados['paginas'] else 0,
-                'linha_referencia': f"placa_{placa}_data_{data}",
-                'registros_individuais': dados['total_registros'],
-                'valor_numerico': dados['total_valor']
-            })
+        Returns:
+            List[Dict]: Dados organizados por placa e data
+        """
+        if not registros:
+            return []
         
-        print(f"Processamento concluído: {len(result)} registros únicos (placa+data)")
+        log_event(logger, logging.INFO, 'agregacao', "Agrupando registros por placa e data",
+                  registros=registros)
         
-        # Ordena por placa e depois por data
-        result.sort(key=lambda x: (x['placa'], x['data']))
+        with self.metrics.time('agregacao'):
+            result = build()
+        self.metrics.incr('registros', len(result))
+        
+        log_event(logger, logging.INFO, 'agregacao_concluida', "Processamento concluído",
+                  registros_unicos=len(result))
         
         return result
 
-    def _aggregate_by_placa(self, raw_data: List[Dict]) -> List[Dict]:
+    def _aggregate_by_placa(self, raw_data) -> List[Dict]:
         """
         Agrega os dados por placa, somando os valores totais de cada placa
         
         Args:
-            raw_data (List[Dict]): Dados brutos extraídos
+            raw_data (RecordBatch | List[Dict]): Dados brutos extraídos
             
         Returns:
             List[Dict]: Dados agregados por placa
@@ -431,7 +1307,12 @@ class PDFExtractor:
         if not raw_data:
             return []
         
-        print(f"\nAgregando {len(raw_data)} registros por placa...")
+        log_event(logger, logging.INFO, 'agregacao', "Agregando registros por placa", registros=len(raw_data))
+        
+        if self.aggregation == 'pandas':
+            result = aggregate_by_placa(records_frame(raw_data, self.money.centavos))
+            log_event(logger, logging.INFO, 'agregacao_concluida', "Agregação concluída", placas_unicas=len(result))
+            return result
         
         # Dicionário para agrupar por placa
         placas_data = {}
@@ -441,26 +1322,26 @@ class PDFExtractor:
             if not placa:
                 continue
             
-            # Converte valor para float para soma
-            valor_str = item.get('total', '').strip()
-            valor_float = self._convert_valor_to_float(valor_str)
+            # Valor em centavos inteiros para soma
+            centavos = item.get('valor_centavos')
+            if centavos is None:
+                centavos = self.money.centavos(item.get('total', '').strip())
             
             data = item.get('data', '').strip()
             
             if placa not in placas_data:
                 placas_data[placa] = {
                     'placa': placa,
-                    'total_valor': 0.0,
+                    'total_centavos': 0,
                     'datas': set(),
                     'primeira_data': data,
                     'ultima_data': data,
-                    'registros_originais': [],
                     'paginas': set(),
                     'total_registros': 0
                 }
             
             # Soma o valor
-            placas_data[placa]['total_valor'] += valor_float
+            placas_data[placa]['total_centavos'] += centavos
             
             # Adiciona data se válida
             if data:
@@ -471,8 +1352,6 @@ class PDFExtractor:
                 if not placas_data[placa]['ultima_data'] or data > placas_data[placa]['ultima_data']:
                     placas_data[placa]['ultima_data'] = data
             
-            # Adiciona informações do registro original
-            placas_data[placa]['registros_originais'].append(item.get('texto_original', ''))
             placas_data[placa]['paginas'].add(item.get('pagina', 0))
             placas_data[placa]['total_registros'] += 1
         
@@ -488,7 +1367,7 @@ class PDFExtractor:
                 data_final = list(dados['datas'])[0]
             
             # Formata o valor total
-            valor_total_formatado = self._format_currency_br(dados['total_valor'])
+            valor_total_formatado = format_centavos(dados['total_centavos'])
             
             # Cria texto original agregado
             texto_original = f"PLACA: {placa} | TOTAL: R$ {valor_total_formatado} | REGISTROS: {dados['total_registros']}"
@@ -501,10 +1380,11 @@ class PDFExtractor:
                 'pagina': min(dados['paginas']) if dados['paginas'] else 0,
                 'linha_referencia': f"agregado_{dados['total_registros']}_registros",
                 'registros_individuais': dados['total_registros'],
-                'valor_numerico': dados['total_valor']
+                'valor_numerico': dados['total_centavos'] / 100,
+                'valor_centavos': dados['total_centavos']
             })
         
-        print(f"Agregação concluída: {len(result)} placas únicas encontradas")
+        log_event(logger, logging.INFO, 'agregacao_concluida', "Agregação concluída", placas_unicas=len(result))
         
         # Ordena por placa
         result.sort(key=lambda x: x['placa'])
@@ -515,60 +1395,16 @@ class PDFExtractor:
         """
         Converte string de valor para float com tratamento robusto de erros
         
+        Valores bem formados seguem o caminho rápido do MoneyParser; os
+        demais passam pelas heurísticas de money.parse_slow.
+        
         Args:
             valor_str (str): Valor em string
             
         Returns:
             float: Valor convertido para float
         """
-        if not valor_str or valor_str.strip() == '':
-            return 0.0
-        
-        try:
-            # Remove R$, espaços e outros caracteres desnecessários
-            valor_clean = re.sub(r'[R$\s]', '', str(valor_str).strip())
-            
-            # Se a string está vazia após limpeza, retorna 0
-            if not valor_clean:
-                return 0.0
-            
-            # Detecta se o valor parece ser uma concatenação incorreta
-            # Ex: '010.0608030.03060' (múltiplos pontos em posições estranhas)
-            if valor_clean.count('.') > 1:
-                # Verifica se é um caso de concatenação incorreta
-                if len(valor_clean) > 10 and not self._is_valid_currency_format(valor_clean):
-                    print(f"Aviso: Valor '{valor_str}' parece ser uma concatenação incorreta, tentando extrair primeiro valor válido")
-                    return self._extract_first_valid_value(valor_clean)
-            
-            # Verifica se tem múltiplas vírgulas (também indica problema)
-            if valor_clean.count(',') > 1:
-                print(f"Aviso: Valor '{valor_str}' tem múltiplas vírgulas, tentando extrair primeiro valor válido")
-                return self._extract_first_valid_value(valor_clean)
-            
-            # Trata formatação brasileira normal (1.234,56)
-            if ',' in valor_clean and '.' in valor_clean:
-                # Remove pontos (milhares) e substitui vírgula por ponto (decimal)
-                valor_clean = valor_clean.replace('.', '').replace(',', '.')
-            elif ',' in valor_clean:
-                # Se só tem vírgula, verifica se é decimal ou milhares
-                parts = valor_clean.split(',')
-                if len(parts) == 2 and len(parts[1]) == 2:
-                    # Provavelmente decimal (ex: 100,50)
-                    valor_clean = valor_clean.replace(',', '.')
-                else:
-                    # Provavelmente milhares (ex: 1,000)
-                    valor_clean = valor_clean.replace(',', '')
-            
-            # Última verificação: se ainda contém caracteres não numéricos (exceto ponto)
-            if not re.match(r'^\d+\.?\d*$', valor_clean):
-                print(f"Aviso: Valor '{valor_str}' contém caracteres inválidos após limpeza: '{valor_clean}'")
-                return self._extract_first_valid_value(valor_str)
-            
-            return float(valor_clean)
-            
-        except (ValueError, AttributeError) as e:
-            print(f"Erro ao converter valor '{valor_str}' para float: {e}")
-            return 0.0
+        return self.money.to_float(valor_str)
     
     def _is_valid_currency_format(self, valor_str: str) -> bool:
         """
@@ -580,21 +1416,7 @@ class PDFExtractor:
         Returns:
             bool: True se é um formato válido
         """
-        # Padrões válidos:
-        # 123.45 ou 1234.56 ou 12345.67
-        # 1.234,56 ou 12.345,67 ou 123.456,78
-        # 123,45 ou 1234,56
-        
-        patterns = [
-            r'^\d{1,3}\.\d{2}$',                    # 123.45
-            r'^\d{4,}\.\d{2}$',                     # 1234.56
-            r'^\d{1,3}(,\d{3})*\.\d{2}$',         # 1,234.56 (formato americano)
-            r'^\d{1,3}(\.\d{3})*,\d{2}$',         # 1.234,56 (formato brasileiro)
-            r'^\d+,\d{2}$',                        # 123,45
-            r'^\d+$'                               # 123 (inteiro)
-        ]
-        
-        return any(re.match(pattern, valor_str) for pattern in patterns)
+        return is_valid_currency_format(valor_str)
     
     def _extract_first_valid_value(self, valor_str: str) -> float:
         """
@@ -606,92 +1428,23 @@ class PDFExtractor:
         Returns:
             float: Primeiro valor válido encontrado
         """
-        try:
-            # Remove caracteres não numéricos, pontos e vírgulas
-            valor_clean = re.sub(r'[^0-9.,]', '', str(valor_str))
-            
-            # Procura por padrões de valores monetários válidos
-            # Padrão brasileiro: 123,45 ou 1.234,56
-            br_pattern = r'\d{1,3}(?:\.\d{3})*,\d{2}'
-            match = re.search(br_pattern, valor_clean)
-            if match:
-                found_value = match.group()
-                # Converte formato brasileiro para float
-                return float(found_value.replace('.', '').replace(',', '.'))
-            
-            # Padrão americano: 123.45 ou 1,234.56
-            us_pattern = r'\d{1,3}(?:,\d{3})*\.\d{2}'
-            match = re.search(us_pattern, valor_clean)
-            if match:
-                found_value = match.group()
-                # Converte formato americano para float
-                return float(found_value.replace(',', ''))
-            
-            # Procura por números simples com vírgula decimal
-            simple_pattern = r'\d+,\d{2}'
-            match = re.search(simple_pattern, valor_clean)
-            if match:
-                found_value = match.group()
-                return float(found_value.replace(',', '.'))
-            
-            # Procura por números simples com ponto decimal
-            simple_pattern = r'\d+\.\d{2}'
-            match = re.search(simple_pattern, valor_clean)
-            if match:
-                found_value = match.group()
-                return float(found_value)
-            
-            # Como último recurso, procura apenas dígitos
-            digits = re.findall(r'\d+', valor_clean)
-            if digits:
-                # Pega o primeiro número encontrado
-                first_number = digits[0]
-                # Se tem mais de 2 dígitos, assume que os últimos 2 são centavos
-                if len(first_number) > 2:
-                    return float(f"{first_number[:-2]}.{first_number[-2:]}")
-                else:
-                    return float(first_number)
-            
-            print(f"Aviso: Não foi possível extrair valor válido de '{valor_str}'")
-            return 0.0
-            
-        except Exception as e:
-            print(f"Erro ao extrair valor de '{valor_str}': {e}")
-            return 0.0
+        self.metrics.incr('valores_fallback')
+        return extract_first_valid_value(valor_str)
     
     def _format_currency_br(self, valor: float) -> str:
         """
         Formata valor para moeda brasileira (R$ 1.234,56)
         
+        Os totais já são mantidos em centavos e formatados por
+        money.format_centavos; este método fica para valores em float.
+        
         Args:
             valor (float): Valor numérico
             
         Returns:
             str: Valor formatado em moeda brasileira
         """
-        if valor == 0:
-            return "0,00"
-        
-        # Converte para string com 2 casas decimais
-        valor_str = f"{valor:.2f}"
-        
-        # Separa parte inteira e decimal
-        partes = valor_str.split('.')
-        parte_inteira = partes[0]
-        parte_decimal = partes[1]
-        
-        # Formata parte inteira com separadores de milhares
-        if len(parte_inteira) > 3:
-            # Adiciona pontos a cada 3 dígitos da direita para esquerda
-            parte_inteira_formatada = ""
-            for i, digit in enumerate(reversed(parte_inteira)):
-                if i > 0 and i % 3 == 0:
-                    parte_inteira_formatada = "." + parte_inteira_formatada
-                parte_inteira_formatada = digit + parte_inteira_formatada
-        else:
-            parte_inteira_formatada = parte_inteira
-        
-        return f"{parte_inteira_formatada},{parte_decimal}"
+        return format_centavos(round(valor * 100))
     
     def _clean_placa(self, placa: str) -> str:
         """
@@ -706,8 +1459,13 @@ class PDFExtractor:
         if not placa:
             return ''
         
+        cached = self._clean_memo['placa'].get(placa)
+        if cached is not None:
+            return cached
+        original = placa
+        
         # Remove espaços e converte para maiúsculo
-        placa = re.sub(r'[^A-Z0-9]', '', placa.upper())
+        placa = PATTERNS['placa_lixo'].sub('', placa.upper())
         
         # Adiciona hífen se necessário (formato ABC1234 -> ABC-1234)
         if len(placa) == 7 and placa[:3].isalpha() and placa[3:].isdigit():
@@ -716,7 +1474,7 @@ class PDFExtractor:
         elif len(placa) == 7 and placa[:3].isalpha() and placa[3].isdigit() and placa[4].isalpha() and placa[5:].isdigit():
             placa = f"{placa[:3]}-{placa[3:]}"
             
-        return placa
+        return self._memorize('placa', original, placa)
     
     def _clean_data(self, data: str) -> str:
         """
@@ -730,12 +1488,17 @@ class PDFExtractor:
         """
         if not data:
             return ''
+        
+        cached = self._clean_memo['data'].get(data)
+        if cached is not None:
+            return cached
+        original = data
             
         # Remove caracteres não numéricos exceto / - .
-        data = re.sub(r'[^\d\/\-\.]', '', data)
+        data = PATTERNS['data_lixo'].sub('', data)
         
         # Substitui separadores por /
-        data = re.sub(r'[-\.]', '/', data)
+        data = PATTERNS['data_separador'].sub('/', data)
         
         # Tenta padronizar o ano
         parts = data.split('/')
@@ -754,9 +1517,27 @@ class PDFExtractor:
             dia = dia.zfill(2)
             mes = mes.zfill(2)
             
-            return f"{dia}/{mes}/{ano}"
+            data = f"{dia}/{mes}/{ano}"
+        
+        return self._memorize('data', original, data)
+    
+    def _memorize(self, field: str, original: str, clean: str) -> str:
+        """
+        Guarda o valor limpo de uma placa ou data (repetem-se muito no extrato)
         
-        return data
+        Args:
+            field (str): 'placa' ou 'data'
+            original (str): Texto bruto
+            clean (str): Texto limpo
+            
+        Returns:
+            str: O próprio texto limpo
+        """
+        memo = self._clean_memo[field]
+        if len(memo) >= MEMO_SIZE:
+            memo.clear()
+        memo[original] = clean
+        return clean
     
     def _clean_valor(self, valor: str) -> str:
         """
@@ -772,7 +1553,7 @@ class PDFExtractor:
             return ''
             
         # Remove R$ e espaços
-        valor = re.sub(r'R?\$?\s*', '', valor)
+        valor = PATTERNS['moeda_prefixo'].sub('', valor)
         
         # Substitui vírgula por ponto para decimal
         if ',' in valor and '.' in valor:
@@ -794,22 +1575,7 @@ class PDFExtractor:
         Args:
             output_path (str): Caminho do arquivo de saída
         """
-        if not self.data:
-            print("Nenhum dado encontrado para salvar.")
-            return
-            
-        if not output_path:
-            base_name = os.path.splitext(os.path.basename(self.pdf_path))[0]
-            output_path = f"{base_name}_dados_extraidos.xlsx"
-        
-        df = pd.DataFrame(self.data)
-        
-        # Reordena colunas
-        columns_order = ['placa', 'data', 'total', 'texto_original', 'pagina', 'linha_referencia']
-        df = df.reindex(columns=columns_order)
-        
-        df.to_excel(output_path, index=False)
-        print(f"Dados salvos em: {output_path}")
+        self.save_exports(excel_path=output_path or self._default_output_path('xlsx'))
     
     def save_to_csv(self, output_path: str = None):
         """
@@ -818,22 +1584,52 @@ class PDFExtractor:
         Args:
             output_path (str): Caminho do arquivo de saída
         """
+        self.save_exports(csv_path=output_path or self._default_output_path('csv'))
+    
+    def save_exports(self, excel_path: str = None, csv_path: str = None):
+        """
+        Salva os dados extraídos em Excel e CSV em uma única passada (exporters.py)
+        
+        Sem nenhum caminho informado, grava os dois arquivos com os nomes padrão.
+        
+        Args:
+            excel_path (str): Arquivo .xlsx de saída (None para não gerar)
+            csv_path (str): Arquivo .csv de saída (None para não gerar)
+        """
         if not self.data:
-            print("Nenhum dado encontrado para salvar.")
+            log_event(logger, logging.WARNING, 'exportacao', "Nenhum dado encontrado para salvar")
             return
-            
-        if not output_path:
-            base_name = os.path.splitext(os.path.basename(self.pdf_path))[0]
-            output_path = f"{base_name}_dados_extraidos.csv"
         
-        df = pd.DataFrame(self.data)
+        if not excel_path and not csv_path:
+            excel_path = self._default_output_path('xlsx')
+            csv_path = self._default_output_path('csv')
+        
+        with self.metrics.time('exportar'):
+            export_records(self.data, excel_path=excel_path, csv_path=csv_path)
+        for path in (excel_path, csv_path):
+            if path:
+                log_event(logger, logging.INFO, 'exportacao', "Dados salvos", arquivo=path)
+    
+    def save_to_parquet(self, output_path: str = None):
+        """
+        Salva os dados extraídos em Parquet tipado (requer o pyarrow)
         
-        # Reordena colunas
-        columns_order = ['placa', 'data', 'total', 'texto_original', 'pagina', 'linha_referencia']
-        df = df.reindex(columns=columns_order)
+        Args:
+            output_path (str): Caminho do arquivo de saída
+        """
+        if not self.data:
+            log_event(logger, logging.WARNING, 'exportacao', "Nenhum dado encontrado para salvar")
+            return
         
-        df.to_csv(output_path, index=False, encoding='utf-8-sig')
-        print(f"Dados salvos em: {output_path}")
+        output_path = output_path or self._default_output_path('parquet')
+        with self.metrics.time('exportar'):
+            export_parquet(self.data, output_path)
+        log_event(logger, logging.INFO, 'exportacao', "Dados salvos", arquivo=output_path)
+    
+    def _default_output_path(self, extension: str) -> str:
+        """Nome padrão do arquivo exportado, a partir do nome do PDF"""
+        base_name = os.path.splitext(os.path.basename(self.pdf_path))[0]
+        return f"{base_name}_dados_extraidos.{extension}"
     
     def print_summary(self):
         """
@@ -857,15 +1653,14 @@ class PDFExtractor:
         print(f"Total de registros individuais processados: {total_registros_individuais}")
         
         # Valor total geral
-        if 'valor_numerico' in df.columns:
-            valor_total_geral = df['valor_numerico'].sum()
-            valor_total_formatado = self._format_currency_br(valor_total_geral)
+        if 'valor_centavos' in df.columns:
+            valor_total_formatado = format_centavos(int(df['valor_centavos'].sum()))
             print(f"Valor total geral: R$ {valor_total_formatado}")
         
         print(f"\n=== PLACAS E VALORES AGREGADOS ===")
         for i, row in df.iterrows():
             registros_info = f" ({row.get('registros_individuais', 1)} registros)" if 'registros_individuais' in row else ""
-            valor_num = f" (R$ {self._format_currency_br(row.get('valor_numerico', 0))})" if 'valor_numerico' in row else ""
+            valor_num = f" (R$ {format_centavos(row.get('valor_centavos', 0))})" if 'valor_centavos' in row else ""
             print(f"Placa: {row['placa']} | Data: {row['data']} | Total: R$ {row['total']}{valor_num}{registros_info}")
         
         print(f"\n=== DETALHES DA AGREGAÇÃO ===")
@@ -878,12 +1673,54 @@ class PDFExtractor:
             print(f"Média de registros por placa: {media_registros:.1f}")
 
 
+def parse_page_range(value: str) -> Tuple[int, int]:
+    """
+    Lê o intervalo de páginas da linha de comando (tipo do argumento -p)
+    
+    Args:
+        value (str): 'INICIO-FIM' ou uma única página
+        
+    Returns:
+        Tuple[int, int]: Primeira e última página
+        
+    Raises:
+        argparse.ArgumentTypeError: Se o intervalo não for válido
+    """
+    inicio, _, fim = value.partition('-')
+    try:
+        page_range = (int(inicio), int(fim) if fim else int(inicio))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"intervalo inválido: '{value}' (use INICIO-FIM, ex.: 10-20)")
+    if not 1 <= page_range[0] <= page_range[1]:
+        raise argparse.ArgumentTypeError(f"intervalo inválido: '{value}' (páginas a partir de 1, INICIO <= FIM)")
+    return page_range
+
+
 def main():
     """
     Função principal para executar o extrator
     """
+    parser = argparse.ArgumentParser(description="Extrai placas, datas e valores de extratos em PDF")
+    parser.add_argument("pdf_path", nargs="?", default="00000002387300 - DEBITOS DETALHADOS.PDF",
+                        help="Caminho do arquivo PDF")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Número de processos para extração paralela (0 = todos os núcleos)")
+    parser.add_argument("-s", "--strategy", choices=EXTRACTION_STRATEGIES, default="auto",
+                        help="Layout de extração por página (padrão: auto)")
+    parser.add_argument("-a", "--aggregation", choices=AGGREGATION_ENGINES, default="python",
+                        help="Agregação incremental em Python ou vetorizada com pandas (padrão: python)")
+    parser.add_argument("-p", "--paginas", metavar="INICIO-FIM", type=parse_page_range,
+                        help="Intervalo de páginas a extrair (ex.: 10-20; padrão: todas)")
+    parser.add_argument("-n", "--max-paginas", type=int,
+                        help="Extrai no máximo N páginas a partir da primeira")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Também salva os dados em Parquet tipado (requer pyarrow)")
+    args = parser.parse_args()
+    
+    setup_logging()
+    
     # Caminho do PDF
-    pdf_path = "00000002387300 - DEBITOS DETALHADOS.PDF"
+    pdf_path = args.pdf_path
     
     if not os.path.exists(pdf_path):
         print(f"Arquivo não encontrado: {pdf_path}")
@@ -891,8 +1728,21 @@ def main():
     
     print(f"Iniciando extração do arquivo: {pdf_path}")
     
-    # Cria o extrator
-    extractor = PDFExtractor(pdf_path)
+    page_range = args.paginas
+    
+    # Pré-checagem: recusa PDFs sem texto ou de outro layout e escolhe a estratégia.
+    # Com --strategy explícito, só a falta de texto extraível impede a extração.
+    check = preflight(pdf_path, first_page=page_range[0] if page_range else 1)
+    if check['motivo'] and (args.strategy == 'auto' or not check['texto_extraivel']):
+        print(check['motivo'])
+        return
+    if check['motivo']:
+        print(f"Aviso: {check['motivo']} Extraindo mesmo assim com --strategy {args.strategy}.")
+    strategy = check['estrategia'] if args.strategy == 'auto' else args.strategy
+    
+    extractor = PDFExtractor(pdf_path, workers=args.workers, strategy=strategy,
+                             aggregation=args.aggregation, page_range=page_range,
+                             max_pages=args.max_paginas)
     
     # Extrai os dados
     data = extractor.extract_data()
@@ -901,9 +1751,10 @@ def main():
     extractor.print_summary()
     
     if data:
-        # Salva os dados
-        extractor.save_to_excel()
-        extractor.save_to_csv()
+        # Salva os dados (Excel e CSV na mesma passada)
+        extractor.save_exports()
+        if args.parquet:
+            extractor.save_to_parquet()
     else:
         print("Nenhum dado foi extraído. Verifique o formato do PDF.")
 
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Execução de jobs de processamento em segundo plano.
+Os jobs entram em uma fila limitada e cada vaga do pool executa um job por
+vez em um processo separado, com tempo limite e cancelamento por job.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Processos dos jobs criados por spawn, nunca por fork: o worker do gunicorn
+# roda várias threads, e um lock que outra thread segure no momento do fork
+# (cache de resultados, handlers de log) ficaria preso para sempre no filho
+_MP_CONTEXT = multiprocessing.get_context('spawn')
+
+
+def _run_child(target: Callable, conn, args: tuple):
+    """
+    Ponto de entrada do processo filho: executa o job e envia as atualizações pelo pipe
+    
+    Args:
+        target (Callable): Função do job, chamada como target(*args, report=...)
+        conn: Extremidade do pipe usada para enviar atualizações ao processo pai
+        args (tuple): Argumentos do job
+    """
+    def report(fields: Dict):
+        conn.send(fields)
+    
+    try:
+        target(*args, report=report)
+    except Exception as e:
+        conn.send({'status': 'error', 'message': f'Erro ao processar o arquivo: {str(e)}'})
+    finally:
+        conn.close()
+
+
+class JobRunner:
+    def __init__(self, target: Callable, on_update: Callable[[str, Dict], None],
+                 workers: int = 2, max_queue: int = 20, timeout: int = 600,
+                 is_cancelled: Callable[[str], bool] = None):
+        """
+        Inicializa o executor de jobs
+        
+        Args:
+            target (Callable): Função executada no processo filho para cada job
+            on_update (Callable): Recebe (job_id, campos) a cada atualização do job
+            workers (int): Número de jobs executados simultaneamente
+            max_queue (int): Tamanho máximo da fila de espera
+            timeout (int): Tempo limite padrão de cada job, em segundos
+            is_cancelled (Callable): Consulta externa de cancelamento (ex.: pedido feito
+                em outro worker do gunicorn), verificada enquanto o job aguarda ou executa
+        """
+        self.target = target
+        self.on_update = on_update
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.is_cancelled = is_cancelled
+        
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._running = {}
+        self._cancelled = set()
+        self._threads = []
+    
+    def submit(self, job_id: str, *args, timeout: Optional[int] = None) -> int:
+        """
+        Coloca um job na fila
+        
+        Args:
+            job_id (str): ID do job
+            *args: Argumentos repassados à função do job
+            timeout (int): Tempo limite deste job, em segundos (padrão do executor se None)
+            
+        Returns:
+            int: Posição do job na fila
+            
+        Raises:
+            queue.Full: Se a fila estiver cheia
+        """
+        self._start()
+        
+        with self._lock:
+            self._queue.put_nowait((job_id, args, timeout or self.timeout))
+            self._pending.append(job_id)
+            return len(self._pending)
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela um job na fila ou em execução
+        
+        Args:
+            job_id (str): ID do job
+            
+        Returns:
+            bool: True se o job estava na fila ou em execução
+        """
+        with self._lock:
+            if job_id not in self._pending and job_id not in self._running:
+                return False
+            self._cancelled.add(job_id)
+        
+        return True
+    
+    def stats(self) -> Dict:
+        """
+        Retorna o estado da fila e do pool
+        
+        Returns:
+            Dict: Profundidade da fila, jobs em execução e capacidade
+        """
+        with self._lock:
+            return {
+                'queue_depth': len(self._pending),
+                'running': len(self._running),
+                'workers': self.workers,
+                'max_queue': self.max_queue
+            }
+    
+    def _start(self):
+        """Inicia as vagas do pool na primeira submissão (depois do fork do gunicorn)"""
+        with self._lock:
+            if self._threads:
+                return
+            
+            for slot in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-runner-{slot}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def _worker_loop(self):
+        """Consome a fila executando um job por vez"""
+        while True:
+            job_id, args, timeout = self._queue.get()
+            
+            with self._lock:
+                self._pending.remove(job_id)
+                self._running[job_id] = None
+            
+            # Fora do lock: is_cancelled pode consultar o SQLite e esperar pelo
+            # busy_timeout, o que travaria submit, cancel e stats
+            cancelled = self._cancel_requested(job_id)
+            
+            try:
+                if cancelled:
+                    self._finish_cancelled(job_id)
+                else:
+                    self._run_job(job_id, args, timeout)
+            except Exception as e:
+                self.on_update(job_id, {'status': 'error', 'message': f'Erro ao executar o job: {str(e)}'})
+            finally:
+                with self._lock:
+                    self._running.pop(job_id, None)
+                    self._cancelled.discard(job_id)
+                self._queue.task_done()
+    
+    def _run_job(self, job_id: str, args: tuple, timeout: int):
+        """Executa um job em um processo filho, repassando as atualizações recebidas"""
+        parent_conn, child_conn = _MP_CONTEXT.Pipe(duplex=False)
+        process = _MP_CONTEXT.Process(
+            target=_run_child,
+            args=(self.target, child_conn, args),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        
+        with self._lock:
+            self._running[job_id] = process
+        
+        deadline = time.monotonic() + timeout
+        done = False
+        
+        try:
+            while True:
+                if self._cancel_requested(job_id):
+                    process.terminate()
+                    self._finish_cancelled(job_id)
+                    return
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    process.terminate()
+                    self.on_update(job_id, {
+                        'status': 'error',
+                        'message': f'Tempo limite de processamento excedido ({timeout}s).'
+                    })
+                    return
+                
+                if parent_conn.poll(min(0.5, remaining)):
+                    try:
+                        fields = parent_conn.recv()
+                    except EOFError:
+                        break
+                    
+                    self.on_update(job_id, fields)
+                    done = done or fields.get('status') in ('completed', 'error')
+                elif not process.is_alive():
+                    break
+        finally:
+            parent_conn.close()
+            process.join(timeout=5)
+        
+        if not done:
+            self.on_update(job_id, {
+                'status': 'error',
+                'message': f'O processo de extração terminou inesperadamente (código {process.exitcode}).'
+            })
+    
+    def _cancel_requested(self, job_id: str) -> bool:
+        """Verifica se o cancelamento foi pedido neste processo ou externamente"""
+        if job_id in self._cancelled:
+            return True
+        return bool(self.is_cancelled and self.is_cancelled(job_id))
+    
+    def _finish_cancelled(self, job_id: str):
+        """Marca o job como cancelado"""
+        self.on_update(job_id, {
+            'status': 'error',
+            'message': 'Processamento cancelado.',
+            'cancelled': True
+        })
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Armazenamento de jobs de processamento.
+Os metadados e estatísticas dos jobs ficam em um backend plugável (memória
+ou SQLite) e os registros extraídos ficam em arquivos compactados em disco,
+carregados apenas quando necessários. Com o backend SQLite os jobs
+sobrevivem a reinícios e podem ser compartilhados entre workers do gunicorn.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional
+
+from metrics import flatten_snapshot
+
+# Campos com coluna própria na tabela; os demais ficam no JSON 'extra'
+JOB_COLUMNS = ('id', 'filename', 'file_path', 'status', 'message', 'created_at', 'stats')
+
+# Campos volumosos gravados fora da tabela (sufixo do arquivo de cada um)
+PAYLOAD_FIELDS = {'data': '', 'sort_index': '.index'}
+
+# Contadores do agregado de estatísticas alimentados pelo 'stats' de cada job
+STATS_TOTALS = {'total_records': 'total_registros', 'total_placas': 'placas_unicas'}
+
+
+def job_contribution(status: Optional[str], stats: Optional[Dict]) -> Counter:
+    """
+    Contribuição de um job para o agregado de estatísticas
+    
+    Args:
+        status (str): Status do job (None se o job não existir)
+        stats (Dict): Estatísticas do job
+    
+    Returns:
+        Counter: Contadores que o job soma ao agregado
+    """
+    contribution = Counter()
+    if status is None:
+        return contribution
+    
+    stats = stats or {}
+    contribution['total_jobs'] = 1
+    contribution[f'status:{status}'] = 1
+    for counter, field in STATS_TOTALS.items():
+        contribution[counter] = stats.get(field, 0) or 0
+    
+    # Valor somado em centavos inteiros (jobs antigos só têm 'valor_total' em float)
+    centavos = stats.get('valor_total_centavos')
+    if centavos is None:
+        centavos = round((stats.get('valor_total', 0) or 0) * 100)
+    contribution['total_centavos'] = centavos
+    
+    # Tempos e contadores da extração, somados para o /metrics
+    contribution.update(flatten_snapshot(stats.get('metricas', {})))
+    return contribution
+
+
+def contribution_delta(before: Counter, after: Counter) -> Dict[str, float]:
+    """Diferença entre duas contribuições, só com os contadores alterados"""
+    delta = {key: after.get(key, 0) - before.get(key, 0) for key in set(before) | set(after)}
+    return {key: value for key, value in delta.items() if value}
+
+
+def format_aggregate(counters: Dict[str, float]) -> Dict:
+    """
+    Monta as estatísticas gerais a partir dos contadores do agregado
+    
+    Args:
+        counters (Dict[str, float]): Contadores mantidos pelo backend
+    
+    Returns:
+        Dict: Totais de jobs por status, registros, placas e valor
+    """
+    total_jobs = int(counters.get('total_jobs', 0))
+    completed_jobs = int(counters.get('status:completed', 0))
+    return {
+        'total_jobs': total_jobs,
+        'completed_jobs': completed_jobs,
+        'error_jobs': int(counters.get('status:error', 0)),
+        'processing_jobs': int(counters.get('status:processing', 0)),
+        'success_rate': (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
+        'total_records': int(counters.get('total_records', 0)),
+        'total_placas': int(counters.get('total_placas', 0)),
+        'valor_total': int(counters.get('total_centavos', 0)) / 100
+    }
+
+
+class JobStore:
+    """Interface comum dos backends de armazenamento de jobs"""
+    
+    def create(self, job: Dict):
+        """
+        Registra um novo job
+        
+        Args:
+            job (Dict): Dados iniciais do job (deve conter 'id')
+        """
+        raise NotImplementedError
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Busca os metadados de um job (sem os registros extraídos)
+        
+        Args:
+            job_id (str): ID do job
+        
+        Returns:
+            Optional[Dict]: Job ou None se não existir
+        """
+        raise NotImplementedError
+    
+    def update(self, job_id: str, fields: Dict):
+        """
+        Atualiza campos de um job. As chaves 'data' (registros extraídos) e
+        'sort_index' (índice de ordenação) são gravadas fora dos metadados.
+        
+        Args:
+            job_id (str): ID do job
+            fields (Dict): Campos a atualizar
+        """
+        raise NotImplementedError
+    
+    def list(self, limit: int = None) -> List[Dict]:
+        """
+        Lista jobs do mais recente para o mais antigo
+        
+        Args:
+            limit (int): Quantidade máxima de jobs (todos se None)
+        
+        Returns:
+            List[Dict]: Jobs sem os registros extraídos
+        """
+        raise NotImplementedError
+    
+    def counters(self) -> Dict[str, float]:
+        """
+        Contadores do agregado, mantidos a cada mudança de estado dos jobs
+        (sem percorrer o histórico)
+        
+        Returns:
+            Dict[str, float]: Soma das contribuições (job_contribution) de todos os jobs
+        """
+        raise NotImplementedError
+    
+    def stats(self) -> Dict:
+        """
+        Estatísticas gerais dos jobs
+        
+        Returns:
+            Dict: Saída de format_aggregate
+        """
+        return format_aggregate(self.counters())
+    
+    def load_records(self, job_id: str) -> List[Dict]:
+        """
+        Carrega os registros extraídos de um job
+        
+        Args:
+            job_id (str): ID do job
+        
+        Returns:
+            List[Dict]: Registros (lista vazia se o job não tiver registros)
+        """
+        raise NotImplementedError
+    
+    def load_sort_index(self, job_id: str) -> Optional[Dict[str, List[int]]]:
+        """
+        Carrega o índice de ordenação montado quando o job terminou
+        
+        Args:
+            job_id (str): ID do job
+        
+        Returns:
+            Optional[Dict[str, List[int]]]: Índice ou None se não houver
+        """
+        raise NotImplementedError
+    
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+
+class MemoryJobStore(JobStore):
+    """Backend em memória, restrito a um único processo (desenvolvimento e testes)"""
+    
+    def __init__(self):
+        # Jobs em ordem de criação: a listagem percorre só o final do dicionário
+        self._jobs = OrderedDict()
+        self._payloads = {}
+        self._counters = Counter()
+        self._lock = threading.Lock()
+    
+    def create(self, job: Dict):
+        job = dict(job)
+        with self._lock:
+            self._payloads[job['id']] = {key: job.pop(key) for key in PAYLOAD_FIELDS if key in job}
+            self._jobs[job['id']] = job
+            self._counters.update(job_contribution(job['status'], job.get('stats')))
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+    
+    def update(self, job_id: str, fields: Dict):
+        fields = dict(fields)
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            for key in PAYLOAD_FIELDS:
+                if key in fields:
+                    self._payloads[job_id][key] = fields.pop(key)
+            
+            job = self._jobs[job_id]
+            before = job_contribution(job['status'], job.get('stats'))
+            job.update(fields)
+            for key, value in contribution_delta(before, job_contribution(job['status'], job.get('stats'))).items():
+                self._counters[key] += value
+    
+    def list(self, limit: int = None) -> List[Dict]:
+        with self._lock:
+            return [dict(job) for job in islice(reversed(self._jobs.values()), limit)]
+    
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+    
+    def load_records(self, job_id: str) -> List[Dict]:
+        with self._lock:
+            return self._payloads.get(job_id, {}).get('data', [])
+    
+    def load_sort_index(self, job_id: str) -> Optional[Dict[str, List[int]]]:
+        with self._lock:
+            return self._payloads.get(job_id, {}).get('sort_index')
+
+
+class SQLiteJobStore(JobStore):
+    """Backend SQLite (modo WAL) com registros em arquivos JSON compactados com gzip"""
+    
+    # Quantidade de campos volumosos (registros, índices) mantidos em memória após a leitura
+    PAYLOAD_CACHE_SIZE = 8
+    
+    def __init__(self, db_path: str, records_dir: str):
+        """
+        Inicializa o backend SQLite
+        
+        Args:
+            db_path (str): Caminho do banco SQLite
+            records_dir (str): Pasta dos arquivos de registros de cada job
+        """
+        self.db_path = db_path
+        self.records_dir = records_dir
+        self._local = threading.local()
+        self._payload_cache = OrderedDict()
+        self._payload_lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        os.makedirs(records_dir, exist_ok=True)
+        
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                file_path TEXT,
+                status TEXT NOT NULL,
+                message TEXT,
+                created_at TEXT NOT NULL,
+                stats TEXT NOT NULL DEFAULT '{}',
+                extra TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+            CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+            CREATE TABLE IF NOT EXISTS job_stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL DEFAULT 0
+            );
+        """)
+        conn.commit()
+        self._init_stats(conn)
+    
+    def create(self, job: Dict):
+        job = dict(job)
+        job_id = job['id']
+        payloads = {key: job.pop(key) for key in PAYLOAD_FIELDS if key in job}
+        
+        contribution = job_contribution(job['status'], job.get('stats'))
+        
+        conn = self._conn()
+        with conn:
+            # Em autocommit o 'with' não abre transação: o job e os contadores
+            # precisam ser gravados juntos
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO jobs (id, filename, file_path, status, message, created_at, stats, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.pop('id'), job.pop('filename'), job.pop('file_path', None),
+                    job.pop('status'), job.pop('message', ''),
+                    job.pop('created_at', datetime.now()).isoformat(),
+                    json.dumps(job.pop('stats', {})), json.dumps(job, default=str)
+                )
+            )
+            self._apply_stats(conn, contribution)
+        
+        for key, value in payloads.items():
+            self._write_payload(job_id, key, value)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+    
+    def update(self, job_id: str, fields: Dict):
+        fields = dict(fields)
+        
+        for key in PAYLOAD_FIELDS:
+            if key in fields:
+                self._write_payload(job_id, key, fields.pop(key))
+        
+        conn = self._conn()
+        with conn:
+            # BEGIN IMMEDIATE evita que outro worker altere 'extra' entre a leitura e a escrita
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, stats, extra FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            
+            columns = {key: fields.pop(key) for key in JOB_COLUMNS[1:] if key in fields}
+            if 'status' in columns or 'stats' in columns:
+                old_stats = json.loads(row['stats'])
+                before = job_contribution(row['status'], old_stats)
+                after = job_contribution(columns.get('status', row['status']), columns.get('stats', old_stats))
+                self._apply_stats(conn, contribution_delta(before, after))
+            if 'stats' in columns:
+                columns['stats'] = json.dumps(columns['stats'], default=float)
+            if 'created_at' in columns:
+                columns['created_at'] = columns['created_at'].isoformat()
+            
+            if fields:
+                extra = json.loads(row['extra'])
+                extra.update(fields)
+                columns['extra'] = json.dumps(extra, default=str)
+            
+            if columns:
+                assignments = ', '.join(f"{key} = ?" for key in columns)
+                conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+    
+    def list(self, limit: int = None) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?",
+            (limit if limit is not None else -1,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def counters(self) -> Dict[str, float]:
+        rows = self._conn().execute("SELECT name, value FROM job_stats").fetchall()
+        return {row['name']: row['value'] for row in rows}
+    
+    def load_records(self, job_id: str) -> List[Dict]:
+        return self._read_payload(job_id, 'data') or []
+    
+    def load_sort_index(self, job_id: str) -> Optional[Dict[str, List[int]]]:
+        return self._read_payload(job_id, 'sort_index')
+    
+    def _apply_stats(self, conn: sqlite3.Connection, delta: Dict[str, float]):
+        """Soma as diferenças aos contadores, na mesma transação da alteração do job"""
+        conn.executemany(
+            "INSERT INTO job_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            delta.items()
+        )
+    
+    def _init_stats(self, conn: sqlite3.Connection):
+        """
+        Monta o agregado uma única vez para bancos criados antes da tabela
+        job_stats ou do contador em centavos
+        """
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM job_stats WHERE name = 'total_centavos'").fetchone():
+                return
+            
+            conn.execute("DELETE FROM job_stats")
+            totals = Counter({'total_jobs': 0, 'total_centavos': 0})
+            for row in conn.execute("SELECT status, stats FROM jobs"):
+                totals.update(job_contribution(row['status'], json.loads(row['stats'])))
+            self._apply_stats(conn, totals)
+    
+    def _read_payload(self, job_id: str, key: str):
+        """Lê um campo volumoso do job, mantendo os últimos lidos em memória"""
+        cache_key = (job_id, key)
+        with self._payload_lock:
+            if cache_key in self._payload_cache:
+                self._payload_cache.move_to_end(cache_key)
+                return self._payload_cache[cache_key]
+        
+        path = self._payload_path(job_id, key)
+        if not os.path.exists(path):
+            return None
+        
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            value = json.load(f)
+        
+        with self._payload_lock:
+            self._payload_cache[cache_key] = value
+            while len(self._payload_cache) > self.PAYLOAD_CACHE_SIZE:
+                self._payload_cache.popitem(last=False)
+        
+        return value
+    
+    def _write_payload(self, job_id: str, key: str, value):
+        """Grava um campo volumoso do job de forma atômica (arquivo temporário + rename)"""
+        path = self._payload_path(job_id, key)
+        tmp_path = f"{path}.tmp"
+        
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(value, f, ensure_ascii=False, separators=(',', ':'), default=float)
+        os.replace(tmp_path, path)
+        
+        with self._payload_lock:
+            self._payload_cache.pop((job_id, key), None)
+    
+    def _payload_path(self, job_id: str, key: str) -> str:
+        return os.path.join(self.records_dir, f"{job_id}{PAYLOAD_FIELDS[key]}.json.gz")
+    
+    def _row_to_job(self, row: sqlite3.Row) -> Dict:
+        """Converte uma linha da tabela no dicionário de job usado pela aplicação"""
+        job = json.loads(row['extra'])
+        job.update({
+            'id': row['id'],
+            'filename': row['filename'],
+            'file_path': row['file_path'],
+            'status': row['status'],
+            'message': row['message'],
+            'created_at': datetime.fromisoformat(row['created_at']),
+            'stats': json.loads(row['stats'])
+        })
+        return job
+    
+    def _conn(self) -> sqlite3.Connection:
+        """Conexão SQLite da thread atual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout = 10000")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def create_job_store(backend: str, data_dir: str) -> JobStore:
+    """
+    Cria o armazenamento de jobs configurado
+    
+    Args:
+        backend (str): 'sqlite' ou 'memory'
+        data_dir (str): Pasta do banco e dos registros (backend SQLite)
+    
+    Returns:
+        JobStore: Armazenamento de jobs
+    """
+    if backend == 'memory':
+        return MemoryJobStore()
+    if backend == 'sqlite':
+        return SQLiteJobStore(os.path.join(data_dir, 'jobs.db'), os.path.join(data_dir, 'jobs'))
+    raise ValueError(f"Backend de jobs inválido: '{backend}'. Use 'sqlite' ou 'memory'")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentação da extração.
+O MetricsCollector acumula o tempo de cada etapa (layout do pdfplumber,
+parsing, agregação, exportação) e contadores (páginas, linhas lidas e com
+registro, valores que caíram no fallback de conversão). O resultado vai
+para as estatísticas do job e, somado entre jobs, para o endpoint /metrics
+no formato texto do Prometheus.
+"""
+
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+# Etapas medidas pelo extrator
+STAGES = (
+    'pre_checagem', 'abrir_pdf', 'layout_texto', 'layout_tabelas', 'parsing',
+    'agregacao', 'exportar'
+)
+
+# Contadores do extrator e a descrição exibida no /metrics
+COUNTERS = {
+    'paginas': 'Páginas processadas',
+    'linhas_lidas': 'Linhas de texto percorridas pelo parsing',
+    'linhas_com_registro': 'Linhas que produziram um registro',
+    'valores_fallback': 'Valores convertidos por _extract_first_valid_value',
+    'registros': 'Registros agrupados por placa e data'
+}
+
+METRIC_PREFIX = 'extrator'
+
+
+class MetricsCollector:
+    """Tempos por etapa e contadores de uma extração"""
+    
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.counters = Counter()
+    
+    @contextmanager
+    def time(self, stage: str):
+        """
+        Soma ao tempo da etapa a duração do bloco
+        
+        Args:
+            stage (str): Nome da etapa (STAGES)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] += time.perf_counter() - start
+    
+    def add_time(self, stage: str, seconds: float):
+        """Soma um tempo já medido à etapa"""
+        self.timings[stage] += seconds
+    
+    def incr(self, name: str, amount: int = 1):
+        """Incrementa um contador"""
+        self.counters[name] += amount
+    
+    def merge(self, snapshot: Dict):
+        """
+        Soma o snapshot de outro coletor (ex.: de um processo do pool paralelo)
+        
+        Args:
+            snapshot (Dict): Saída de snapshot()
+        """
+        for stage, seconds in snapshot.get('tempos', {}).items():
+            self.timings[stage] += seconds
+        self.counters.update(snapshot.get('contadores', {}))
+    
+    def snapshot(self) -> Dict:
+        """
+        Retorna os valores acumulados em um dicionário serializável
+        
+        Returns:
+            Dict: {'tempos': {etapa: segundos}, 'contadores': {nome: valor}}
+        """
+        return {
+            'tempos': {stage: round(seconds, 6) for stage, seconds in self.timings.items()},
+            'contadores': dict(self.counters)
+        }
+
+
+def flatten_snapshot(snapshot: Dict) -> Dict[str, float]:
+    """
+    Converte um snapshot em contadores planos ('tempo:<etapa>', 'contador:<nome>')
+    para serem somados entre jobs
+    
+    Args:
+        snapshot (Dict): Saída de MetricsCollector.snapshot()
+    
+    Returns:
+        Dict[str, float]: Contadores planos
+    """
+    flat = {f"tempo:{stage}": seconds for stage, seconds in snapshot.get('tempos', {}).items()}
+    flat.update({f"contador:{name}": value for name, value in snapshot.get('contadores', {}).items()})
+    return flat
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_block(name: str, metric_type: str, help_text: str,
+                  samples: Iterable[Tuple[Dict[str, str], float]]) -> str:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        label_text = ','.join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return '\n'.join(lines)
+
+
+def render_prometheus(totals: Dict[str, float], extra: Dict[str, Tuple[str, str, float]] = None) -> str:
+    """
+    Monta o texto do endpoint /metrics
+    
+    Args:
+        totals (Dict[str, float]): Contadores planos somados entre jobs, incluindo
+            'status:<status>' com a quantidade de jobs em cada status
+        extra (Dict[str, Tuple[str, str, float]]): Métricas extras, como a fila
+            e o cache (nome -> (tipo, descrição, valor))
+    
+    Returns:
+        str: Métricas no formato texto do Prometheus
+    """
+    blocks = []
+    
+    blocks.append(_metric_block(
+        f"{METRIC_PREFIX}_jobs", 'gauge', 'Jobs por status',
+        [({'status': key.split(':', 1)[1]}, int(value))
+         for key, value in sorted(totals.items()) if key.startswith('status:')]
+    ))
+    
+    blocks.append(_metric_block(
+        f"{METRIC_PREFIX}_etapa_segundos_total", 'counter', 'Tempo gasto em cada etapa da extração',
+        (({'etapa': stage}, round(totals.get(f"tempo:{stage}", 0.0), 6)) for stage in STAGES)
+    ))
+    
+    for name, help_text in COUNTERS.items():
+        blocks.append(_metric_block(
+            f"{METRIC_PREFIX}_{name}_total", 'counter', help_text,
+            [({}, int(totals.get(f"contador:{name}", 0)))]
+        ))
+    
+    for name, (metric_type, help_text, value) in (extra or {}).items():
+        blocks.append(_metric_block(f"{METRIC_PREFIX}_{name}", metric_type, help_text, [({}, value)]))
+    
+    return '\n'.join(blocks) + '\n'
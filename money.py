@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Conversão de valores monetários do extrato.
+Valores bem formados (1.234,56 / 1234,56 / 1,234.56 / 1234.56 / 1234) são
+lidos por um caminho rápido, com uma única expressão, direto em centavos
+inteiros. Os demais passam pelas heurísticas antigas (caminho lento), que
+tentam recuperar o primeiro valor válido de textos concatenados ou sujos.
+Os resultados ficam em uma tabela de memorização, já que o mesmo valor se
+repete muitas vezes em um extrato.
+"""
+
+import logging
+import re
+from typing import Callable, Optional, Tuple
+
+from structured_log import get_logger, log_event
+
+logger = get_logger('money')
+
+# Caminho rápido: prefixo R$ opcional e um valor em formato brasileiro,
+# americano ou inteiro, sem nada além disso
+_FAST = re.compile(
+    r'(?:R\$\s*)?(?:'
+    r'(?P<br>\d{1,3}(?:\.\d{3})+|\d+),(?P<br_cent>\d{2})'    # 1.234,56 ou 1234,56
+    r'|(?P<us>\d{1,3}(?:,\d{3})+|\d+)\.(?P<us_cent>\d{2})'   # 1,234.56 ou 1234.56
+    r'|(?P<inteiro>\d+)'                                       # 1234
+    r')'
+)
+
+# Padrões das heurísticas do caminho lento
+_SLOW = {
+    'moeda_lixo': re.compile(r'[R$\s]'),
+    'nao_numerico': re.compile(r'[^0-9.,]'),
+    'decimal_ponto': re.compile(r'^\d+\.?\d*$'),
+    'formato_moeda': re.compile(
+        r'^(?:\d{1,3}\.\d{2}'           # 123.45
+        r'|\d{4,}\.\d{2}'               # 1234.56
+        r'|\d{1,3}(,\d{3})*\.\d{2}'     # 1,234.56 (formato americano)
+        r'|\d{1,3}(\.\d{3})*,\d{2}'     # 1.234,56 (formato brasileiro)
+        r'|\d+,\d{2}'                    # 123,45
+        r'|\d+)$'                         # 123 (inteiro)
+    ),
+    'valor_br': re.compile(r'\d{1,3}(?:\.\d{3})*,\d{2}'),
+    'valor_us': re.compile(r'\d{1,3}(?:,\d{3})*\.\d{2}'),
+    'valor_virgula': re.compile(r'\d+,\d{2}'),
+    'valor_ponto': re.compile(r'\d+\.\d{2}'),
+    'digitos': re.compile(r'\d+'),
+}
+
+# Quantidade de textos distintos memorizados por MoneyParser
+MEMO_SIZE = 65536
+
+
+def parse_fast(valor_str: str) -> Optional[int]:
+    """
+    Lê um valor bem formado diretamente em centavos
+    
+    Args:
+        valor_str (str): Valor em texto
+    
+    Returns:
+        Optional[int]: Centavos ou None se o texto não for um valor bem formado
+    """
+    texto = valor_str.strip()
+    
+    # Forma mais comum (1234,56 ou 1234.56) resolvida só com operações de string
+    if len(texto) > 3 and texto[-3] in '.,' and texto.isascii():
+        inteiro, centavos = texto[:-3], texto[-2:]
+        if inteiro.isdigit() and centavos.isdigit():
+            return int(inteiro) * 100 + int(centavos)
+    
+    match = _FAST.fullmatch(texto)
+    if match is None:
+        return None
+    
+    inteiro, br, br_cent, us, us_cent = match.group('inteiro', 'br', 'br_cent', 'us', 'us_cent')
+    if inteiro is not None:
+        return int(inteiro) * 100
+    if br is not None:
+        return int(br.replace('.', '')) * 100 + int(br_cent)
+    return int(us.replace(',', '')) * 100 + int(us_cent)
+
+
+def is_valid_currency_format(valor_str: str) -> bool:
+    """
+    Verifica se uma string tem formato válido de moeda
+    
+    Args:
+        valor_str (str): String a verificar
+    
+    Returns:
+        bool: True se é um formato válido
+    """
+    return _SLOW['formato_moeda'].match(valor_str) is not None
+
+
+def extract_first_valid_value(valor_str: str) -> float:
+    """
+    Extrai o primeiro valor monetário válido de uma string problemática
+    
+    Args:
+        valor_str (str): String com possível concatenação de valores
+    
+    Returns:
+        float: Primeiro valor válido encontrado
+    """
+    try:
+        # Remove caracteres não numéricos, pontos e vírgulas
+        valor_clean = _SLOW['nao_numerico'].sub('', str(valor_str))
+        
+        # Padrão brasileiro: 123,45 ou 1.234,56
+        match = _SLOW['valor_br'].search(valor_clean)
+        if match:
+            return float(match.group().replace('.', '').replace(',', '.'))
+        
+        # Padrão americano: 123.45 ou 1,234.56
+        match = _SLOW['valor_us'].search(valor_clean)
+        if match:
+            return float(match.group().replace(',', ''))
+        
+        # Números simples com vírgula decimal
+        match = _SLOW['valor_virgula'].search(valor_clean)
+        if match:
+            return float(match.group().replace(',', '.'))
+        
+        # Números simples com ponto decimal
+        match = _SLOW['valor_ponto'].search(valor_clean)
+        if match:
+            return float(match.group())
+        
+        # Como último recurso, procura apenas dígitos
+        digits = _SLOW['digitos'].findall(valor_clean)
+        if digits:
+            first_number = digits[0]
+            # Se tem mais de 2 dígitos, assume que os últimos 2 são centavos
+            if len(first_number) > 2:
+                return float(f"{first_number[:-2]}.{first_number[-2:]}")
+            return float(first_number)
+        
+        log_event(logger, logging.WARNING, 'valor_invalido', "Nenhum valor válido encontrado", valor=valor_str)
+        return 0.0
+    
+    except Exception as e:
+        log_event(logger, logging.WARNING, 'valor_invalido', "Erro ao extrair valor",
+                  valor=valor_str, erro=str(e))
+        return 0.0
+
+
+def parse_slow(valor_str: str) -> Tuple[float, bool]:
+    """
+    Heurísticas para valores mal formados (concatenados, com lixo, ambíguos)
+    
+    Args:
+        valor_str (str): Valor em texto
+    
+    Returns:
+        Tuple[float, bool]: Valor e se foi preciso recorrer a extract_first_valid_value
+    """
+    try:
+        # Remove R$, espaços e outros caracteres desnecessários
+        valor_clean = _SLOW['moeda_lixo'].sub('', str(valor_str).strip())
+        if not valor_clean:
+            return 0.0, False
+        
+        # Concatenação incorreta. Ex: '010.0608030.03060'
+        if valor_clean.count('.') > 1 and len(valor_clean) > 10 and not is_valid_currency_format(valor_clean):
+            log_event(logger, logging.DEBUG, 'valor_fallback', "Valor parece concatenado",
+                      valor=valor_str, motivo='concatenacao')
+            return extract_first_valid_value(valor_clean), True
+        
+        # Múltiplas vírgulas também indicam problema
+        if valor_clean.count(',') > 1:
+            log_event(logger, logging.DEBUG, 'valor_fallback', "Valor com múltiplas vírgulas",
+                      valor=valor_str, motivo='virgulas')
+            return extract_first_valid_value(valor_clean), True
+        
+        if ',' in valor_clean and '.' in valor_clean:
+            # Remove pontos (milhares) e substitui vírgula por ponto (decimal)
+            valor_clean = valor_clean.replace('.', '').replace(',', '.')
+        elif ',' in valor_clean:
+            parts = valor_clean.split(',')
+            if len(parts) == 2 and len(parts[1]) == 2:
+                # Provavelmente decimal (ex: 100,50)
+                valor_clean = valor_clean.replace(',', '.')
+            else:
+                # Provavelmente milhares (ex: 1,000)
+                valor_clean = valor_clean.replace(',', '')
+        
+        # Se ainda contém caracteres não numéricos (exceto ponto)
+        if not _SLOW['decimal_ponto'].match(valor_clean):
+            log_event(logger, logging.DEBUG, 'valor_fallback', "Valor com caracteres inválidos",
+                      valor=valor_str, limpo=valor_clean, motivo='caracteres')
+            return extract_first_valid_value(valor_str), True
+        
+        return float(valor_clean), False
+    
+    except (ValueError, AttributeError) as e:
+        log_event(logger, logging.WARNING, 'valor_invalido', "Erro ao converter valor",
+                  valor=valor_str, erro=str(e))
+        return 0.0, False
+
+
+def format_centavos(centavos: int) -> str:
+    """
+    Formata centavos no padrão brasileiro (1.234,56), sem passar por float
+    
+    Args:
+        centavos (int): Valor em centavos
+    
+    Returns:
+        str: Valor formatado
+    """
+    sinal = '-' if centavos < 0 else ''
+    inteiro, resto = divmod(abs(int(centavos)), 100)
+    return f"{sinal}{inteiro:,}".replace(',', '.') + f",{resto:02d}"
+
+
+class MoneyParser:
+    """Conversor de valores com caminho rápido, memorização e heurísticas como caminho lento"""
+    
+    def __init__(self, on_fallback: Callable[[], None] = None, memo_size: int = MEMO_SIZE):
+        """
+        Inicializa o conversor
+        
+        Args:
+            on_fallback (Callable): Chamado a cada valor que precisou de
+                extract_first_valid_value (inclusive quando vem da memorização)
+            memo_size (int): Quantidade máxima de textos memorizados
+        """
+        self._on_fallback = on_fallback
+        self._memo_size = memo_size
+        self._memo = {}
+    
+    def _lookup(self, valor_str: str) -> Tuple[int, float, bool]:
+        entry = self._memo.get(valor_str)
+        if entry is None:
+            centavos = parse_fast(valor_str) if valor_str else 0
+            if centavos is not None:
+                entry = (centavos, centavos / 100, False)
+            else:
+                valor, fallback = parse_slow(valor_str)
+                entry = (round(valor * 100), valor, fallback)
+            
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[valor_str] = entry
+        
+        if entry[2] and self._on_fallback:
+            self._on_fallback()
+        return entry
+    
+    def centavos(self, valor_str: str) -> int:
+        """
+        Converte um valor em texto para centavos inteiros
+        
+        Args:
+            valor_str (str): Valor em texto
+        
+        Returns:
+            int: Valor em centavos (0 se vazio ou irrecuperável)
+        """
+        return self._lookup(valor_str or '')[0]
+    
+    def to_float(self, valor_str: str) -> float:
+        """
+        Converte um valor em texto para float
+        
+        Args:
+            valor_str (str): Valor em texto
+        
+        Returns:
+            float: Valor convertido (0.0 se vazio ou irrecuperável)
+        """
+        return self._lookup(valor_str or '')[1]
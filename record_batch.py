@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Representação colunar dos registros brutos do extrator.
+Em vez de um dicionário por linha, o RecordBatch guarda uma coluna por
+campo: placas, datas, valores em texto e referências de linha são
+internados (cada registro guarda só o código do texto distinto), centavos
+e páginas ficam em arrays numéricos e o texto original de cada linha é um
+par de deslocamentos no texto da página, que é guardado uma única vez.
+"""
+
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Campos de um registro bruto, na ordem em que aparecem nos dicionários
+COLUMNS = ('placa', 'data', 'total', 'valor_centavos', 'texto_original', 'pagina', 'linha_referencia')
+
+
+class InternedColumn:
+    """Coluna de textos com poucos valores distintos: um código por registro"""
+    
+    __slots__ = ('values', 'codes', '_index', '_intern')
+    
+    def __init__(self, intern: bool = False):
+        """
+        Inicializa a coluna vazia
+        
+        Args:
+            intern (bool): Passa os valores por sys.intern, para que o mesmo
+                texto seja um único objeto em todos os lotes (usado nas placas)
+        """
+        self.values = []
+        self.codes = array('I')
+        self._index = {}
+        self._intern = intern
+    
+    def code(self, value: str) -> int:
+        """Código do valor na coluna, registrando-o se ainda não existir"""
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(sys.intern(value) if self._intern else value)
+        return code
+    
+    def append(self, value: str):
+        self.codes.append(self.code(value))
+    
+    def extend_values(self, values: Sequence[str]):
+        """Acrescenta vários registros de uma vez"""
+        index = self._index
+        known = len(index)
+        setdefault = index.setdefault
+        codes = [setdefault(value, len(index)) for value in values]
+        self.codes.extend(codes)
+        
+        if len(index) > known:
+            # Valores novos, na ordem em que receberam os códigos
+            new_values = dict.fromkeys(value for value, code in zip(values, codes) if code >= known)
+            self.values.extend(map(sys.intern, new_values) if self._intern else new_values)
+    
+    def extend(self, other: 'InternedColumn'):
+        """Acrescenta os registros de outra coluna, traduzindo os códigos"""
+        remap = [self.code(value) for value in other.values]
+        self.codes.extend(remap[code] for code in other.codes)
+    
+    def __getitem__(self, index: int) -> str:
+        return self.values[self.codes[index]]
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def __getstate__(self):
+        # O índice é reconstruído ao desserializar (lotes vindos dos workers)
+        return self.values, self.codes, self._intern
+    
+    def __setstate__(self, state):
+        self.values, self.codes, self._intern = state
+        if self._intern:
+            self.values = [sys.intern(value) for value in self.values]
+        self._index = {value: code for code, value in enumerate(self.values)}
+
+
+class TextBuffer:
+    """Textos (de páginas ou linhas de tabela) endereçados por deslocamento global"""
+    
+    __slots__ = ('chunks', 'starts', 'size')
+    
+    def __init__(self):
+        self.chunks = []
+        self.starts = array('Q')
+        self.size = 0
+    
+    def add(self, text: str) -> int:
+        """
+        Guarda um texto no buffer
+        
+        Args:
+            text (str): Texto a guardar
+        
+        Returns:
+            int: Deslocamento do início do texto no buffer
+        """
+        start = self.size
+        self.chunks.append(text)
+        self.starts.append(start)
+        self.size += len(text)
+        return start
+    
+    def get(self, start: int, end: int) -> str:
+        """Trecho [start, end) do buffer (sempre dentro de um único texto)"""
+        chunk = bisect_right(self.starts, start) - 1
+        base = self.starts[chunk]
+        return self.chunks[chunk][start - base:end - base]
+
+
+class RecordBatch:
+    """Registros brutos de uma ou mais páginas em formato colunar"""
+    
+    def __init__(self):
+        self.placa = InternedColumn(intern=True)
+        self.data = InternedColumn()
+        self.total = InternedColumn()
+        self.linha_referencia = InternedColumn()
+        self.valor_centavos = array('q')
+        self.pagina = array('l')
+        self.texto_inicio = array('Q')
+        self.texto_fim = array('Q')
+        self.text = TextBuffer()
+    
+    def add_text(self, text: str) -> int:
+        """
+        Guarda o texto de onde as próximas linhas serão referenciadas
+        
+        Args:
+            text (str): Texto da página (ou de uma linha de tabela)
+        
+        Returns:
+            int: Deslocamento a somar às posições das linhas dentro do texto
+        """
+        return self.text.add(text)
+    
+    def append(self, placa: str, data: str, total: str, valor_centavos: int,
+               pagina: int, linha_referencia: str, texto_inicio: int, texto_fim: int):
+        """
+        Acrescenta um registro
+        
+        Args:
+            placa (str): Placa já limpa
+            data (str): Data já limpa
+            total (str): Valor já limpo, em texto
+            valor_centavos (int): Valor em centavos
+            pagina (int): Número da página
+            linha_referencia (str): Referência da linha
+            texto_inicio (int): Início do texto original no buffer (ver add_text)
+            texto_fim (int): Fim do texto original no buffer
+        """
+        self.placa.append(placa)
+        self.data.append(data)
+        self.total.append(total)
+        self.valor_centavos.append(valor_centavos)
+        self.pagina.append(pagina)
+        self.linha_referencia.append(linha_referencia)
+        self.texto_inicio.append(texto_inicio)
+        self.texto_fim.append(texto_fim)
+    
+    def append_columns(self, pagina: int, placas: Sequence[str], datas: Sequence[str], totais: Sequence[str],
+                       valores_centavos: Iterable[int], linhas_referencia: Sequence[str],
+                       textos_inicio: Iterable[int], textos_fim: Iterable[int]):
+        """
+        Acrescenta de uma vez os registros de uma página, coluna a coluna
+        
+        Equivale a um append por registro, mas sem o custo de uma chamada
+        por coluna e por linha no laço de parsing.
+        
+        Args:
+            pagina (int): Número da página de todos os registros
+            placas, datas, totais, linhas_referencia (Sequence[str]): Valores já limpos
+            valores_centavos (Iterable[int]): Valores em centavos
+            textos_inicio, textos_fim (Iterable[int]): Posições do texto original no buffer
+        """
+        self.placa.extend_values(placas)
+        self.data.extend_values(datas)
+        self.total.extend_values(totais)
+        self.linha_referencia.extend_values(linhas_referencia)
+        self.valor_centavos.extend(valores_centavos)
+        self.texto_inicio.extend(textos_inicio)
+        self.texto_fim.extend(textos_fim)
+        self.pagina.extend([pagina] * (len(self.texto_fim) - len(self.pagina)))
+    
+    def append_record(self, record: Dict):
+        """
+        Acrescenta um registro no formato de dicionário (ex.: linhas de tabela)
+        
+        Args:
+            record (Dict): Registro bruto com os campos de COLUMNS
+        """
+        texto = record.get('texto_original', '')
+        start = self.add_text(texto)
+        self.append(record['placa'], record['data'], record['total'], record['valor_centavos'],
+                    record['pagina'], record['linha_referencia'], start, start + len(texto))
+    
+    def extend(self, other: 'RecordBatch'):
+        """
+        Acrescenta os registros de outro lote
+        
+        Args:
+            other (RecordBatch): Lote a incorporar (não é alterado)
+        """
+        base = self.text.size
+        for chunk in other.text.chunks:
+            self.text.add(chunk)
+        
+        for name in ('placa', 'data', 'total', 'linha_referencia'):
+            getattr(self, name).extend(getattr(other, name))
+        self.valor_centavos.extend(other.valor_centavos)
+        self.pagina.extend(other.pagina)
+        self.texto_inicio.extend(start + base for start in other.texto_inicio)
+        self.texto_fim.extend(end + base for end in other.texto_fim)
+    
+    def texto_original(self, index: int) -> str:
+        """Texto original da linha do registro"""
+        return self.text.get(self.texto_inicio[index], self.texto_fim[index])
+    
+    def record(self, index: int) -> Dict:
+        """
+        Registro no formato de dicionário
+        
+        Args:
+            index (int): Posição do registro no lote
+        
+        Returns:
+            Dict: Registro bruto com os campos de COLUMNS
+        """
+        return {
+            'placa': self.placa[index],
+            'data': self.data[index],
+            'total': self.total[index],
+            'valor_centavos': self.valor_centavos[index],
+            'texto_original': self.texto_original(index),
+            'pagina': self.pagina[index],
+            'linha_referencia': self.linha_referencia[index]
+        }
+    
+    def __len__(self) -> int:
+        return len(self.valor_centavos)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """Percorre os registros como dicionários (compatível com o formato antigo)"""
+        # Colunas percorridas juntas: evita indexar cada coluna por registro
+        columns = [map(column.values.__getitem__, column.codes)
+                   for column in (self.placa, self.data, self.total, self.linha_referencia)]
+        get_text = self.text.get
+        for placa, data, total, linha_referencia, valor_centavos, pagina, inicio, fim in zip(
+                *columns, self.valor_centavos, self.pagina, self.texto_inicio, self.texto_fim):
+            yield {
+                'placa': placa,
+                'data': data,
+                'total': total,
+                'valor_centavos': valor_centavos,
+                'texto_original': get_text(inicio, fim),
+                'pagina': pagina,
+                'linha_referencia': linha_referencia
+            }
+    
+    def to_dataframe(self, columns: List[str] = COLUMNS) -> pd.DataFrame:
+        """
+        Monta um DataFrame direto das colunas, sem dicionários intermediários
+        
+        As colunas internadas viram Categorical a partir dos próprios códigos.
+        
+        Args:
+            columns (List[str]): Colunas desejadas (padrão: todas)
+        
+        Returns:
+            pd.DataFrame: Um registro por linha
+        """
+        frame = {}
+        for name in columns:
+            if name == 'texto_original':
+                frame[name] = np.array([self.texto_original(index) for index in range(len(self))], dtype=object)
+            elif name in ('valor_centavos', 'pagina'):
+                frame[name] = np.array(getattr(self, name), dtype=np.int64)
+            else:
+                column = getattr(self, name)
+                frame[name] = pd.Categorical.from_codes(
+                    np.array(column.codes, dtype=np.int64), categories=pd.Index(column.values, dtype=object)
+                )
+        return pd.DataFrame(frame, columns=list(columns))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Consulta paginada dos registros de um job.
+O índice de ordenação é montado uma vez, quando o job termina, e cada
+página da API é servida a partir dele com filtros e projeção de campos.
+"""
+
+from typing import Dict, List, Optional
+
+# Campos aceitos em sort= e o campo padrão
+SORTABLE_FIELDS = ('placa', 'data', 'valor_numerico')
+DEFAULT_SORT = 'placa'
+
+# Tamanho de página padrão e máximo
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def date_sort_key(data: str) -> str:
+    """
+    Converte DD/MM/AAAA em AAAA-MM-DD para ordenação e comparação
+    
+    Args:
+        data (str): Data no formato brasileiro
+    
+    Returns:
+        str: Data ISO ou '' se o formato não for reconhecido
+    """
+    parts = (data or '').split('/')
+    if len(parts) != 3:
+        return ''
+    dia, mes, ano = parts
+    return f"{ano}-{mes}-{dia}"
+
+
+def _parse_filter_date(value: str) -> str:
+    """Aceita DD/MM/AAAA ou AAAA-MM-DD nos filtros e devolve AAAA-MM-DD"""
+    if '/' in value:
+        value = date_sort_key(value)
+    if len(value) != 10 or value[4] != '-' or value[7] != '-':
+        raise ValueError(f"Data inválida: '{value}'. Use DD/MM/AAAA ou AAAA-MM-DD")
+    return value
+
+
+def _normalize_placa(placa: str) -> str:
+    return placa.replace('-', '').replace(' ', '').upper()
+
+
+def build_sort_index(records: List[Dict]) -> Dict[str, List[int]]:
+    """
+    Monta as posições dos registros ordenadas por cada campo ordenável
+    
+    Args:
+        records (List[Dict]): Registros do job
+    
+    Returns:
+        Dict[str, List[int]]: Para cada campo, os índices dos registros em ordem crescente
+    """
+    keys = {
+        'placa': lambda i: (records[i].get('placa', ''), date_sort_key(records[i].get('data', ''))),
+        'data': lambda i: (date_sort_key(records[i].get('data', '')), records[i].get('placa', '')),
+        'valor_numerico': lambda i: (records[i].get('valor_numerico') or 0.0, records[i].get('placa', '')),
+    }
+    positions = range(len(records))
+    return {field: sorted(positions, key=key) for field, key in keys.items()}
+
+
+def query_records(records: List[Dict], sort_index: Optional[Dict[str, List[int]]] = None,
+                  offset: int = 0, limit: int = DEFAULT_LIMIT, sort: str = DEFAULT_SORT,
+                  order: str = 'asc', fields: Optional[List[str]] = None,
+                  placa: Optional[str] = None, data_inicio: Optional[str] = None,
+                  data_fim: Optional[str] = None) -> Dict:
+    """
+    Retorna uma página de registros filtrada, ordenada e projetada
+    
+    Args:
+        records (List[Dict]): Registros do job
+        sort_index (Dict): Índice de build_sort_index (montado aqui se None)
+        offset (int): Posição inicial dentro do resultado filtrado
+        limit (int): Quantidade de registros da página (até MAX_LIMIT)
+        sort (str): Campo de ordenação (SORTABLE_FIELDS)
+        order (str): 'asc' ou 'desc'
+        fields (List[str]): Campos retornados em cada registro (todos se None)
+        placa (str): Filtra placas que começam com o valor (ignora hífen e caixa)
+        data_inicio (str): Data mínima (inclusive)
+        data_fim (str): Data máxima (inclusive)
+    
+    Returns:
+        Dict: Página de registros, contagens e próximo offset
+    
+    Raises:
+        ValueError: Se algum parâmetro for inválido
+    """
+    if sort not in SORTABLE_FIELDS:
+        raise ValueError(f"Campo de ordenação inválido: '{sort}'. Use um de {SORTABLE_FIELDS}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("Ordem inválida. Use 'asc' ou 'desc'")
+    if offset < 0 or limit < 1:
+        raise ValueError("offset deve ser >= 0 e limit >= 1")
+    
+    limit = min(limit, MAX_LIMIT)
+    
+    if fields is not None and records:
+        unknown = [field for field in fields if field not in records[0]]
+        if unknown:
+            raise ValueError(f"Campos inválidos: {', '.join(unknown)}")
+    
+    if sort_index is None:
+        sort_index = build_sort_index(records)
+    
+    positions = sort_index[sort]
+    
+    filters = []
+    if placa:
+        prefix = _normalize_placa(placa)
+        filters.append(lambda r: _normalize_placa(r.get('placa', '')).startswith(prefix))
+    if data_inicio:
+        inicio = _parse_filter_date(data_inicio)
+        filters.append(lambda r: date_sort_key(r.get('data', '')) >= inicio)
+    if data_fim:
+        fim = _parse_filter_date(data_fim)
+        filters.append(lambda r: '' < date_sort_key(r.get('data', '')) <= fim)
+    
+    if filters:
+        ordered = reversed(positions) if order == 'desc' else positions
+        positions = [i for i in ordered if all(f(records[i]) for f in filters)]
+        page = positions[offset:offset + limit]
+    elif order == 'desc':
+        # Sem filtros a página sai direto do índice, sem copiar a lista inteira
+        end = max(len(positions) - offset, 0)
+        page = positions[max(end - limit, 0):end][::-1]
+    else:
+        page = positions[offset:offset + limit]
+    
+    rows = [records[i] for i in page]
+    if fields is not None:
+        rows = [{field: row.get(field) for field in fields} for row in rows]
+    
+    next_offset = offset + limit if offset + limit < len(positions) else None
+    
+    return {
+        'data': rows,
+        'total': len(positions),
+        'total_registros': len(records),
+        'offset': offset,
+        'limit': limit,
+        'next_offset': next_offset
+    }
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache em disco de resultados de extração.
+Cada entrada é indexada pelo SHA-256 do PDF mais a versão do extrator e
+guarda os registros e as estatísticas.
+O tamanho total é limitado e as entradas menos usadas recentemente são
+removidas.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas o lock entre threads é aplicado
+    fcntl = None
+
+from extrator_pdf import EXTRACTOR_VERSION
+from structured_log import get_logger, log_event
+
+logger = get_logger('cache')
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 500 * 1024 * 1024, version: str = EXTRACTOR_VERSION):
+        """
+        Inicializa o cache de resultados
+        
+        Args:
+            cache_dir (str): Pasta onde as entradas são gravadas
+            max_bytes (int): Tamanho máximo somado de todas as entradas
+            version (str): Versão do extrator incluída na chave
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        self._lock_path = os.path.join(cache_dir, '.lock')
+        self._thread_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def key_for(self, pdf_path: str) -> str:
+        """
+        Calcula a chave do cache para um PDF
+        
+        Args:
+            pdf_path (str): Caminho do arquivo PDF
+            
+        Returns:
+            str: SHA-256 do conteúdo seguido da versão do extrator
+        """
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return f"{digest.hexdigest()}-v{self.version}"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Busca uma entrada e registra o acerto ou a falha
+        
+        Args:
+            key (str): Chave calculada por key_for
+            
+        Returns:
+            Optional[Dict]: {'data', 'stats'} ou None se não houver entrada
+        """
+        with self._locked() as index:
+            entry = index['entries'].get(key)
+            records_path = os.path.join(self.cache_dir, key, 'records.json')
+            
+            if entry is None or not os.path.exists(records_path):
+                index['entries'].pop(key, None)
+                index['misses'] += 1
+                return None
+            
+            entry['last_access'] = time.time()
+            index['hits'] += 1
+        
+        # Lido fora do lock: um put() de outro worker pode remover a entrada
+        # (LRU) nesse intervalo, o que conta como falha e não como erro
+        try:
+            with open(records_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            with self._locked() as index:
+                index['hits'] -= 1
+                index['misses'] += 1
+                if not os.path.exists(records_path):
+                    index['entries'].pop(key, None)
+            log_event(logger, logging.WARNING, 'cache_leitura_falhou', "Entrada do cache indisponível na leitura",
+                      chave=key[:12])
+            return None
+    
+    def put(self, key: str, data: list, stats: Dict):
+        """
+        Grava uma entrada e remove as menos usadas se o limite for excedido
+        
+        Args:
+            key (str): Chave calculada por key_for
+            data (list): Registros extraídos
+            stats (Dict): Estatísticas do processamento
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        
+        # Grava em arquivo temporário e troca de uma vez: um get() de outro
+        # worker nunca lê o JSON pela metade
+        records_path = os.path.join(entry_dir, 'records.json')
+        tmp_path = f"{records_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'data': data, 'stats': stats}, f, ensure_ascii=False, default=float)
+        os.replace(tmp_path, records_path)
+        
+        with self._locked() as index:
+            index['entries'][key] = {
+                'size': os.path.getsize(records_path),
+                'last_access': time.time()
+            }
+            self._evict(index)
+    
+    def stats(self) -> Dict:
+        """
+        Retorna contadores de uso do cache
+        
+        Returns:
+            Dict: Acertos, falhas, entradas e bytes ocupados
+        """
+        with self._locked(write=False) as index:
+            hits, misses = index['hits'], index['misses']
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': (hits / (hits + misses) * 100) if hits + misses > 0 else 0,
+                'entries': len(index['entries']),
+                'bytes': sum(entry['size'] for entry in index['entries'].values()),
+                'max_bytes': self.max_bytes
+            }
+    
+    def _evict(self, index: Dict):
+        """Remove as entradas menos usadas recentemente até caber no limite"""
+        total = sum(entry['size'] for entry in index['entries'].values())
+        
+        for key in sorted(index['entries'], key=lambda k: index['entries'][k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            total -= index['entries'].pop(key)['size']
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            log_event(logger, logging.INFO, 'cache_remocao', "Entrada removida do cache (LRU)", chave=key[:12])
+    
+    @contextmanager
+    def _locked(self, write: bool = True):
+        """Carrega o índice com lock entre threads e processos e o grava ao sair"""
+        with self._thread_lock, open(self._lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            
+            try:
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (FileNotFoundError, ValueError):
+                index = {'entries': {}, 'hits': 0, 'misses': 0}
+            
+            yield index
+            
+            if not write:
+                return
+            
+            tmp_path = f"{self._index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path)
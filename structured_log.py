@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Log estruturado do extrator.
+Cada mensagem tem um tipo de evento e campos (chave=valor ou JSON). Eventos
+repetidos são limitados por janela de tempo, com a contagem dos suprimidos
+anexada à próxima mensagem do mesmo tipo, e a escrita acontece em uma
+thread separada (QueueHandler), sem bloquear o parsing.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+
+LOGGER_NAME = 'extrator'
+
+# Mensagens de um mesmo evento aceitas por janela (as demais são só contadas)
+RATE_LIMIT_MESSAGES = 5
+RATE_LIMIT_WINDOW = 60.0
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+def get_logger(name: str = None) -> logging.Logger:
+    """
+    Logger do extrator
+    
+    Args:
+        name (str): Sufixo do logger (ex.: 'pdf' -> 'extrator.pdf')
+    
+    Returns:
+        logging.Logger: Logger filho de 'extrator'
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+def log_event(logger: logging.Logger, level: int, event: str, message: str, **fields):
+    """
+    Registra uma mensagem com tipo de evento e campos estruturados
+    
+    Args:
+        logger (logging.Logger): Logger de destino
+        level (int): Nível (logging.INFO, logging.WARNING, ...)
+        event (str): Tipo da mensagem, usado no limite de frequência
+        message (str): Texto da mensagem
+        **fields: Campos adicionais
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={'event': event, 'fields': fields})
+
+
+class RateLimitFilter(logging.Filter):
+    """Limita a quantidade de mensagens de cada evento por janela de tempo"""
+    
+    def __init__(self, limit: int = RATE_LIMIT_MESSAGES, window: float = RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._windows = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, 'event', None)
+        # Avisos graves e mensagens sem tipo nunca são suprimidos
+        if event is None or record.levelno >= logging.ERROR:
+            return True
+        
+        now = time.monotonic()
+        with self._lock:
+            start, count, suppressed = self._windows.get(event, (now, 0, 0))
+            if now - start >= self.window:
+                start, count = now, 0
+            
+            if count >= self.limit:
+                self._windows[event] = (start, count, suppressed + 1)
+                return False
+            
+            self._windows[event] = (start, count + 1, 0)
+        
+        if suppressed:
+            record.fields = dict(getattr(record, 'fields', {}), suprimidas=suppressed)
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formata as mensagens como texto chave=valor ou como uma linha JSON"""
+    
+    def __init__(self, json_lines: bool = False):
+        super().__init__()
+        self.json_lines = json_lines
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'evento': getattr(record, 'event', None),
+            'mensagem': record.getMessage()
+        }
+        fields: Dict = getattr(record, 'fields', {})
+        if record.exc_info:
+            fields = dict(fields, erro=self.formatException(record.exc_info))
+        
+        if self.json_lines:
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        
+        text = f"{entry['ts']} {entry['nivel']:<7} {entry['logger']}: {entry['mensagem']}"
+        if fields:
+            text += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class _ProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que escreve direto no handler final quando usado em um
+    processo filho (fork), onde a thread de escrita do pai não existe
+    """
+    
+    def __init__(self, log_queue, target: logging.Handler):
+        super().__init__(log_queue)
+        self._pid = os.getpid()
+        self._target = target
+    
+    def emit(self, record: logging.LogRecord):
+        if os.getpid() != self._pid:
+            self._target.handle(record)
+            return
+        super().emit(record)
+
+
+def setup_logging(level: str = None, fmt: str = None) -> logging.Logger:
+    """
+    Configura o logger do extrator (pode ser chamada mais de uma vez)
+    
+    Args:
+        level (str): Nível mínimo (padrão: variável LOG_LEVEL ou INFO)
+        fmt (str): 'text' ou 'json' (padrão: variável LOG_FORMAT ou text)
+    
+    Returns:
+        logging.Logger: Logger 'extrator' configurado
+    """
+    global _listener
+    
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'text')
+    
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
+    
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+        
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(StructuredFormatter(json_lines=fmt == 'json'))
+        
+        log_queue = queue.SimpleQueue()
+        handler = _ProcessQueueHandler(log_queue, stream)
+        handler.addFilter(RateLimitFilter())
+        logger.addHandler(handler)
+        
+        _listener = logging.handlers.QueueListener(log_queue, stream)
+        _listener.start()
+        atexit.register(_listener.stop)
+    
+    return logger
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da exportação em streaming (exporters.py)
+O CSV precisa continuar idêntico ao gerado antes pelo pandas e o Excel
+precisa ser lido pelo openpyxl com datas e valores tipados. O Parquet só
+é testado quando o pyarrow (opcional) está instalado.
+"""
+
+import os
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from exporters import EXPORT_COLUMNS, export_bundle, export_parquet, export_records, parse_data_br
+
+REGISTROS = [
+    {'placa': 'ABC-1234', 'data': '01/02/2025', 'total': '1.234,56',
+     'texto_original': 'PLACA: ABC-1234 | DATA: 01/02/2025 | TOTAL: R$ 1.234,56 | REGISTROS: 2',
+     'pagina': 1, 'linha_referencia': 'placa_ABC-1234_data_01/02/2025', 'valor_centavos': 123456},
+    {'placa': 'XYZ-1D23', 'data': '', 'total': '0,05',
+     'texto_original': 'texto com <&> e "aspas", vírgula\x01',
+     'pagina': 3, 'linha_referencia': 'linha_4', 'valor_centavos': 5},
+    # Registro antigo, sem centavos
+    {'placa': 'DEF-5678', 'data': '31/02/2025', 'total': '10,00',
+     'texto_original': ' espaços ', 'pagina': 2, 'linha_referencia': 'linha_1'},
+]
+
+
+def test_csv_matches_pandas(tmp_path):
+    """O CSV em streaming é byte a byte igual ao antigo DataFrame.to_csv"""
+    # Só registros com centavos: com ausentes o pandas gravava a coluna como float
+    registros = REGISTROS[:2]
+    csv_path = tmp_path / 'saida.csv'
+    esperado = tmp_path / 'pandas.csv'
+    
+    assert export_records(registros, csv_path=str(csv_path)) == len(registros)
+    pd.DataFrame(registros).reindex(columns=list(EXPORT_COLUMNS)).to_csv(
+        esperado, index=False, encoding='utf-8-sig')
+    
+    assert csv_path.read_bytes() == esperado.read_bytes()
+
+
+def test_excel_typed_cells(tmp_path):
+    """Datas e valores saem tipados, com cabeçalho em negrito e textos preservados"""
+    excel_path = tmp_path / 'saida.xlsx'
+    export_records(REGISTROS, excel_path=str(excel_path), csv_path=str(tmp_path / 'saida.csv'))
+    
+    sheet = openpyxl.load_workbook(excel_path).active
+    linhas = list(sheet.iter_rows(values_only=True))
+    
+    assert linhas[0] == EXPORT_COLUMNS
+    assert sheet['A1'].font.b
+    assert linhas[1][:3] == ('ABC-1234', datetime(2025, 2, 1), 1234.56)
+    assert linhas[1][4:] == (1, 'placa_ABC-1234_data_01/02/2025', 123456)
+    assert sheet['B2'].number_format == 'dd/mm/yyyy'
+    assert sheet['C2'].number_format == '#,##0.00'
+    
+    # Caracteres de controle são descartados; data vazia vira célula vazia
+    assert linhas[2][:4] == ('XYZ-1D23', None, 0.05, 'texto com <&> e "aspas", vírgula')
+    # Data inválida e valor sem centavos ficam como texto
+    assert linhas[3] == ('DEF-5678', '31/02/2025', '10,00', ' espaços ', 2, 'linha_1', None)
+    
+    assert sorted(os.listdir(tmp_path)) == ['saida.csv', 'saida.xlsx']
+
+
+def test_parse_data_br():
+    assert parse_data_br('09/12/2024') == datetime(2024, 12, 9).date()
+    assert parse_data_br('') is None
+    assert parse_data_br('32/01/2025') is None
+    assert parse_data_br('01-02-2025') is None
+
+
+def test_parquet_typed_columns(tmp_path):
+    """Parquet com placa em dicionário, data como date e total decimal exato"""
+    pq = pytest.importorskip('pyarrow.parquet')
+    parquet_path = tmp_path / 'saida.parquet'
+    
+    assert export_parquet(REGISTROS, str(parquet_path)) == len(REGISTROS)
+    tabela = pq.read_table(parquet_path)
+    
+    assert tabela.column_names == list(EXPORT_COLUMNS)
+    assert str(tabela.schema.field('placa').type) == 'dictionary<values=string, indices=int32, ordered=0>'
+    assert tabela.column('data').to_pylist() == [datetime(2025, 2, 1).date(), None, None]
+    assert tabela.column('total').to_pylist() == [Decimal('1234.56'), Decimal('0.05'), None]
+    assert tabela.column('valor_centavos').to_pylist() == [123456, 5, None]
+    assert sorted(os.listdir(tmp_path)) == ['saida.parquet']
+
+
+def test_bundle_stores_compressed_members(tmp_path):
+    """O pacote guarda o xlsx como está e comprime só o CSV"""
+    excel_path, csv_path = str(tmp_path / 'saida.xlsx'), str(tmp_path / 'saida.csv')
+    export_records(REGISTROS, excel_path=excel_path, csv_path=csv_path)
+    zip_path = tmp_path / 'pacote.zip'
+    
+    export_bundle([(excel_path, 'dados.xlsx'), (csv_path, 'dados.csv')], str(zip_path))
+    
+    with zipfile.ZipFile(zip_path) as archive:
+        tipos = {info.filename: info.compress_type for info in archive.infolist()}
+        assert archive.read('dados.csv') == open(csv_path, 'rb').read()
+    assert tipos == {'dados.xlsx': zipfile.ZIP_STORED, 'dados.csv': zipfile.ZIP_DEFLATED}
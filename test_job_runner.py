@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do executor de jobs em segundo plano (job_runner.py)
+"""
+
+import threading
+
+from job_runner import JobRunner
+
+# Lock segurado por outra thread do processo pai enquanto o job inicia
+LOCK_DO_PAI = threading.Lock()
+
+
+def job_que_usa_o_lock(valor, report):
+    """Job de teste: precisa do lock (preso no filho se ele viesse de um fork)"""
+    with LOCK_DO_PAI:
+        report({'status': 'completed', 'valor': valor})
+
+
+def test_slow_cancel_check_does_not_block_runner():
+    """Uma consulta de cancelamento lenta (SQLite ocupado) não trava stats, submit e cancel"""
+    consultando = threading.Event()
+    liberar = threading.Event()
+    atualizacoes = []
+    
+    def is_cancelled(job_id):
+        consultando.set()
+        liberar.wait(5)
+        return True
+    
+    runner = JobRunner(target=None, on_update=lambda job_id, fields: atualizacoes.append((job_id, fields)),
+                       workers=1, is_cancelled=is_cancelled)
+    runner.submit('j1')
+    assert consultando.wait(5)
+    
+    # Com a consulta em andamento, o executor continua respondendo
+    respostas = []
+    thread = threading.Thread(target=lambda: respostas.append((runner.stats(), runner.cancel('j1'))))
+    thread.start()
+    thread.join(1)
+    assert respostas, "stats/cancel ficaram esperando a consulta de cancelamento"
+    stats, cancelado = respostas[0]
+    assert stats['running'] == 1 and stats['queue_depth'] == 0
+    assert cancelado
+    
+    liberar.set()
+    runner._queue.join()
+    assert atualizacoes[-1][1]['cancelled']
+
+
+def test_job_process_does_not_inherit_held_locks():
+    """O processo do job não herda locks segurados por outras threads do pai"""
+    atualizacoes = []
+    runner = JobRunner(target=job_que_usa_o_lock, on_update=lambda job_id, fields: atualizacoes.append(fields),
+                       workers=1, timeout=10)
+    
+    with LOCK_DO_PAI:
+        runner.submit('j1', 42)
+        runner._queue.join()
+    
+    assert atualizacoes == [{'status': 'completed', 'valor': 42}]
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do armazenamento de jobs em SQLite (job_store.py): criação,
+atualização, registros fora da tabela e agregado de estatísticas.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from job_store import create_job_store, format_aggregate
+
+REGISTROS = [{'placa': 'ABC1234', 'data': '01/02/2025', 'total': '10,00', 'valor_centavos': 1000}]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return create_job_store('sqlite', str(tmp_path))
+
+
+def _novo_job(store, job_id):
+    store.create({'id': job_id, 'filename': f'{job_id}.pdf', 'file_path': f'uploads/{job_id}.pdf',
+                  'status': 'uploaded', 'message': '', 'created_at': datetime(2025, 2, 1), 'stats': {}})
+
+
+def test_create_update_round_trip(store, tmp_path):
+    """Campos com coluna, campos extras e registros voltam como foram gravados"""
+    _novo_job(store, 'j1')
+    store.update('j1', {'status': 'processing', 'progress': {'paginas_processadas': 1}})
+    store.update('j1', {
+        'status': 'completed',
+        'stats': {'total_registros': 1, 'placas_unicas': 1, 'valor_total_centavos': 1000},
+        'excel_file': 'saida.xlsx',
+        'data': REGISTROS
+    })
+    
+    job = store.get('j1')
+    assert job['status'] == 'completed'
+    assert job['created_at'] == datetime(2025, 2, 1)
+    assert job['excel_file'] == 'saida.xlsx'
+    assert job['progress'] == {'paginas_processadas': 1}
+    assert 'data' not in job
+    assert store.load_records('j1') == REGISTROS
+    
+    # Outra instância (outro worker) enxerga o mesmo job
+    assert create_job_store('sqlite', str(tmp_path)).get('j1')['status'] == 'completed'
+    assert store.get('inexistente') is None
+
+
+def test_stats_follow_job_changes(store):
+    """O agregado acompanha criação, mudança de status e de estatísticas"""
+    _novo_job(store, 'j1')
+    _novo_job(store, 'j2')
+    store.update('j1', {'status': 'completed',
+                        'stats': {'total_registros': 3, 'placas_unicas': 2, 'valor_total_centavos': 12345}})
+    store.update('j2', {'status': 'error'})
+    
+    stats = format_aggregate(store.counters())
+    assert stats['total_jobs'] == 2
+    assert stats['completed_jobs'] == 1 and stats['error_jobs'] == 1
+    assert stats['total_records'] == 3 and stats['total_placas'] == 2
+    assert stats['valor_total'] == 123.45
+
+
+def test_create_is_atomic(store, monkeypatch):
+    """Se os contadores falham, o job também não é gravado"""
+    def falha(conn, delta):
+        raise RuntimeError('falha simulada')
+    
+    monkeypatch.setattr(store, '_apply_stats', falha)
+    with pytest.raises(RuntimeError):
+        _novo_job(store, 'j1')
+    
+    assert store.get('j1') is None
+    assert format_aggregate(store.counters())['total_jobs'] == 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Corpus de correção do conversor de valores (money.py)
+Garante que o caminho rápido concorda com as heurísticas antigas nos
+formatos bem formados e que os casos problemáticos continuam indo para o
+caminho lento com o mesmo resultado de antes.
+"""
+
+import random
+
+from money import MoneyParser, format_centavos, parse_fast, parse_slow
+
+# (texto, centavos esperados)
+CORPUS = [
+    # Formato brasileiro
+    ('0,00', 0),
+    ('0,01', 1),
+    ('248,59', 24859),
+    ('1.234,56', 123456),
+    ('12.345,67', 1234567),
+    ('1.234.567,89', 123456789),
+    ('R$ 1.234,56', 123456),
+    ('R$1.234,56', 123456),
+    ('  248,59 ', 24859),
+    # Formato com ponto decimal (saída de _clean_valor)
+    ('248.59', 24859),
+    ('1234.56', 123456),
+    ('0.07', 7),
+    # Formato americano com milhares
+    ('1,234.56', 123456),
+    ('12,345,678.90', 1234567890),
+    # Inteiros
+    ('1234', 123400),
+    ('R$1234', 123400),
+    # Vazios
+    ('', 0),
+    ('   ', 0),
+    (None, 0),
+    # Caminho lento: concatenações e textos sujos
+    ('010.0608030.03060', 1006),
+    ('1,234,56', 123),
+    ('1 234,56', 123456),
+    ('12.5', 1250),
+    ('1,000', 100000),
+    ('-12,50', 1250),
+    ('r$ 10,00', 1000),
+    ('abc', 0),
+]
+
+# Textos que precisam de extract_first_valid_value
+FALLBACKS = {'010.0608030.03060', '1,234,56', '-12,50', 'r$ 10,00', 'abc'}
+
+
+def test_corpus():
+    """Cada texto do corpus é convertido para os centavos esperados"""
+    parser = MoneyParser()
+    for texto, esperado in CORPUS:
+        assert parser.centavos(texto) == esperado, texto
+        # Segunda leitura vem da memorização e precisa dar o mesmo resultado
+        assert parser.centavos(texto) == esperado, texto
+
+
+def test_fast_path_matches_legacy_float():
+    """Nos formatos brasileiro e de ponto decimal o caminho rápido reproduz o float antigo"""
+    parser = MoneyParser()
+    rng = random.Random(7)
+    
+    for _ in range(20000):
+        centavos = rng.randint(0, 10 ** rng.randint(1, 11))
+        inteiro = f"{centavos // 100:,}".replace(',', '.')
+        textos = [
+            f"{inteiro},{centavos % 100:02d}",
+            f"{centavos // 100},{centavos % 100:02d}",
+            f"{centavos // 100}.{centavos % 100:02d}",
+        ]
+        for texto in textos:
+            assert parse_fast(texto) == centavos, texto
+            assert parser.to_float(texto) == parse_slow(texto)[0], texto
+
+
+def test_fallback_counter():
+    """on_fallback é chamado a cada valor que caiu em extract_first_valid_value"""
+    chamadas = []
+    parser = MoneyParser(on_fallback=lambda: chamadas.append(1))
+    
+    for texto, _ in CORPUS * 2:
+        parser.centavos(texto)
+    
+    assert len(chamadas) == 2 * len(FALLBACKS)
+
+
+def test_memo_is_bounded():
+    """A tabela de memorização não passa do tamanho configurado"""
+    parser = MoneyParser(memo_size=100)
+    for centavos in range(1000):
+        parser.centavos(f"{centavos // 100},{centavos % 100:02d}")
+    assert len(parser._memo) <= 100
+
+
+def test_format_centavos():
+    """Centavos são formatados no padrão brasileiro sem passar por float"""
+    assert format_centavos(0) == '0,00'
+    assert format_centavos(7) == '0,07'
+    assert format_centavos(123456) == '1.234,56'
+    assert format_centavos(123456789012) == '1.234.567.890,12'
+    assert format_centavos(-123456) == '-1.234,56'
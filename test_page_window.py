@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do acesso às páginas sob demanda (iter_pages) e da seleção de
+páginas do PDFExtractor (page_range / max_pages), sobre um extrato
+sintético gerado por benchmarks/gerador_extrato.py.
+"""
+
+import os
+import sys
+
+import pdfplumber
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+from extrator_pdf import PDFExtractor, count_pages, iter_pages, main, parse_page_range
+from gerador_extrato import escrever_pdf
+
+PAGINAS = 8
+
+
+@pytest.fixture(scope='module')
+def extrato(tmp_path_factory):
+    caminho = str(tmp_path_factory.mktemp('pdf') / 'extrato.pdf')
+    escrever_pdf(caminho, PAGINAS)
+    return caminho
+
+
+def _paginas_dos_registros(extractor):
+    return sorted({registro['pagina'] for registro in extractor.iter_records()})
+
+
+def test_iter_pages_releases_layout(extrato):
+    """Cada página é liberada quando a próxima é pedida"""
+    with pdfplumber.open(extrato) as pdf:
+        assert count_pages(pdf) == PAGINAS
+        
+        vistas = []
+        for page in iter_pages(pdf, 3, 5):
+            assert page.extract_text()
+            assert 'chars' in page.__dict__ or '_layout' in page.__dict__
+            if vistas:
+                assert not {'chars', '_layout', '_objects'} & set(vistas[-1].__dict__)
+            vistas.append(page)
+        
+        assert [page.page_number for page in vistas] == [3, 4, 5]
+        assert not hasattr(pdf, '_pages')
+
+
+def test_page_selection(extrato):
+    """page_range e max_pages restringem as páginas extraídas, em todos os modos"""
+    assert _paginas_dos_registros(PDFExtractor(extrato, max_pages=2)) == [1, 2]
+    assert _paginas_dos_registros(PDFExtractor(extrato, page_range=(4, 6))) == [4, 5, 6]
+    assert _paginas_dos_registros(PDFExtractor(extrato, page_range=(7, 50))) == [7, 8]
+    assert _paginas_dos_registros(PDFExtractor(extrato, page_range=(3, 8), max_pages=2,
+                                               strategy='text')) == [3, 4]
+    assert _paginas_dos_registros(PDFExtractor(extrato, page_range=(2, 7), workers=2)) == list(range(2, 8))
+
+
+def test_full_extraction_matches_pages(extrato):
+    """O documento inteiro é a soma das páginas extraídas separadamente"""
+    completo = list(PDFExtractor(extrato).iter_records())
+    por_partes = list(PDFExtractor(extrato, page_range=(1, 4)).iter_records())
+    por_partes += list(PDFExtractor(extrato, page_range=(5, PAGINAS)).iter_records())
+    
+    chave = lambda registro: (registro['pagina'], registro['linha_referencia'])
+    assert sorted(completo, key=chave) == sorted(por_partes, key=chave)
+
+
+def test_invalid_selection():
+    with pytest.raises(ValueError):
+        PDFExtractor('teste.pdf', page_range=(5, 2))
+    with pytest.raises(ValueError):
+        PDFExtractor('teste.pdf', max_pages=0)
+
+
+@pytest.mark.parametrize('valor', ['a-3', '5-2', '0-1', '1-x'])
+def test_invalid_cli_page_range(valor, capsys, monkeypatch):
+    """Intervalo inválido em -p sai com a mensagem de uso, sem traceback"""
+    monkeypatch.setattr(sys, 'argv', ['extrator_pdf.py', 'teste.pdf', '-p', valor])
+    with pytest.raises(SystemExit) as saida:
+        main()
+    assert saida.value.code == 2
+    assert 'intervalo inválido' in capsys.readouterr().err
+    assert parse_page_range('3') == (3, 3) and parse_page_range('2-4') == (2, 4)
+
+
+def test_preview_then_rest_matches_full(extrato):
+    """Prévia + restante no mesmo agregador dão o resultado da extração única"""
+    completo = PDFExtractor(extrato).extract_data()
+    
+    previa = PDFExtractor(extrato, max_pages=3)
+    aggregator = previa.create_aggregator()
+    amostra = previa.extract_data(aggregator, finish=False)
+    assert amostra and {registro['pagina'] for registro in amostra} <= {1, 2, 3}
+    
+    restante = PDFExtractor(extrato, strategy=previa.resolved_strategy, page_range=(4, previa.document_pages),
+                            metrics=previa.metrics)
+    assert restante.extract_data(aggregator) == completo
+    assert previa.metrics.counters['registros'] == len(completo)
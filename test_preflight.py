@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da pré-checagem (preflight), que recusa PDFs sem texto ou de outro
+layout antes da extração e escolhe a estratégia para o restante.
+"""
+
+import os
+import sys
+
+import pdfplumber
+import pytest
+from PIL import Image
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+from extrator_pdf import PDFExtractor, closing_pdf, iter_pages, main, preflight
+from gerador_extrato import escrever_paginas_pdf, escrever_pdf
+
+
+@pytest.fixture(scope='module')
+def pasta(tmp_path_factory):
+    return tmp_path_factory.mktemp('preflight')
+
+
+def test_known_layout(pasta):
+    """O extrato conhecido é reconhecido pelos cabeçalhos e vai direto para 'text'"""
+    caminho = str(pasta / 'extrato.pdf')
+    escrever_pdf(caminho, 6)
+    
+    check = preflight(caminho)
+    assert check == {'paginas': 6, 'paginas_amostradas': 3, 'layout_extrato': True,
+                     'texto_extraivel': True, 'estrategia': 'text', 'motivo': None}
+    assert preflight(caminho, first_page=5)['paginas_amostradas'] == 2
+
+
+def test_scanned_pdf_rejected(pasta):
+    """Páginas só com imagem (PDF digitalizado) são recusadas"""
+    caminho = str(pasta / 'digitalizado.pdf')
+    Image.new('L', (300, 400), 255).save(caminho, save_all=True,
+                                         append_images=[Image.new('L', (300, 400), 200)])
+    
+    check = preflight(caminho)
+    assert check['paginas'] == 2
+    assert 'digitalizado' in check['motivo']
+    assert not check['texto_extraivel']
+
+
+def test_unrelated_pdf_rejected(pasta):
+    """Texto sem os cabeçalhos do extrato nem placas é recusado"""
+    caminho = str(pasta / 'outro.pdf')
+    escrever_paginas_pdf(caminho, [['Relatorio anual', 'Receita 1.234,56 em 01/02/2025']] * 2, 2)
+    
+    check = preflight(caminho)
+    assert not check['layout_extrato']
+    assert 'PLACA DATA PRODUTO' in check['motivo']
+    assert check['texto_extraivel']
+
+
+def test_other_layout_with_placas(pasta):
+    """Outro layout com placas continua aceito; sem linhas de tabela fica com 'text'"""
+    caminho = str(pasta / 'placas.pdf')
+    escrever_paginas_pdf(caminho, [['Veiculo ABC-1234 abastecido 01/02/2025 R$ 100,00']], 1)
+    
+    check = preflight(caminho)
+    assert check['motivo'] is None and check['estrategia'] == 'text'
+    assert PDFExtractor(caminho, strategy=check['estrategia']).extract_data()
+
+
+def test_closing_pdf_skips_page_list(pasta):
+    """closing_pdf fecha o documento sem montar os objetos de todas as páginas"""
+    caminho = str(pasta / 'extrato.pdf')
+    with closing_pdf(pdfplumber.open(caminho)) as pdf:
+        assert [page.page_number for page in iter_pages(pdf, 1, 2)] == [1, 2]
+    
+    assert not hasattr(pdf, '_pages')
+    assert pdf.stream.closed
+
+
+def _cli(monkeypatch, capsys, *argv):
+    monkeypatch.setattr(sys, 'argv', ['extrator_pdf.py', *argv])
+    main()
+    return capsys.readouterr().out
+
+
+def test_cli_explicit_strategy_skips_layout_rejection(pasta, monkeypatch, capsys):
+    """Com --strategy explícito o layout desconhecido só gera aviso; sem texto continua recusado"""
+    outro = str(pasta / 'cli_outro.pdf')
+    escrever_paginas_pdf(outro, [['Relatorio anual', 'Receita 1.234,56 em 01/02/2025']], 1)
+    digitalizado = str(pasta / 'cli_digitalizado.pdf')
+    Image.new('L', (300, 400), 255).save(digitalizado)
+    
+    saida = _cli(monkeypatch, capsys, outro)
+    assert 'PLACA DATA PRODUTO' in saida and 'Nenhum dado foi extraído' not in saida
+    
+    saida = _cli(monkeypatch, capsys, outro, '--strategy', 'text')
+    assert 'Aviso:' in saida and 'Nenhum dado foi extraído' in saida
+    
+    saida = _cli(monkeypatch, capsys, digitalizado, '--strategy', 'tables')
+    assert 'digitalizado' in saida and 'Nenhum dado foi extraído' not in saida
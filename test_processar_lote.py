@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do processamento em lote (examples/processar_lote.py): um processo
+de extração que morre só faz o seu próprio arquivo falhar.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples'))
+import processar_lote
+
+
+def extrair_ou_morrer(arquivo_pdf):
+    """Substitui extrair_arquivo: encerra o processo no arquivo 'a_morre.pdf'"""
+    if os.path.basename(arquivo_pdf) == 'a_morre.pdf':
+        os._exit(1)
+    # Os demais ainda estão em andamento quando o pool quebra
+    time.sleep(0.3)
+    registro = {'placa': 'ABC-1234', 'data': '01/02/2025', 'total': '10,00', 'valor_centavos': 1000,
+                'texto_original': 'ABC1234 01/02/2025 10,00', 'pagina': 1, 'linha_referencia': 'linha_1'}
+    return [registro], None, processar_lote.assinatura_arquivo(arquivo_pdf)
+
+
+def test_dead_worker_fails_only_its_file(tmp_path, monkeypatch):
+    pasta = tmp_path / 'pdfs'
+    pasta.mkdir()
+    nomes = ['a_morre.pdf', 'b.pdf', 'c.pdf', 'd.pdf', 'e.pdf']
+    for nome in nomes:
+        (pasta / nome).write_bytes(b'%PDF-1.4 ' + nome.encode())
+    
+    # Os processos do pool herdam a troca (fork)
+    monkeypatch.setattr(processar_lote, 'extrair_arquivo', extrair_ou_morrer)
+    
+    resultados = {
+        os.path.basename(arquivo): erro
+        for arquivo, _, erro, _ in processar_lote.extrair_em_paralelo(
+            processar_lote.listar_pdfs(str(pasta)), workers=2, max_pendentes=4)
+    }
+    assert sorted(resultados) == sorted(nomes)
+    assert resultados.pop('a_morre.pdf')
+    assert all(erro is None for erro in resultados.values())
+    
+    # O lote completo termina com consolidado e manifesto
+    saida = str(tmp_path / 'consolidado')
+    processar_lote.processar_multiplos_pdfs(str(pasta), workers=2, saida=saida)
+    
+    with open(f"{saida}{processar_lote.MANIFEST_SUFFIX}", encoding='utf-8') as f:
+        manifesto = json.load(f)['arquivos']
+    assert sorted(manifesto) == ['b.pdf', 'c.pdf', 'd.pdf', 'e.pdf']
+    assert os.path.exists(f"{saida}.csv")
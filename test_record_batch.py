@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do lote colunar de registros brutos (record_batch.py)
+Garante que o lote devolve os mesmos registros que a antiga lista de
+dicionários, inclusive depois de juntar lotes e de passar por pickle
+(caminho dos workers da extração paralela).
+"""
+
+import pickle
+
+from extrator_pdf import PDFExtractor
+from record_batch import COLUMNS, RecordBatch
+
+PAGINAS = [
+    "MOTORISTA FROTA\n"
+    "ABC-1234 01/02/2025 GASOLINA 10,00 248,59 1\n"
+    "02/02/2025 GASOLINA 5,00 100,00 1\n"
+    "TOTAL R$ 348,59\n"
+    "XYZ1D23 03/02/2025 DIESEL 1234,56 2",
+    
+    "ABC-1234 04/02/2025 ETANOL 12,00 50,10 1\n"
+    "linha sem registro\n"
+    "ABC-1234 05/02/2025 ETANOL 7,00",
+]
+
+
+def _batch(paginas, primeira_pagina=1):
+    extractor = PDFExtractor('teste.pdf')
+    batch = RecordBatch()
+    for page_num, text in enumerate(paginas, primeira_pagina):
+        extractor._process_text(text, page_num, batch)
+    return batch
+
+
+def test_batch_records():
+    """Cada registro do lote tem os mesmos campos do antigo dicionário por linha"""
+    records = list(_batch(PAGINAS))
+    
+    assert [(r['placa'], r['data'], r['total'], r['valor_centavos'], r['pagina'], r['linha_referencia'])
+            for r in records] == [
+        ('ABC-1234', '01/02/2025', '10.00', 1000, 1, 'linha_2'),
+        ('ABC-1234', '02/02/2025', '5.00', 500, 1, 'linha_3'),
+        ('XYZ-1D23', '03/02/2025', '1234.56', 123456, 1, 'linha_5'),
+        ('ABC-1234', '04/02/2025', '12.00', 1200, 2, 'linha_1'),
+        ('ABC-1234', '05/02/2025', '7.00', 700, 2, 'linha_3'),
+    ]
+    assert records[2]['texto_original'] == 'XYZ1D23 03/02/2025 DIESEL 1234,56 2'
+    assert records[4]['texto_original'] == 'ABC-1234 05/02/2025 ETANOL 7,00'
+
+
+def test_extend_and_pickle():
+    """Juntar lotes (inclusive desserializados) preserva registros, códigos e textos"""
+    juntos = RecordBatch()
+    juntos.extend(_batch(PAGINAS[:1]))
+    juntos.extend(pickle.loads(pickle.dumps(_batch(PAGINAS[1:], primeira_pagina=2))))
+    
+    assert list(juntos) == list(_batch(PAGINAS))
+    assert juntos.placa.values == ['ABC-1234', 'XYZ-1D23']
+
+
+def test_to_dataframe():
+    """O DataFrame sai direto das colunas, com placas categóricas"""
+    batch = _batch(PAGINAS)
+    df = batch.to_dataframe()
+    
+    assert list(df.columns) == list(COLUMNS)
+    assert str(df['placa'].dtype) == 'category'
+    assert df.astype(object).to_dict('records') == list(batch)
+    assert len(RecordBatch().to_dataframe()) == 0
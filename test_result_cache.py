@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do cache de resultados por conteúdo do PDF (result_cache.py)
+"""
+
+import os
+import shutil
+from contextlib import contextmanager
+
+from result_cache import ResultCache
+
+REGISTROS = [{'placa': 'ABC1234', 'data': '01/02/2025', 'total': '10,00', 'valor_centavos': 1000}]
+
+
+def test_put_get_round_trip(tmp_path):
+    """A entrada gravada volta igual e conta como acerto; chave desconhecida é falha"""
+    pdf = tmp_path / 'extrato.pdf'
+    pdf.write_bytes(b'%PDF-1.4 conteudo')
+    cache = ResultCache(str(tmp_path / 'cache'), version='teste')
+    
+    chave = cache.key_for(str(pdf))
+    assert chave.endswith('-vteste')
+    assert cache.get(chave) is None
+    
+    cache.put(chave, REGISTROS, {'total_registros': 1})
+    entrada = cache.get(chave)
+    assert entrada['data'] == REGISTROS
+    assert entrada['stats'] == {'total_registros': 1}
+    
+    # Nenhum temporário fica para trás na pasta da entrada
+    assert os.listdir(tmp_path / 'cache' / chave) == ['records.json']
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Acima do limite, as entradas menos usadas são removidas"""
+    cache = ResultCache(str(tmp_path / 'cache'))
+    cache.put('a', REGISTROS, {})
+    cache.max_bytes = cache.stats()['bytes'] * 2
+    
+    cache.put('b', REGISTROS, {})
+    assert cache.get('a') is not None  # 'a' passa a ser a mais recente
+    cache.put('c', REGISTROS, {})
+    
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert not os.path.exists(tmp_path / 'cache' / 'b')
+
+
+def test_entry_evicted_between_index_and_read(tmp_path):
+    """Entrada removida por outro worker entre o índice e a leitura conta como falha"""
+    cache = ResultCache(str(tmp_path / 'cache'))
+    cache.put('a', REGISTROS, {})
+    locked = cache._locked
+    
+    @contextmanager
+    def locked_then_evicted(write=True):
+        with locked(write) as index:
+            yield index
+        # Outro worker remove a entrada (LRU) logo depois que o lock é liberado
+        shutil.rmtree(tmp_path / 'cache' / 'a', ignore_errors=True)
+    
+    cache._locked = locked_then_evicted
+    assert cache.get('a') is None
+    cache._locked = locked
+    
+    stats = cache.stats()
+    assert stats['hits'] == 0 and stats['misses'] == 1
+    assert stats['entries'] == 0
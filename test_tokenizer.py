@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do tokenizador de linha (tokenize_line): o padrão de passada única
+reconhece as mesmas placas e datas que os padrões de busca isolados.
+"""
+
+import pytest
+
+from extrator_pdf import PATTERNS, tokenize_line
+
+LINHAS = [
+    'ABC1234 01/02/2025 GASOLINA 250,00 50,00',
+    'abc-1d23 1/2/25 DIESEL 10.50 3,00',
+    'XABC1234 01/02/2025 100,00',           # placa colada em outra letra
+    '9ABC1234 101/02/2025 100,00',          # placa e data coladas em dígitos
+    'ABC 1234 ABD1E23 10.01.2025 7,00',     # primeira placa vence; data com pontos
+    'ABC12345 ABC1D234 31-12-2024 1,00',    # \b no fim da placa
+    '_ABC1234 _01/02/2025 1,00',
+    'ABC1234',
+    'A',
+    '',
+]
+
+
+@pytest.mark.parametrize('linha', LINHAS)
+def test_tokens_match_search_patterns(linha):
+    placa, data, valores = tokenize_line(linha)
+    
+    esperado_placa = PATTERNS['placa'].search(linha)
+    esperado_data = PATTERNS['data'].search(linha)
+    assert placa == (esperado_placa.group() if esperado_placa else None)
+    assert data == (esperado_data.group() if esperado_data else None)
+    
+    # Valores: os mesmos da busca isolada, menos os que estão dentro da data
+    if data and '.' in data:
+        assert all(valor not in data for valor in valores)
+    else:
+        assert valores == PATTERNS['valor'].findall(linha)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agregação vetorizada dos registros brutos com pandas.
+Alternativa ao PlacaDataAggregator e ao laço de _aggregate_by_placa para
+volumes grandes (lotes consolidados com centenas de milhares de linhas):
+os registros viram um único DataFrame, placas e datas viram códigos
+inteiros já na ordem de texto do Python e as somas, mínimos e contagens
+saem de um groupby. A saída é idêntica à dos agregadores em Python.
+"""
+
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from money import format_centavos
+from record_batch import RecordBatch
+
+
+def records_frame(raw_data: Union[RecordBatch, List[Dict]], convert_valor: Callable[[str], int]) -> pd.DataFrame:
+    """
+    Monta o DataFrame de registros brutos usado pela agregação
+    
+    Args:
+        raw_data (RecordBatch | List[Dict]): Registros brutos extraídos
+        convert_valor (Callable): Converte o texto do valor em centavos (usado
+            só em registros sem 'valor_centavos')
+    
+    Returns:
+        pd.DataFrame: Colunas placa, data (categóricas), valor_centavos e pagina
+    """
+    columns = ['placa', 'data', 'valor_centavos', 'pagina']
+    if isinstance(raw_data, RecordBatch):
+        return raw_data.to_dataframe(columns)
+    
+    frame = pd.DataFrame.from_records(raw_data, columns=columns + ['total'])
+    missing = frame['valor_centavos'].isna()
+    if missing.any():
+        frame.loc[missing, 'valor_centavos'] = [
+            convert_valor(str(total).strip()) if isinstance(total, str) else 0
+            for total in frame.loc[missing, 'total']
+        ]
+    return pd.DataFrame({
+        'placa': frame['placa'].astype('category'),
+        'data': frame['data'].astype('category'),
+        'valor_centavos': frame['valor_centavos'].astype(np.int64),
+        'pagina': frame['pagina'].fillna(0).astype(np.int64)
+    })
+
+
+def _sorted_codes(column: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """
+    Códigos inteiros dos textos da coluna (sem espaços nas pontas), numerados
+    na ordem de comparação de strings do Python
+    
+    Args:
+        column (pd.Series): Coluna categórica ou de textos (ausentes contam como '')
+    
+    Returns:
+        Tuple[np.ndarray, List[str]]: Código de cada registro e o texto de cada código
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, values = column.cat.codes.to_numpy(), list(column.cat.categories)
+    else:
+        codes, values = pd.factorize(column)
+        values = list(values)
+    
+    # Código -1 (ausente) cai no último item, o texto vazio, que por isso
+    # sempre existe e sempre recebe o código 0
+    stripped = [str(value).strip() for value in values] + ['']
+    labels = sorted(set(stripped))
+    position = {label: index for index, label in enumerate(labels)}
+    remap = np.array([position[value] for value in stripped], dtype=np.int64)
+    return remap[codes], labels
+
+
+def aggregate_by_placa_data(frame: pd.DataFrame) -> List[Dict]:
+    """
+    Equivalente vetorizado de PlacaDataAggregator.result(): um registro por placa e data
+    
+    Args:
+        frame (pd.DataFrame): Saída de records_frame
+    
+    Returns:
+        List[Dict]: Dados organizados por placa e data, ordenados
+    """
+    placa_codes, placas = _sorted_codes(frame['placa'])
+    data_codes, datas = _sorted_codes(frame['data'])
+    
+    codes = pd.DataFrame({
+        'placa': placa_codes,
+        'data': data_codes,
+        'centavos': frame['valor_centavos'].to_numpy(dtype=np.int64),
+        'pagina': frame['pagina'].to_numpy(dtype=np.int64)
+    })
+    # Registros sem placa são ignorados
+    codes = codes[codes['placa'] != 0]
+    
+    groups = codes.groupby(['placa', 'data'], sort=True).agg(
+        centavos=('centavos', 'sum'), pagina=('pagina', 'min'), registros=('centavos', 'size')
+    )
+    
+    result = []
+    for placa_code, data_code, centavos, pagina, registros in zip(
+            groups.index.get_level_values('placa').tolist(), groups.index.get_level_values('data').tolist(),
+            groups['centavos'].tolist(), groups['pagina'].tolist(), groups['registros'].tolist()):
+        placa = placas[placa_code]
+        data = datas[data_code]
+        valor_total_formatado = format_centavos(centavos)
+        
+        texto_original = f"PLACA: {placa} | DATA: {data} | TOTAL: R$ {valor_total_formatado}"
+        if registros > 1:
+            texto_original += f" | REGISTROS: {registros}"
+        
+        result.append({
+            'placa': placa,
+            'data': data,
+            'total': valor_total_formatado,
+            'texto_original': texto_original,
+            'pagina': pagina,
+            'linha_referencia': f"placa_{placa}_data_{data}",
+            'registros_individuais': registros,
+            'valor_numerico': centavos / 100,
+            'valor_centavos': centavos
+        })
+    
+    return result
+
+
+def aggregate_by_placa(frame: pd.DataFrame) -> List[Dict]:
+    """
+    Equivalente vetorizado de PDFExtractor._aggregate_by_placa: um registro por placa
+    
+    A data de cada placa é a menor data preenchida (ou vazia, se nenhuma for).
+    
+    Args:
+        frame (pd.DataFrame): Saída de records_frame
+    
+    Returns:
+        List[Dict]: Dados agregados por placa, ordenados por placa
+    """
+    placa_codes, placas = _sorted_codes(frame['placa'])
+    data_codes, datas = _sorted_codes(frame['data'])
+    
+    # Datas vazias ficam com um código maior que todos para não entrarem no mínimo
+    sem_data = len(datas)
+    data_codes = np.where(data_codes == 0, sem_data, data_codes)
+    
+    codes = pd.DataFrame({
+        'placa': placa_codes,
+        'data': data_codes,
+        'centavos': frame['valor_centavos'].to_numpy(dtype=np.int64),
+        'pagina': frame['pagina'].to_numpy(dtype=np.int64)
+    })
+    codes = codes[codes['placa'] != 0]
+    
+    groups = codes.groupby('placa', sort=True).agg(
+        centavos=('centavos', 'sum'), data=('data', 'min'),
+        pagina=('pagina', 'min'), registros=('centavos', 'size')
+    )
+    
+    result = []
+    for placa_code, centavos, data_code, pagina, registros in zip(
+            groups.index.tolist(), groups['centavos'].tolist(), groups['data'].tolist(),
+            groups['pagina'].tolist(), groups['registros'].tolist()):
+        placa = placas[placa_code]
+        valor_total_formatado = format_centavos(centavos)
+        
+        result.append({
+            'placa': placa,
+            'data': datas[data_code] if data_code != sem_data else '',
+            'total': valor_total_formatado,
+            'texto_original': f"PLACA: {placa} | TOTAL: R$ {valor_total_formatado} | REGISTROS: {registros}",
+            'pagina': pagina,
+            'linha_referencia': f"agregado_{registros}_registros",
+            'registros_individuais': registros,
+            'valor_numerico': centavos / 100,
+            'valor_centavos': centavos
+        })
+    
+    return result